@@ -10,8 +10,14 @@ from packaging.version import Version
 
 from ecologits.exceptions import EcoLogitsError
 from ecologits.log import logger
+from ecologits.utils.lru_cache import LRUCache
 
 if TYPE_CHECKING:
+    from ecologits.electricity_mix_repository import TimeSeriesElectricityMixRepository
+    from ecologits.impacts.uncertainty import UnitDistribution
+    from ecologits.tracers.utils import ImpactsOutput
+    from ecologits.utils.background import BackgroundWorker
+    from ecologits.utils.ledger import ImpactLedger
     from ecologits.utils.opentelemetry import OpenTelemetry, OpenTelemetryLabels
 
 
@@ -84,6 +90,10 @@ _INSTRUMENTS = {
     "litellm": init_litellm_instrumentor
 }
 
+STREAM_IMPACTS_MODES = ("every_chunk", "final_only", "every_n_chunks", "every_n_ms")
+TOKEN_COUNT_MODES = ("exact", "approximate")
+LATENCY_MODES = ("total", "decode")
+
 
 class EcoLogits:
     """
@@ -115,7 +125,23 @@ class EcoLogits:
     class _Config:
         providers: list[str] = field(default_factory=list)
         electricity_mix_zone: str | None = None
+        electricity_mix_timeseries: TimeSeriesElectricityMixRepository | None = None
         opentelemetry: OpenTelemetry | None = None
+        impacts_cache: LRUCache[tuple, ImpactsOutput] | None = None
+        stream_impacts: str = "every_chunk"
+        stream_impacts_interval: int = 1
+        uncertainty_samples: int | None = None
+        uncertainty_distributions: dict[str, UnitDistribution] | None = None
+        background_worker: BackgroundWorker | None = None
+        lazy_impacts: bool = False
+        token_count: str = "exact"
+        latency_mode: str = "total"
+        ledger: ImpactLedger | None = None
+
+        @property
+        def records_requests(self) -> bool:
+            """Requests are recorded with OpenTelemetry or in the impact ledger."""
+            return self.opentelemetry is not None or self.ledger is not None
 
     config = _Config()
 
@@ -123,7 +149,19 @@ class EcoLogits:
     def init(
         providers: str | list[str] | None = None,
         electricity_mix_zone: str | None = None,
-        opentelemetry_endpoint: str | None = None
+        electricity_mix_timeseries: str | None = None,
+        opentelemetry_endpoint: str | None = None,
+        impacts_cache_size: int | None = None,
+        stream_impacts: str = "every_chunk",
+        stream_impacts_interval: int = 1,
+        uncertainty_samples: int | None = None,
+        uncertainty_distributions: dict[str, UnitDistribution] | None = None,
+        background_queue_size: int | None = None,
+        lazy_impacts: bool = False,
+        token_count: str = "exact",
+        latency_mode: str = "total",
+        ledger_path: str | None = None,
+        ledger_queue_size: int | None = None
     ) -> None:
         """
         Initialization static method. Will attempt to initialize all providers by default.
@@ -131,8 +169,38 @@ class EcoLogits:
         Args:
             providers: list of providers to initialize (must select at least one provider).
             electricity_mix_zone: ISO 3166-1 alpha-3 code of the electricity mix zone of the datacenter.
+            electricity_mix_timeseries: path of a CSV or Parquet file of time-resolved electricity mixes.
             opentelemetry_endpoint: enable OpenTelemetry with the URL endpoint.
+            impacts_cache_size: enable the cache of computed impacts with the maximum number of entries.
+            stream_impacts: policy to attach impacts to the chunks of streamed responses, among `every_chunk`,
+                `final_only`, `every_n_chunks` and `every_n_ms`.
+            stream_impacts_interval: number of chunks (`every_n_chunks`) or of milliseconds (`every_n_ms`) between
+                two chunks with impacts.
+            uncertainty_samples: enable the Monte Carlo estimation of the percentiles of the impacts with the number
+                of samples per request (requires NumPy).
+            uncertainty_distributions: distributions of the uncertain inputs, uniform over their range by default
+                (see `ecologits.impacts.uncertainty`).
+            background_queue_size: enable the computation of the impacts of async requests in a background thread
+                with the maximum number of pending requests.
+            lazy_impacts: compute the impacts of requests only when they are first accessed (or recorded with
+                OpenTelemetry).
+            token_count: mode to count the input tokens of requests that are not reported by the provider, `exact`
+                (encoded with tiktoken) or `approximate` (estimated from the length of the prompt).
+            latency_mode: latency of streamed responses that caps their generation latency, `total` (from the request
+                to the end of the stream) or `decode` (from the first chunk to the end of the stream, excluding
+                queueing, prefill and network time).
+            ledger_path: enable the impact ledger with the path of its SQLite database (one row per request).
+            ledger_queue_size: maximum number of requests waiting to be written to the impact ledger.
         """
+        _check_init_parameters(
+            stream_impacts=stream_impacts,
+            stream_impacts_interval=stream_impacts_interval,
+            uncertainty_samples=uncertainty_samples,
+            uncertainty_distributions=uncertainty_distributions,
+            token_count=token_count,
+            latency_mode=latency_mode
+        )
+
         if isinstance(providers, str):
             providers = [providers]
         if providers is None:
@@ -148,9 +216,40 @@ class EcoLogits:
         init_instruments(providers)
 
         EcoLogits.config.electricity_mix_zone = electricity_mix_zone
+        if electricity_mix_timeseries is not None:
+            from ecologits.electricity_mix_repository import TimeSeriesElectricityMixRepository
+
+            EcoLogits.config.electricity_mix_timeseries = TimeSeriesElectricityMixRepository.from_file(
+                electricity_mix_timeseries
+            )
+        else:
+            EcoLogits.config.electricity_mix_timeseries = None
         EcoLogits.config.providers += providers
         EcoLogits.config.providers = list(set(EcoLogits.config.providers))
 
+        if impacts_cache_size is not None and impacts_cache_size > 0:
+            EcoLogits.config.impacts_cache = LRUCache(maxsize=impacts_cache_size)
+        else:
+            EcoLogits.config.impacts_cache = None
+
+        EcoLogits.config.stream_impacts = stream_impacts
+        EcoLogits.config.stream_impacts_interval = stream_impacts_interval
+        EcoLogits.config.uncertainty_samples = uncertainty_samples
+        EcoLogits.config.uncertainty_distributions = uncertainty_distributions
+
+        if EcoLogits.config.background_worker is not None:
+            EcoLogits.config.background_worker.shutdown()
+        if background_queue_size is not None and background_queue_size > 0:
+            from ecologits.utils.background import BackgroundWorker
+
+            EcoLogits.config.background_worker = BackgroundWorker(maxsize=background_queue_size)
+        else:
+            EcoLogits.config.background_worker = None
+        EcoLogits.config.lazy_impacts = lazy_impacts
+        EcoLogits.config.token_count = token_count
+        EcoLogits.config.latency_mode = latency_mode
+        init_ledger(ledger_path, ledger_queue_size)
+
         if opentelemetry_endpoint is not None:
             if not is_opentelemetry_installed():
                 logger.error("OpenTelemetry package is not installed. Install with "
@@ -197,16 +296,74 @@ class EcoLogits:
                 ...
             ```
         """
-        if EcoLogits.config.opentelemetry is None:
-            logger.error("You must enable OpenTelemetry to use labels. Initialize with "
+        if not EcoLogits.config.records_requests:
+            logger.error("You must enable OpenTelemetry or the impact ledger to use labels. Initialize with "
                          "opentelemetry_endpoint='http://localhost:4318/v1/metrics' for instance.")
             raise EcoLogitsError("OpenTelemetry is not enabled.")
+        if not is_opentelemetry_installed():
+            logger.error("OpenTelemetry package is not installed, it is required to use labels. Install with "
+                         "`pip install ecologits[opentelemetry]`.")
+            raise EcoLogitsError("OpenTelemetry package is not installed.")
 
         from ecologits.utils.opentelemetry import OpenTelemetryLabels
 
         return OpenTelemetryLabels(**labels)
 
 
+def _check_init_parameters(
+    *,
+    stream_impacts: str,
+    stream_impacts_interval: int,
+    uncertainty_samples: int | None,
+    uncertainty_distributions: dict[str, UnitDistribution] | None,
+    token_count: str,
+    latency_mode: str
+) -> None:
+    if stream_impacts not in STREAM_IMPACTS_MODES:
+        logger.error(f"Unknown stream impacts policy `{stream_impacts}`, must be one of {STREAM_IMPACTS_MODES}.")
+        raise EcoLogitsError(f"Unknown stream impacts policy `{stream_impacts}`.")
+    if stream_impacts_interval <= 0:
+        logger.error("The stream impacts interval must be a positive integer.")
+        raise EcoLogitsError("Invalid stream impacts interval.")
+    if token_count not in TOKEN_COUNT_MODES:
+        logger.error(f"Unknown token count mode `{token_count}`, must be one of {TOKEN_COUNT_MODES}.")
+        raise EcoLogitsError(f"Unknown token count mode `{token_count}`.")
+    if latency_mode not in LATENCY_MODES:
+        logger.error(f"Unknown latency mode `{latency_mode}`, must be one of {LATENCY_MODES}.")
+        raise EcoLogitsError(f"Unknown latency mode `{latency_mode}`.")
+    if uncertainty_samples is not None:
+        if uncertainty_samples <= 0:
+            logger.error("The number of uncertainty samples must be a positive integer.")
+            raise EcoLogitsError("Invalid number of uncertainty samples.")
+        if importlib.util.find_spec("numpy") is None:
+            logger.error("NumPy package is not installed. Install with `pip install numpy`.")
+            raise EcoLogitsError("NumPy package is not installed.")
+    if uncertainty_distributions is not None:
+        _check_uncertainty_distributions(uncertainty_distributions)
+
+
+def _check_uncertainty_distributions(distributions: dict[str, UnitDistribution]) -> None:
+    import numpy as np
+
+    from ecologits.impacts.uncertainty import UNCERTAIN_INPUTS
+
+    unknown_inputs = set(distributions) - set(UNCERTAIN_INPUTS)
+    if unknown_inputs:
+        logger.error(f"Unknown uncertain inputs {sorted(unknown_inputs)}, must be among {UNCERTAIN_INPUTS}.")
+        raise EcoLogitsError(f"Unknown uncertain inputs {sorted(unknown_inputs)}.")
+    # Distributions are only sampled on requests, draw a few samples to fail early
+    for name, distribution in distributions.items():
+        try:
+            samples = np.asarray(distribution(np.random.default_rng(0), 16))
+            is_valid = samples.shape == (16,) and bool(np.all((samples >= 0) & (samples <= 1)))
+        except Exception as e:
+            logger.error(f"Failed to sample the distribution of `{name}`: {e}")
+            raise EcoLogitsError(f"Invalid distribution of `{name}`.") from e
+        if not is_valid:
+            logger.error(f"The distribution of `{name}` must draw the requested number of samples in [0, 1].")
+            raise EcoLogitsError(f"Invalid distribution of `{name}`.")
+
+
 def init_instruments(providers: list[str]) -> None:
     for provider in providers:
         if provider not in _INSTRUMENTS:
@@ -216,6 +373,17 @@ def init_instruments(providers: list[str]) -> None:
             init_func()
 
 
+def init_ledger(ledger_path: str | None, ledger_queue_size: int | None) -> None:
+    if EcoLogits.config.ledger is not None:
+        EcoLogits.config.ledger.shutdown()
+    if ledger_path is not None:
+        from ecologits.utils.ledger import DEFAULT_QUEUE_SIZE, ImpactLedger
+
+        EcoLogits.config.ledger = ImpactLedger(ledger_path, queue_size=ledger_queue_size or DEFAULT_QUEUE_SIZE)
+    else:
+        EcoLogits.config.ledger = None
+
+
 def is_opentelemetry_installed() -> bool:
     otel_pkgs = [
         "opentelemetry",
@@ -0,0 +1,317 @@
+import argparse
+import csv
+import importlib.util
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import IO, Any, Optional
+
+from ecologits.exceptions import EcoLogitsError
+from ecologits.log import logger
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+@dataclass
+class _InvalidRecord:
+    error: str
+
+
+def _bounds(value: Any) -> tuple[float, float]:
+    from ecologits.utils.range_value import RangeValue
+
+    if isinstance(value, RangeValue):
+        return value.min, value.max
+    return value, value
+
+
+def _to_float(value: Any, name: str, default: Optional[float] = None) -> float:
+    if value is None or value == "":
+        if default is None:
+            raise ValueError(f"Missing `{name}` field.")
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid `{name}` value: {value!r}.") from None
+
+
+def _record_inputs(record: dict[str, Any], electricity_mix_zone: Optional[str]) -> tuple[str, tuple[float, ...]]:
+    """
+    Resolve the model, the electricity mix and the token count of a record.
+
+    Args:
+        record: Request record.
+        electricity_mix_zone: Electricity mix zone used when the record does not define one.
+
+    Returns:
+        The electricity mix zone of the record and the inputs of `compute_llm_impacts_batch`.
+
+    Raises:
+        ValueError: If the record cannot be scored.
+    """
+    from ecologits.electricity_mix_repository import electricity_mixes
+    from ecologits.model_repository import ParametersMoE, models
+    from ecologits.tracers.utils import PROVIDER_CONFIG_MAP
+
+    provider = record.get("provider")
+    model_name = record.get("model")
+    provider_config = PROVIDER_CONFIG_MAP.get(provider)  # type: ignore[arg-type]
+    model = models.find_model(provider=provider, model_name=model_name)  # type: ignore[arg-type]
+    if provider_config is None or model is None:
+        raise ValueError(f"Could not find model `{model_name}` for {provider} provider.")
+
+    zone = record.get("zone") or electricity_mix_zone or provider_config.datacenter_location or "WOR"
+    if_electricity_mix = electricity_mixes.find_electricity_mix(zone=zone)
+    if if_electricity_mix is None:
+        raise ValueError(f"Could not find electricity mix for `{zone}` zone.")
+
+    output_tokens = _to_float(record.get("output_tokens"), "output_tokens")
+    request_latency = _to_float(record.get("request_latency"), "request_latency", default=math.inf)
+
+    if isinstance(model.architecture.parameters, ParametersMoE):
+        active_params = _bounds(model.architecture.parameters.active)
+        total_params = _bounds(model.architecture.parameters.total)
+    else:
+        active_params = total_params = _bounds(model.architecture.parameters)
+
+    return zone, (
+        *active_params,
+        *total_params,
+        *_bounds(provider_config.datacenter_pue),
+        *_bounds(provider_config.datacenter_wue),
+        output_tokens,
+        request_latency,
+        if_electricity_mix.adpe,
+        if_electricity_mix.pe,
+        if_electricity_mix.gwp,
+        if_electricity_mix.wue,
+    )
+
+
+def score_records(records: list[Any], electricity_mix_zone: Optional[str] = None) -> list[dict[str, Any]]:
+    """
+    Compute the impacts of a chunk of request records.
+
+    Each record must define `provider`, `model` and `output_tokens`. The `request_latency` (in seconds) and the
+    electricity mix `zone` are optional. Records that cannot be scored are returned with an `error` field, records
+    that are not objects are replaced by an object with only the impact columns and the `error` field.
+
+    Args:
+        records: List of request records.
+        electricity_mix_zone: Electricity mix zone used when a record does not define one.
+
+    Returns:
+        The records completed with the `<impact>_min` and `<impact>_max` impact columns.
+    """
+    import numpy as np
+
+    from ecologits.impacts.batch import IMPACT_COLUMNS, compute_llm_impacts_batch
+
+    n = len(records)
+    inputs = np.full((14, n), np.nan)
+    valid = np.zeros(n, dtype=bool)
+    errors: list[Optional[str]] = [None] * n
+
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            # No other field is added, so that the CSV header of the first records still applies
+            records[i] = {}
+            errors[i] = record.error if isinstance(record, _InvalidRecord) else "Record must be an object."
+            continue
+        try:
+            zone, inputs[:, i] = _record_inputs(record, electricity_mix_zone)
+        except ValueError as e:
+            errors[i] = str(e)
+            continue
+        valid[i] = True
+        record["zone"] = zone
+
+    results: dict[str, np.ndarray] = {}
+    if valid.any():
+        rows = inputs[:, valid]
+        results = compute_llm_impacts_batch(
+            model_active_parameter_count=(rows[0], rows[1]),
+            model_total_parameter_count=(rows[2], rows[3]),
+            datacenter_pue=(rows[4], rows[5]),
+            datacenter_wue=(rows[6], rows[7]),
+            output_token_count=rows[8],
+            request_latency=rows[9],
+            if_electricity_mix_adpe=rows[10],
+            if_electricity_mix_pe=rows[11],
+            if_electricity_mix_gwp=rows[12],
+            if_electricity_mix_wue=rows[13],
+        )
+
+    columns = [f"{c}_{b}" for c in IMPACT_COLUMNS for b in ("min", "max")]
+    values = {c: results[c].tolist() for c in results}
+    j = 0
+    for i, record in enumerate(records):
+        record.setdefault("zone", None)
+        if valid[i]:
+            for c in columns:
+                record[c] = values[c][j]
+            record["error"] = None
+            j += 1
+        else:
+            for c in columns:
+                record[c] = None
+            record["error"] = errors[i]
+    return records
+
+
+def _detect_format(path: str, fmt: Optional[str]) -> str:
+    if fmt is not None:
+        return fmt
+    if path.endswith(".csv"):
+        return "csv"
+    return "jsonl"
+
+
+def _read_records(fd: IO[str], fmt: str) -> Iterator[Any]:
+    if fmt == "csv":
+        yield from csv.DictReader(fd)
+    else:
+        # Lines that cannot be read are scored as records with an error, so that one bad line does not stop the run
+        for line_number, line in enumerate(fd, start=1):
+            stripped = line.strip()
+            if not stripped:
+                continue
+            try:
+                record = json.loads(stripped)
+            except json.JSONDecodeError as e:
+                yield _InvalidRecord(error=f"Invalid JSON on line {line_number}: {e.msg}.")
+                continue
+            if not isinstance(record, dict):
+                yield _InvalidRecord(error=f"Record on line {line_number} is not an object.")
+                continue
+            yield record
+
+
+class _RecordWriter:
+    def __init__(self, fd: IO[str], fmt: str) -> None:
+        self.__fd = fd
+        self.__fmt = fmt
+        self.__csv_writer: Optional[csv.DictWriter] = None
+
+    def write(self, records: list[dict[str, Any]]) -> None:
+        if self.__fmt == "jsonl":
+            self.__fd.writelines(json.dumps(r) + "\n" for r in records)
+            return
+        # The header is written with the first chunk, it holds the fields of all its records
+        fieldnames = list(dict.fromkeys(key for record in records for key in record))
+        if self.__csv_writer is None:
+            self.__csv_writer = csv.DictWriter(self.__fd, fieldnames=fieldnames)
+            self.__csv_writer.writeheader()
+        new_fields = set(fieldnames).difference(self.__csv_writer.fieldnames)
+        if new_fields:
+            logger.error(f"Fields {sorted(new_fields)} are not in the CSV header, they are missing from the first "
+                         f"records. Write JSONL instead or increase the chunk size.")
+            raise EcoLogitsError(f"Fields {sorted(new_fields)} are not in the CSV header.")
+        self.__csv_writer.writerows(records)
+
+
+def score(
+    input_path: str,
+    output_path: str,
+    input_format: Optional[str] = None,
+    output_format: Optional[str] = None,
+    electricity_mix_zone: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: Optional[int] = None
+) -> int:
+    """
+    Compute the impacts of a log of requests and write them back in a streaming fashion.
+
+    Args:
+        input_path: Path of the JSONL or CSV log of requests (`-` for stdin).
+        output_path: Path of the JSONL or CSV output file (`-` for stdout).
+        input_format: Format of the input (`jsonl` or `csv`), inferred from the file extension by default.
+        output_format: Format of the output (`jsonl` or `csv`), inferred from the file extension by default.
+        electricity_mix_zone: Electricity mix zone used when a record does not define one.
+        chunk_size: Number of records scored at once.
+        workers: Number of worker processes, defaults to the number of CPUs.
+
+    Returns:
+        The number of scored records.
+    """
+    if importlib.util.find_spec("numpy") is None:
+        logger.error("NumPy package is not installed. Install with `pip install numpy`.")
+        raise EcoLogitsError("NumPy package is not installed.")
+
+    workers = workers or os.cpu_count() or 1
+    input_format = _detect_format(input_path, input_format)
+    output_format = _detect_format(output_path, output_format)
+
+    fd_in = sys.stdin if input_path == "-" else open(input_path, newline="")  # noqa: SIM115
+    fd_out = sys.stdout if output_path == "-" else open(output_path, "w", newline="")  # noqa: SIM115
+    count = 0
+    try:
+        records = _read_records(fd_in, input_format)
+        chunks = iter(lambda: list(islice(records, chunk_size)), [])
+        writer = _RecordWriter(fd_out, output_format)
+
+        if workers == 1:
+            for chunk in chunks:
+                writer.write(score_records(chunk, electricity_mix_zone))
+                count += len(chunk)
+            return count
+
+        # Keep a bounded number of chunks in flight to bound memory usage, and write them back in order.
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending: deque[Future] = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(score_records, chunk, electricity_mix_zone))
+                if len(pending) >= 2 * workers:
+                    scored = pending.popleft().result()
+                    writer.write(scored)
+                    count += len(scored)
+            while pending:
+                scored = pending.popleft().result()
+                writer.write(scored)
+                count += len(scored)
+        return count
+    finally:
+        if fd_in is not sys.stdin:
+            fd_in.close()
+        if fd_out is not sys.stdout:
+            fd_out.close()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="ecologits", description="EcoLogits command line interface.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    score_parser = subparsers.add_parser("score", help="Compute the impacts of a JSONL or CSV log of requests.")
+    score_parser.add_argument("input", help="Input log of requests (`-` for stdin).")
+    score_parser.add_argument("-o", "--output", default="-", help="Output file (`-` for stdout, default).")
+    score_parser.add_argument("--input-format", choices=["jsonl", "csv"], default=None)
+    score_parser.add_argument("--output-format", choices=["jsonl", "csv"], default=None)
+    score_parser.add_argument("--zone", default=None,
+                              help="Electricity mix zone used when a record does not define one.")
+    score_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    score_parser.add_argument("--workers", type=int, default=None,
+                              help="Number of worker processes (defaults to the number of CPUs).")
+
+    args = parser.parse_args(argv)
+
+    timer_start = time.perf_counter()
+    count = score(
+        input_path=args.input,
+        output_path=args.output,
+        input_format=args.input_format,
+        output_format=args.output_format,
+        electricity_mix_zone=args.zone,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+    )
+    elapsed = time.perf_counter() - timer_start
+    print(f"Scored {count} records in {elapsed:.2f}s ({count / max(elapsed, 1e-9):.0f} rows/s).", file=sys.stderr)
+    return 0
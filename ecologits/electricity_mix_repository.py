@@ -1,7 +1,19 @@
+import importlib.util
+import math
 import os
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable
 from csv import DictReader
 from dataclasses import dataclass
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Any, Optional, Union, cast
+
+from ecologits.exceptions import EcoLogitsError
+from ecologits.log import logger
+from ecologits.utils.lazy import LazyProxy
+
+Timestamp = Union[float, str, datetime]
 
 
 @dataclass
@@ -22,6 +34,30 @@ class ElectricityMix:
     wue: float
 
 
+@dataclass
+class ElectricityMixColumns:
+    """
+    Columns of electricity mixes, for vectorized computations
+
+    The columns are arrays of doubles that can be wrapped without copy with `numpy.frombuffer` (or `numpy.asarray`).
+    Values of unknown zones are NaN.
+
+    Attributes:
+        zones: Electricity mix zones
+        found: True for each zone found in the repository
+        adpe: Abiotic Depletion Potential of the mixes (in kgSbeq / kWh)
+        pe: Primary Energy of the mixes (in MJ / kWh)
+        gwp: Global Warming Potential of the mixes (in kgCO2eq / kWh)
+        wue: Water Usage Effectiveness of the mixes (in L / kWh)
+    """
+    zones: list[str]
+    found: list[bool]
+    adpe: array
+    pe: array
+    gwp: array
+    wue: array
+
+
 class ElectricityMixRepository:
     """
     Repository of electricity mixes.
@@ -29,12 +65,46 @@ class ElectricityMixRepository:
 
     def __init__(self, electricity_mixes: list[ElectricityMix]) -> None:
         self.__electricity_mixes = electricity_mixes
+        self.__index: dict[str, ElectricityMix] = {}
+        for electricity_mix in electricity_mixes:
+            self.__index.setdefault(electricity_mix.zone, electricity_mix)
 
     def find_electricity_mix(self, zone: str) -> Optional[ElectricityMix]:
-        for electricity_mix in self.__electricity_mixes:
-            if electricity_mix.zone == zone:
-                return electricity_mix
-        return None
+        return self.__index.get(zone)
+
+    def find_many(self, zones: Iterable[str]) -> ElectricityMixColumns:
+        """
+        Find the electricity mixes of many zones at once.
+
+        Args:
+            zones: ISO 3166-1 alpha-3 codes of the electricity mix zones.
+
+        Returns:
+            The columns of the electricity mixes, in the order of the zones.
+        """
+        zones = list(zones)
+        columns = ElectricityMixColumns(
+            zones=zones,
+            found=[],
+            adpe=array("d"),
+            pe=array("d"),
+            gwp=array("d"),
+            wue=array("d")
+        )
+        for zone in zones:
+            electricity_mix = self.__index.get(zone)
+            columns.found.append(electricity_mix is not None)
+            if electricity_mix is None:
+                columns.adpe.append(math.nan)
+                columns.pe.append(math.nan)
+                columns.gwp.append(math.nan)
+                columns.wue.append(math.nan)
+            else:
+                columns.adpe.append(electricity_mix.adpe)
+                columns.pe.append(electricity_mix.pe)
+                columns.gwp.append(electricity_mix.gwp)
+                columns.wue.append(electricity_mix.wue)
+        return columns
 
     def list_electricity_mixes(self) -> list[ElectricityMix]:
         return self.__electricity_mixes
@@ -61,4 +131,170 @@ class ElectricityMixRepository:
         return cls(electricity_mixes)
 
 
-electricity_mixes = ElectricityMixRepository.from_csv()
+def to_timestamp(value: Timestamp) -> float:
+    """
+    Convert a datetime, an ISO 8601 string or a POSIX timestamp to a POSIX timestamp. Naive datetimes are in UTC.
+    """
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            # UTC designator is only supported by `datetime.fromisoformat` from Python 3.11
+            if value.endswith("Z"):
+                value = value[:-1] + "+00:00"
+            value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return float(value)
+
+
+class _ZoneTimeSeries:
+    """
+    Sorted columns of the electricity mixes of a zone over time.
+    """
+
+    def __init__(self, rows: list[tuple[float, float, float, float, float]]) -> None:
+        rows.sort(key=lambda row: row[0])
+        self.starts = array("d", (row[0] for row in rows))
+        self.adpe = array("d", (row[1] for row in rows))
+        self.pe = array("d", (row[2] for row in rows))
+        self.gwp = array("d", (row[3] for row in rows))
+        self.wue = array("d", (row[4] for row in rows))
+        # The last interval lasts as long as the previous one
+        if len(self.starts) > 1:
+            self.end = 2 * self.starts[-1] - self.starts[-2]
+        else:
+            self.end = math.inf
+
+    def find_index(self, timestamp: float) -> int:
+        if timestamp >= self.end:
+            return -1
+        return bisect_right(self.starts, timestamp) - 1
+
+
+class TimeSeriesElectricityMixRepository:
+    """
+    Repository of time-resolved electricity mixes (e.g. hourly marginal intensities).
+
+    Each electricity mix of a zone applies from its timestamp until the timestamp of the next electricity mix of the
+    same zone, lookups are binary searches over the sorted timestamps of the zone.
+    """
+
+    def __init__(self, electricity_mixes: Iterable[tuple[Timestamp, ElectricityMix]]) -> None:
+        """
+        Args:
+            electricity_mixes: Pairs of start timestamp and electricity mix.
+        """
+        rows: dict[str, list[tuple[float, float, float, float, float]]] = {}
+        for timestamp, electricity_mix in electricity_mixes:
+            rows.setdefault(electricity_mix.zone, []).append((
+                to_timestamp(timestamp),
+                electricity_mix.adpe,
+                electricity_mix.pe,
+                electricity_mix.gwp,
+                electricity_mix.wue
+            ))
+        self.__index = {zone: _ZoneTimeSeries(zone_rows) for zone, zone_rows in rows.items()}
+
+    def list_zones(self) -> list[str]:
+        return list(self.__index.keys())
+
+    def find_electricity_mix(self, zone: str, timestamp: Timestamp) -> Optional[ElectricityMix]:
+        """
+        Find the electricity mix of a zone at a given time.
+
+        Args:
+            zone: Electricity mix zone.
+            timestamp: Datetime, ISO 8601 string or POSIX timestamp.
+
+        Returns:
+            The electricity mix, or None if the zone or the time is not covered.
+        """
+        series = self.__index.get(zone)
+        if series is None:
+            return None
+        i = series.find_index(to_timestamp(timestamp))
+        if i < 0:
+            return None
+        return ElectricityMix(zone=zone, adpe=series.adpe[i], pe=series.pe[i], gwp=series.gwp[i], wue=series.wue[i])
+
+    def find_many(self, zones: Iterable[str], timestamps: Iterable[Timestamp]) -> ElectricityMixColumns:
+        """
+        Find the electricity mixes of many requests at once, e.g. to score request logs.
+
+        Args:
+            zones: Electricity mix zones.
+            timestamps: Datetimes, ISO 8601 strings or POSIX timestamps of the requests.
+
+        Returns:
+            The columns of the electricity mixes, in the order of the requests.
+        """
+        zones = list(zones)
+        columns = ElectricityMixColumns(
+            zones=zones,
+            found=[],
+            adpe=array("d"),
+            pe=array("d"),
+            gwp=array("d"),
+            wue=array("d")
+        )
+        for zone, timestamp in zip(zones, timestamps, strict=True):
+            series = self.__index.get(zone)
+            i = series.find_index(to_timestamp(timestamp)) if series is not None else -1
+            columns.found.append(i >= 0)
+            if series is None or i < 0:
+                columns.adpe.append(math.nan)
+                columns.pe.append(math.nan)
+                columns.gwp.append(math.nan)
+                columns.wue.append(math.nan)
+            else:
+                columns.adpe.append(series.adpe[i])
+                columns.pe.append(series.pe[i])
+                columns.gwp.append(series.gwp[i])
+                columns.wue.append(series.wue[i])
+        return columns
+
+    @staticmethod
+    def _parse_rows(rows: Iterable[dict[str, Any]]) -> Iterable[tuple[Timestamp, ElectricityMix]]:
+        for row in rows:
+            yield row["datetime"], ElectricityMix(
+                zone=row["zone"],
+                adpe=float(row["adpe"]),
+                pe=float(row["pe"]),
+                gwp=float(row["gwp"]),
+                wue=float(row["wue"])
+            )
+
+    @classmethod
+    def from_csv(cls, filepath: str) -> "TimeSeriesElectricityMixRepository":
+        """
+        Load electricity mixes from a CSV file with `zone`, `datetime`, `adpe`, `pe`, `gwp` and `wue` columns.
+        """
+        with open(filepath) as fd:
+            return cls(cls._parse_rows(DictReader(fd)))
+
+    @classmethod
+    def from_parquet(cls, filepath: str) -> "TimeSeriesElectricityMixRepository":
+        """
+        Load electricity mixes from a Parquet file with `zone`, `datetime`, `adpe`, `pe`, `gwp` and `wue` columns.
+        """
+        if importlib.util.find_spec("pyarrow") is None:
+            logger.error("PyArrow package is not installed. Install with `pip install pyarrow`.")
+            raise EcoLogitsError("PyArrow package is not installed.")
+
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(filepath, columns=["zone", "datetime", "adpe", "pe", "gwp", "wue"])
+        return cls(cls._parse_rows(table.to_pylist()))
+
+    @classmethod
+    def from_file(cls, filepath: str) -> "TimeSeriesElectricityMixRepository":
+        if filepath.endswith(".parquet"):
+            return cls.from_parquet(filepath)
+        return cls.from_csv(filepath)
+
+
+# Loaded on first lookup to keep imports fast
+electricity_mixes = cast(ElectricityMixRepository, LazyProxy(ElectricityMixRepository.from_csv))
@@ -0,0 +1,189 @@
+from typing import Union
+
+import numpy as np
+import numpy.typing as npt
+
+from ecologits.impacts.llm import (
+    BATCH_SIZE,
+    GPU_EMBODIED_IMPACT_ADPE,
+    GPU_EMBODIED_IMPACT_GWP,
+    GPU_EMBODIED_IMPACT_PE,
+    GPU_ENERGY_ALPHA,
+    GPU_ENERGY_BETA,
+    GPU_ENERGY_GAMMA,
+    GPU_MEMORY,
+    HARDWARE_LIFESPAN,
+    LATENCY_ALPHA,
+    LATENCY_BETA,
+    LATENCY_GAMMA,
+    MODEL_QUANTIZATION_BITS,
+    SERVER_EMBODIED_IMPACT_ADPE,
+    SERVER_EMBODIED_IMPACT_GWP,
+    SERVER_EMBODIED_IMPACT_PE,
+    SERVER_GPUS,
+    SERVER_POWER,
+    compiled_dag,
+)
+from ecologits.utils.range_array import RangeArray
+from ecologits.utils.range_value import RangeValue
+
+ArrayOrRange = Union[npt.ArrayLike, RangeValue, tuple[npt.ArrayLike, npt.ArrayLike]]
+
+IMPACT_COLUMNS = [
+    "energy",
+    "gwp",
+    "adpe",
+    "pe",
+    "wcf",
+    "usage_gwp",
+    "usage_adpe",
+    "usage_pe",
+    "embodied_gwp",
+    "embodied_adpe",
+    "embodied_pe",
+]
+
+
+def _as_range_array(value: ArrayOrRange) -> RangeArray:
+    """
+    Convert a scalar, an array, a `RangeValue` or a (min, max) tuple into an array of intervals.
+    """
+    if isinstance(value, RangeValue):
+        return RangeArray(min=value.min, max=value.max)
+    if isinstance(value, tuple):
+        return RangeArray(min=value[0], max=value[1])
+    return RangeArray(min=value, max=value)
+
+
+def compute_llm_impacts_batch(
+        model_active_parameter_count: ArrayOrRange,
+        model_total_parameter_count: ArrayOrRange,
+        output_token_count: npt.ArrayLike,
+        if_electricity_mix_adpe: npt.ArrayLike,
+        if_electricity_mix_pe: npt.ArrayLike,
+        if_electricity_mix_gwp: npt.ArrayLike,
+        if_electricity_mix_wue: npt.ArrayLike,
+        datacenter_pue: ArrayOrRange,
+        datacenter_wue: ArrayOrRange,
+        request_latency: npt.ArrayLike = np.inf,
+        model_quantization_bits: int = MODEL_QUANTIZATION_BITS,
+        gpu_energy_alpha: float = GPU_ENERGY_ALPHA,
+        gpu_energy_beta: float = GPU_ENERGY_BETA,
+        gpu_energy_gamma: float = GPU_ENERGY_GAMMA,
+        latency_alpha: float = LATENCY_ALPHA,
+        latency_beta: float = LATENCY_BETA,
+        latency_gamma: float = LATENCY_GAMMA,
+        gpu_memory: float = GPU_MEMORY,
+        gpu_embodied_gwp: float = GPU_EMBODIED_IMPACT_GWP,
+        gpu_embodied_adpe: float = GPU_EMBODIED_IMPACT_ADPE,
+        gpu_embodied_pe: float = GPU_EMBODIED_IMPACT_PE,
+        server_gpu_count: int = SERVER_GPUS,
+        server_power: float = SERVER_POWER,
+        server_embodied_gwp: float = SERVER_EMBODIED_IMPACT_GWP,
+        server_embodied_adpe: float = SERVER_EMBODIED_IMPACT_ADPE,
+        server_embodied_pe: float = SERVER_EMBODIED_IMPACT_PE,
+        server_lifetime: float = HARDWARE_LIFESPAN,
+        batch_size: float = BATCH_SIZE
+) -> dict[str, np.ndarray]:
+    """
+    Compute the impacts of many LLM generation requests at once.
+
+    Each input can be a scalar or an array with one value per request. Inputs that can be ranges (parameter
+    counts, PUE and WUE) also accept a `RangeValue` or a `(min_array, max_array)` tuple.
+
+    Args:
+        model_active_parameter_count: Number of active parameters of the model (in billion).
+        model_total_parameter_count: Number of total parameters of the model (in billion).
+        output_token_count: Number of generated tokens.
+        if_electricity_mix_adpe: ADPe impact factor of electricity consumption of kgSbeq / kWh (Antimony).
+        if_electricity_mix_pe: PE impact factor of electricity consumption in MJ / kWh.
+        if_electricity_mix_gwp: GWP impact factor of electricity consumption in kgCO2eq / kWh.
+        if_electricity_mix_wue: WCF impact factor of electricity consumption in L / kWh.
+        datacenter_pue: Power Usage Effectiveness of the data center.
+        datacenter_wue: Water Usage Effectiveness of the data center in L/kWh.
+        request_latency: Measured request latency in seconds (`inf` when unknown).
+        model_quantization_bits: Number of bits used to represent the model weights.
+        gpu_energy_alpha: Alpha coefficient of the "GPU energy" regression.
+        gpu_energy_beta: Beta coefficient of the "GPU energy" regression.
+        gpu_energy_gamma: Gamma coefficient of the "GPU energy" regression.
+        latency_alpha: Alpha coefficient of the "Latency" regression.
+        latency_beta: Beta coefficient of the "Latency" regression.
+        latency_gamma: Gamma coefficient of the "Latency" regression.
+        gpu_memory: Amount of memory available on a single GPU.
+        gpu_embodied_gwp: GWP embodied impact of a single GPU.
+        gpu_embodied_adpe: ADPe embodied impact of a single GPU.
+        gpu_embodied_pe: PE embodied impact of a single GPU.
+        server_gpu_count: Number of available GPUs in the server.
+        server_power: Power consumption of the server in kW.
+        server_embodied_gwp: GWP embodied impact of the server in kgCO2eq.
+        server_embodied_adpe: ADPe embodied impact of the server in kgSbeq.
+        server_embodied_pe: PE embodied impact of the server in MJ.
+        server_lifetime: Lifetime duration of the server in seconds.
+        batch_size: The number of requests handled concurrently by the server.
+
+    Returns:
+        Columns of impacts keyed by `<impact>_min` and `<impact>_max` (see `IMPACT_COLUMNS`), one row per request.
+    """
+    ranged = {
+        "model_active_parameter_count": _as_range_array(model_active_parameter_count),
+        "model_total_parameter_count": _as_range_array(model_total_parameter_count),
+        "datacenter_pue": _as_range_array(datacenter_pue),
+        "datacenter_wue": _as_range_array(datacenter_wue),
+    }
+    common = {
+        "output_token_count": np.asarray(output_token_count, dtype=np.float64),
+        "request_latency": np.asarray(request_latency, dtype=np.float64),
+        "if_electricity_mix_adpe": np.asarray(if_electricity_mix_adpe, dtype=np.float64),
+        "if_electricity_mix_pe": np.asarray(if_electricity_mix_pe, dtype=np.float64),
+        "if_electricity_mix_gwp": np.asarray(if_electricity_mix_gwp, dtype=np.float64),
+        "if_electricity_mix_wue": np.asarray(if_electricity_mix_wue, dtype=np.float64),
+        "model_quantization_bits": model_quantization_bits,
+        "gpu_energy_alpha": gpu_energy_alpha,
+        "gpu_energy_beta": gpu_energy_beta,
+        "gpu_energy_gamma": gpu_energy_gamma,
+        "latency_alpha": latency_alpha,
+        "latency_beta": latency_beta,
+        "latency_gamma": latency_gamma,
+        "gpu_memory": gpu_memory,
+        "gpu_embodied_gwp": gpu_embodied_gwp,
+        "gpu_embodied_adpe": gpu_embodied_adpe,
+        "gpu_embodied_pe": gpu_embodied_pe,
+        "server_gpu_count": server_gpu_count,
+        "server_power": server_power,
+        "server_embodied_gwp": server_embodied_gwp,
+        "server_embodied_adpe": server_embodied_adpe,
+        "server_embodied_pe": server_embodied_pe,
+        "server_lifetime": server_lifetime,
+        "batch_size": batch_size,
+    }
+    shape = np.broadcast_shapes(
+        *(np.shape(v) for v in common.values()),
+        *(r.shape for r in ranged.values()),
+    )
+
+    # Every step of the model is monotonically increasing with respect to the ranged inputs, so the DAG is
+    # evaluated once on arrays of intervals.
+    with np.errstate(divide="ignore"):
+        dag_results = compiled_dag.run(**ranged, **common)
+    impacts = {
+        "energy": dag_results["request_energy"],
+        "gwp": dag_results["request_usage_gwp"] + dag_results["request_embodied_gwp"],
+        "adpe": dag_results["request_usage_adpe"] + dag_results["request_embodied_adpe"],
+        "pe": dag_results["request_usage_pe"] + dag_results["request_embodied_pe"],
+        "wcf": dag_results["request_usage_wcf"],
+        "usage_gwp": dag_results["request_usage_gwp"],
+        "usage_adpe": dag_results["request_usage_adpe"],
+        "usage_pe": dag_results["request_usage_pe"],
+        "embodied_gwp": dag_results["request_embodied_gwp"],
+        "embodied_adpe": dag_results["request_embodied_adpe"],
+        "embodied_pe": dag_results["request_embodied_pe"],
+    }
+
+    results: dict[str, np.ndarray] = {}
+    for bound in ("min", "max"):
+        for column in IMPACT_COLUMNS:
+            values = getattr(impacts[column], bound)
+            if values.shape != shape or not values.flags.writeable:
+                values = np.broadcast_to(values, shape).copy()
+            results[f"{column}_{bound}"] = values
+    return results
@@ -1,6 +1,7 @@
+from collections.abc import Iterable
 from functools import wraps
 from graphlib import TopologicalSorter
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 
 
 class DAG:
@@ -42,3 +43,53 @@ class DAG:
             results[task_name] = task(**dep_results)
 
         return results
+
+    def compile(self, inputs: Optional[Iterable[str]] = None) -> "CompiledDAG":
+        """
+        Freeze the execution plan of the DAG for a given set of inputs.
+
+        Args:
+            inputs: Names of the values that will be provided by the caller, tasks with a provided value are
+                never executed. Defaults to all the nodes that are not registered as tasks. Tasks whose value is
+                provided on a run are skipped as well, as with `DAG.execute`.
+
+        Returns:
+            A reusable execution plan of the DAG.
+        """
+        if inputs is None:
+            provided = {dep for deps in self.__dependencies.values() for dep in deps} - self.__tasks.keys()
+        else:
+            provided = set(inputs)
+
+        steps = []
+        for task_name in self.build_dag().static_order():
+            if task_name in provided or task_name not in self.__tasks:
+                continue
+            steps.append((task_name, self.__tasks[task_name], tuple(self.__dependencies[task_name])))
+
+        return CompiledDAG(steps=tuple(steps), inputs=frozenset(provided))
+
+
+class CompiledDAG:
+    """
+    Execution plan of a DAG with a frozen topological order
+
+    Attributes:
+        inputs: Names of the values expected from the caller.
+    """
+
+    def __init__(self, steps: tuple[tuple[str, Callable, tuple[str, ...]], ...], inputs: frozenset[str]) -> None:
+        self.__steps = steps
+        self.inputs = inputs
+
+    def run(self, **kwargs: Any) -> dict[str, Any]:
+        results = kwargs.copy()  # Use initial params as the starting point
+
+        for task_name, task, dependencies in self.__steps:
+            if task_name in results:  # Skip execution if result already provided
+                continue
+            # Filter out None values if not all dependencies are met
+            dep_results = {dep: value for dep in dependencies if (value := results.get(dep)) is not None}
+            results[task_name] = task(**dep_results)
+
+        return results
@@ -1,8 +1,10 @@
 import math
-from typing import Any, Optional, Union, cast
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Union
 
 from ecologits.impacts.dag import DAG
 from ecologits.impacts.modeling import GWP, PE, WCF, ADPe, Embodied, Energy, Impacts, Usage
+from ecologits.utils.interval import Interval, to_interval, to_range_value
 from ecologits.utils.range_value import RangeValue, ValueOrRange
 
 MODEL_QUANTIZATION_BITS = 16
@@ -33,6 +35,41 @@ BATCH_SIZE = 64
 dag = DAG()
 
 
+def _elementwise(scalar_func: Callable[[Any], Any], ufunc_name: str) -> Callable[[Any], Any]:
+    """
+    Make a non-decreasing function applicable to numbers, ranges and NumPy arrays (including `RangeArray`).
+    """
+    def func(value: Any) -> Any:
+        if isinstance(value, (int, float)):
+            return scalar_func(value)
+        if isinstance(value, (Interval, RangeValue)):
+            return type(value)(min=scalar_func(value.min), max=scalar_func(value.max))
+        import numpy as np
+        return getattr(np, ufunc_name)(value)
+    return func
+
+
+_ceil = _elementwise(math.ceil, "ceil")
+_log2 = _elementwise(math.log2, "log2")
+_exp2 = _elementwise(lambda x: 2 ** x, "exp2")
+
+
+def _minimum(a: Any, b: Any) -> Any:
+    """
+    Element-wise minimum of numbers, ranges or NumPy arrays (including `RangeArray`).
+    """
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a if a < b else b
+    for value, other in ((a, b), (b, a)):
+        if isinstance(value, (Interval, RangeValue)):
+            if isinstance(other, (int, float)):
+                return type(value)(min=min(value.min, other), max=min(value.max, other))
+            if isinstance(other, (Interval, RangeValue)):
+                return type(value)(min=min(value.min, other.min), max=min(value.max, other.max))
+    import numpy as np
+    return np.minimum(a, b)
+
+
 @dag.asset
 def gpu_energy(
         model_active_parameter_count: float,
@@ -88,9 +125,7 @@ def generation_latency(
     """
     latency_per_token = latency_alpha * model_active_parameter_count + latency_beta * batch_size + latency_gamma
     gpu_latency = output_token_count * latency_per_token
-    if request_latency < gpu_latency:
-        return request_latency
-    return gpu_latency
+    return _minimum(request_latency, gpu_latency)
 
 
 @dag.asset
@@ -126,8 +161,8 @@ def gpu_required_count(
     Returns:
         The number of required GPUs to load the model.
     """
-    gpu_nb = math.ceil(model_required_memory / gpu_memory)
-    return 2 ** math.ceil(math.log2(gpu_nb))    # Round-up in base two
+    gpu_nb = _ceil(model_required_memory / gpu_memory)
+    return _exp2(_ceil(_log2(gpu_nb)))    # Round-up in base two
 
 
 @dag.asset
@@ -383,6 +418,9 @@ def request_embodied_pe(
     return generation_latency * server_gpu_embodied_pe / (server_lifetime * batch_size)
 
 
+compiled_dag = dag.compile()
+
+
 def compute_llm_impacts_dag(
         model_active_parameter_count: ValueOrRange,
         model_total_parameter_count: ValueOrRange,
@@ -416,6 +454,8 @@ def compute_llm_impacts_dag(
     """
     Compute the impacts dag of an LLM generation request.
 
+    Ranged inputs can be given as `RangeValue` or as `Interval`, ranged results are of the same type.
+
     Args:
         model_active_parameter_count: Number of active parameters of the model (in billion).
         model_total_parameter_count: Number of parameters of the model (in billion).
@@ -448,9 +488,14 @@ def compute_llm_impacts_dag(
     Returns:
         The environmental impacts dag with all intermediate states.
     """
-    results = dag.execute(
-        model_active_parameter_count=model_active_parameter_count,
-        model_total_parameter_count=model_total_parameter_count,
+    has_range_values = isinstance(model_active_parameter_count, RangeValue) \
+        or isinstance(model_total_parameter_count, RangeValue) \
+        or isinstance(datacenter_pue, RangeValue) \
+        or isinstance(datacenter_wue, RangeValue)
+    # Ranges are propagated as intervals to avoid validating a `RangeValue` on each operation
+    results = compiled_dag.run(
+        model_active_parameter_count=to_interval(model_active_parameter_count),
+        model_total_parameter_count=to_interval(model_total_parameter_count),
         model_quantization_bits=model_quantization_bits,
         output_token_count=output_token_count,
         request_latency=request_latency,
@@ -458,8 +503,8 @@ def compute_llm_impacts_dag(
         if_electricity_mix_adpe=if_electricity_mix_adpe,
         if_electricity_mix_pe=if_electricity_mix_pe,
         if_electricity_mix_wue=if_electricity_mix_wue,
-        datacenter_wue=datacenter_wue,
-        datacenter_pue=datacenter_pue,
+        datacenter_wue=to_interval(datacenter_wue),
+        datacenter_pue=to_interval(datacenter_pue),
         gpu_energy_alpha=gpu_energy_alpha,
         gpu_energy_beta=gpu_energy_beta,
         gpu_energy_gamma=gpu_energy_gamma,
@@ -478,6 +523,8 @@ def compute_llm_impacts_dag(
         server_lifetime=server_lifetime,
         batch_size=batch_size
     )
+    if has_range_values:
+        return {name: to_range_value(value) for name, value in results.items()}
     return results
 
 
@@ -515,62 +562,37 @@ def compute_llm_impacts(
     if request_latency is None:
         request_latency = math.inf
 
-    active_params = [model_active_parameter_count]
-    total_params = [model_total_parameter_count]
-
-    if isinstance(model_active_parameter_count, RangeValue) or isinstance(model_total_parameter_count, RangeValue):
-        if isinstance(model_active_parameter_count, RangeValue):
-            active_params = [model_active_parameter_count.min, model_active_parameter_count.max]
-        else:
-            active_params = [model_active_parameter_count, model_active_parameter_count]
-        if isinstance(model_total_parameter_count, RangeValue):
-            total_params = [model_total_parameter_count.min, model_total_parameter_count.max]
-        else:
-            total_params = [model_total_parameter_count, model_total_parameter_count]
-
-    results: dict[str, Union[RangeValue, float, int]] = {}
-    fields = ["request_energy", "request_usage_gwp", "request_usage_adpe", "request_usage_pe", "request_usage_wcf",
-              "request_embodied_gwp", "request_embodied_adpe", "request_embodied_pe"]
-    for act_param, tot_param in zip(active_params, total_params):
-        res = compute_llm_impacts_dag(
-            model_active_parameter_count=act_param,
-            model_total_parameter_count=tot_param,
-            output_token_count=output_token_count,
-            request_latency=request_latency,
-            if_electricity_mix_adpe=if_electricity_mix_adpe,
-            if_electricity_mix_pe=if_electricity_mix_pe,
-            if_electricity_mix_gwp=if_electricity_mix_gwp,
-            if_electricity_mix_wue=if_electricity_mix_wue,
-            datacenter_pue=datacenter_pue,
-            datacenter_wue=datacenter_wue,
-            **kwargs
-        )
-        for field in fields:
-            if field in results:
-                min_result = results[field]
-                max_result = res[field]
-                if isinstance(min_result, RangeValue):
-                    min_result = cast(Union[float, int], min_result.min)
-                if isinstance(max_result, RangeValue):
-                    max_result = cast(Union[float, int], max_result.max)
-                results[field] = RangeValue(min=min_result, max=max_result)
-            else:
-                results[field] = res[field]
-
-    energy = Energy(value=results["request_energy"])
-    gwp_usage = GWP(value=results["request_usage_gwp"])
-    adpe_usage = ADPe(value=results["request_usage_adpe"])
-    pe_usage = PE(value=results["request_usage_pe"])
-    wcf_usage = WCF(value=results["request_usage_wcf"])
-    gwp_embodied = GWP(value=results["request_embodied_gwp"])
-    adpe_embodied = ADPe(value=results["request_embodied_adpe"])
-    pe_embodied = PE(value=results["request_embodied_pe"])
+    # Ranges are propagated through the DAG in a single evaluation, every step being non-decreasing with respect
+    # to the ranged inputs
+    results = compute_llm_impacts_dag(
+        model_active_parameter_count=to_interval(model_active_parameter_count),
+        model_total_parameter_count=to_interval(model_total_parameter_count),
+        output_token_count=output_token_count,
+        request_latency=request_latency,
+        if_electricity_mix_adpe=if_electricity_mix_adpe,
+        if_electricity_mix_pe=if_electricity_mix_pe,
+        if_electricity_mix_gwp=if_electricity_mix_gwp,
+        if_electricity_mix_wue=if_electricity_mix_wue,
+        datacenter_pue=to_interval(datacenter_pue),
+        datacenter_wue=to_interval(datacenter_wue),
+        **kwargs
+    )
+
+    # Intervals are converted to `RangeValue` only once, when building the output
+    energy = Energy(value=to_range_value(results["request_energy"]))
+    gwp_usage = GWP(value=to_range_value(results["request_usage_gwp"]))
+    adpe_usage = ADPe(value=to_range_value(results["request_usage_adpe"]))
+    pe_usage = PE(value=to_range_value(results["request_usage_pe"]))
+    wcf_usage = WCF(value=to_range_value(results["request_usage_wcf"]))
+    gwp_embodied = GWP(value=to_range_value(results["request_embodied_gwp"]))
+    adpe_embodied = ADPe(value=to_range_value(results["request_embodied_adpe"]))
+    pe_embodied = PE(value=to_range_value(results["request_embodied_pe"]))
 
     return Impacts(
         energy=energy,
-        gwp=gwp_usage + gwp_embodied,
-        adpe=adpe_usage + adpe_embodied,
-        pe=pe_usage + pe_embodied,
+        gwp=GWP(value=to_range_value(results["request_usage_gwp"] + results["request_embodied_gwp"])),
+        adpe=ADPe(value=to_range_value(results["request_usage_adpe"] + results["request_embodied_adpe"])),
+        pe=PE(value=to_range_value(results["request_usage_pe"] + results["request_embodied_pe"])),
         wcf=wcf_usage,
         usage=Usage(
             energy=energy,
@@ -585,3 +607,244 @@ def compute_llm_impacts(
             pe=pe_embodied
         )
     )
+
+
+@dataclass(frozen=True)
+class _BoundCoefficients:
+    """
+    Terms of the impacts dag that do not depend on the output token count or on the request latency, for one bound
+    of the ranged inputs.
+    """
+    gpu_energy_per_token: float
+    latency_per_token: float
+    gpu_required_count: int
+    server_power: float
+    server_gpu_ratio: float
+    inverse_batch_size: float
+    datacenter_pue: float
+    if_electricity_mix_gwp: float
+    if_electricity_mix_adpe: float
+    if_electricity_mix_pe: float
+    wcf_factor: float
+    server_gpu_embodied_gwp: float
+    server_gpu_embodied_adpe: float
+    server_gpu_embodied_pe: float
+    embodied_denominator: float
+
+    def compute(self, output_token_count: float, request_latency: float) -> tuple[float, ...]:
+        # Same operations, in the same order, as the assets of the impacts dag
+        gpu_energy = output_token_count * self.gpu_energy_per_token
+        gpu_latency = output_token_count * self.latency_per_token
+        generation_latency = request_latency if request_latency < gpu_latency else gpu_latency
+        server_energy = (generation_latency / 3600) * self.server_power * self.server_gpu_ratio * \
+            self.inverse_batch_size
+        request_energy = self.datacenter_pue * (server_energy + self.gpu_required_count * gpu_energy)
+        return (
+            request_energy,
+            request_energy * self.if_electricity_mix_gwp,
+            request_energy * self.if_electricity_mix_adpe,
+            request_energy * self.if_electricity_mix_pe,
+            request_energy * self.wcf_factor,
+            generation_latency * self.server_gpu_embodied_gwp / self.embodied_denominator,
+            generation_latency * self.server_gpu_embodied_adpe / self.embodied_denominator,
+            generation_latency * self.server_gpu_embodied_pe / self.embodied_denominator,
+        )
+
+
+class LLMImpactsCoefficients:
+    """
+    Precomputed terms of the impacts of an LLM generation request for a given model and electricity mix.
+
+    Computing the impacts from the coefficients only costs a few arithmetic operations and gives the same results
+    as `compute_llm_impacts`.
+    """
+
+    def __init__(
+            self,
+            bounds: list[_BoundCoefficients],
+            energy_is_range: bool,
+            wcf_is_range: bool,
+            embodied_is_range: bool
+    ) -> None:
+        self.__bounds = bounds
+        self.__energy_is_range = energy_is_range
+        self.__wcf_is_range = wcf_is_range
+        self.__embodied_is_range = embodied_is_range
+
+    def compute_values(
+            self,
+            output_token_count: float,
+            request_latency: Optional[float] = None
+    ) -> tuple[ValueOrRange, ...]:
+        """
+        Compute the impact values of an LLM generation request.
+
+        Args:
+            output_token_count: Number of generated tokens.
+            request_latency: Measured request latency in seconds.
+
+        Returns:
+            The energy, usage GWP, ADPe, PE and WCF and embodied GWP, ADPe and PE values.
+        """
+        return tuple(to_range_value(value) for value in self._compute_intervals(output_token_count, request_latency))
+
+    def _compute_intervals(
+            self,
+            output_token_count: float,
+            request_latency: Optional[float] = None
+    ) -> tuple[Union[Interval, float], ...]:
+        if request_latency is None:
+            request_latency = math.inf
+
+        values = [bound.compute(output_token_count, request_latency) for bound in self.__bounds]
+        if len(values) == 1:
+            return values[0]
+
+        low, high = values
+        is_range = (self.__energy_is_range, ) * 4 + (self.__wcf_is_range, ) + (self.__embodied_is_range, ) * 3
+        return tuple(
+            Interval(low[i], high[i]) if is_range[i] else low[i]
+            for i in range(len(low))
+        )
+
+    def compute(self, output_token_count: float, request_latency: Optional[float] = None) -> Impacts:
+        """
+        Compute the impacts of an LLM generation request.
+
+        Args:
+            output_token_count: Number of generated tokens.
+            request_latency: Measured request latency in seconds.
+
+        Returns:
+            The impacts of an LLM generation request.
+        """
+        energy_value, gwp_usage_value, adpe_usage_value, pe_usage_value, wcf_value, gwp_embodied_value, \
+            adpe_embodied_value, pe_embodied_value = self._compute_intervals(output_token_count, request_latency)
+
+        energy = Energy(value=to_range_value(energy_value))
+        gwp_usage = GWP(value=to_range_value(gwp_usage_value))
+        adpe_usage = ADPe(value=to_range_value(adpe_usage_value))
+        pe_usage = PE(value=to_range_value(pe_usage_value))
+        wcf_usage = WCF(value=to_range_value(wcf_value))
+        gwp_embodied = GWP(value=to_range_value(gwp_embodied_value))
+        adpe_embodied = ADPe(value=to_range_value(adpe_embodied_value))
+        pe_embodied = PE(value=to_range_value(pe_embodied_value))
+
+        return Impacts(
+            energy=energy,
+            gwp=GWP(value=to_range_value(gwp_usage_value + gwp_embodied_value)),
+            adpe=ADPe(value=to_range_value(adpe_usage_value + adpe_embodied_value)),
+            pe=PE(value=to_range_value(pe_usage_value + pe_embodied_value)),
+            wcf=wcf_usage,
+            usage=Usage(
+                energy=energy,
+                gwp=gwp_usage,
+                adpe=adpe_usage,
+                pe=pe_usage,
+                wcf=wcf_usage
+            ),
+            embodied=Embodied(
+                gwp=gwp_embodied,
+                adpe=adpe_embodied,
+                pe=pe_embodied
+            )
+        )
+
+
+def _bounds(value: ValueOrRange) -> tuple[float, float]:
+    if isinstance(value, RangeValue):
+        return value.min, value.max
+    return value, value
+
+
+def compute_llm_impacts_coefficients(
+        model_active_parameter_count: ValueOrRange,
+        model_total_parameter_count: ValueOrRange,
+        if_electricity_mix_adpe: float,
+        if_electricity_mix_pe: float,
+        if_electricity_mix_gwp: float,
+        if_electricity_mix_wue: float,
+        datacenter_pue: ValueOrRange,
+        datacenter_wue: ValueOrRange,
+        server_gpu_count: int = SERVER_GPUS,
+        server_power: float = SERVER_POWER,
+        server_lifetime: float = HARDWARE_LIFESPAN,
+        batch_size: float = BATCH_SIZE,
+        **kwargs: Any
+) -> LLMImpactsCoefficients:
+    """
+    Precompute the terms of the impacts of an LLM generation request that do not depend on the output token count
+    or on the request latency.
+
+    Args:
+        model_active_parameter_count: Number of active parameters of the model (in billion).
+        model_total_parameter_count: Number of total parameters of the model (in billion).
+        if_electricity_mix_adpe: ADPe impact factor of electricity consumption of kgSbeq / kWh (Antimony).
+        if_electricity_mix_pe: PE impact factor of electricity consumption in MJ / kWh.
+        if_electricity_mix_gwp: GWP impact factor of electricity consumption in kgCO2eq / kWh.
+        if_electricity_mix_wue: WCF impact factor of electricity consumption in L / kWh.
+        datacenter_pue: Power Usage Effectiveness of the data center.
+        datacenter_wue: Water Usage Effectiveness of the data center in L/kWh.
+        server_gpu_count: Number of available GPUs in the server.
+        server_power: Power consumption of the server in kW.
+        server_lifetime: Lifetime duration of the server in seconds.
+        batch_size: The number of requests handled concurrently by the server.
+        **kwargs: Any other optional parameter of `compute_llm_impacts_dag`.
+
+    Returns:
+        The coefficients of the impacts of an LLM generation request.
+    """
+    params_is_range = isinstance(model_active_parameter_count, RangeValue) \
+        or isinstance(model_total_parameter_count, RangeValue)
+    energy_is_range = params_is_range or isinstance(datacenter_pue, RangeValue)
+    wcf_is_range = energy_is_range or isinstance(datacenter_wue, RangeValue)
+
+    active_params = _bounds(model_active_parameter_count)
+    total_params = _bounds(model_total_parameter_count)
+    pue = _bounds(datacenter_pue)
+    wue = _bounds(datacenter_wue)
+
+    bounds = []
+    for i in range(2 if wcf_is_range else 1):
+        # Intermediate states of the dag for a single token without latency cap are the per-token terms
+        results = compute_llm_impacts_dag(
+            model_active_parameter_count=active_params[i],
+            model_total_parameter_count=total_params[i],
+            output_token_count=1,
+            request_latency=math.inf,
+            if_electricity_mix_adpe=if_electricity_mix_adpe,
+            if_electricity_mix_pe=if_electricity_mix_pe,
+            if_electricity_mix_gwp=if_electricity_mix_gwp,
+            if_electricity_mix_wue=if_electricity_mix_wue,
+            datacenter_pue=pue[i],
+            datacenter_wue=wue[i],
+            server_gpu_count=server_gpu_count,
+            server_power=server_power,
+            server_lifetime=server_lifetime,
+            batch_size=batch_size,
+            **kwargs
+        )
+        bounds.append(_BoundCoefficients(
+            gpu_energy_per_token=results["gpu_energy"],
+            latency_per_token=results["generation_latency"],
+            gpu_required_count=results["gpu_required_count"],
+            server_power=server_power,
+            server_gpu_ratio=results["gpu_required_count"] / server_gpu_count,
+            inverse_batch_size=1 / batch_size,
+            datacenter_pue=pue[i],
+            if_electricity_mix_gwp=if_electricity_mix_gwp,
+            if_electricity_mix_adpe=if_electricity_mix_adpe,
+            if_electricity_mix_pe=if_electricity_mix_pe,
+            wcf_factor=wue[i] + pue[i] * if_electricity_mix_wue,
+            server_gpu_embodied_gwp=results["server_gpu_embodied_gwp"],
+            server_gpu_embodied_adpe=results["server_gpu_embodied_adpe"],
+            server_gpu_embodied_pe=results["server_gpu_embodied_pe"],
+            embodied_denominator=server_lifetime * batch_size,
+        ))
+
+    return LLMImpactsCoefficients(
+        bounds=bounds,
+        energy_is_range=energy_is_range,
+        wcf_is_range=wcf_is_range,
+        embodied_is_range=params_is_range
+    )
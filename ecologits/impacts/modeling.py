@@ -226,3 +226,37 @@ class Impacts(BaseModel):
     wcf: WCF
     usage: Usage
     embodied: Embodied
+
+
+class Percentiles(BaseModel):
+    """
+    Percentiles of an impact estimated by Monte Carlo sampling.
+
+    Attributes:
+        p5: 5th percentile
+        p50: Median
+        p95: 95th percentile
+    """
+    p5: float
+    p50: float
+    p95: float
+
+
+class ImpactsPercentiles(BaseModel):
+    """
+    Percentiles of the total impacts estimated by Monte Carlo sampling of the uncertain inputs.
+
+    Attributes:
+        samples: Number of samples
+        energy: Percentiles of the energy consumption in kWh
+        gwp: Percentiles of the Global Warming Potential (GWP) impact in kgCO2eq
+        adpe: Percentiles of the Abiotic Depletion Potential for Elements (ADPe) impact in kgSbeq
+        pe: Percentiles of the Primary Energy (PE) impact in MJ
+        wcf: Percentiles of the Water Consumption Footprint (WCF) impact in L
+    """
+    samples: int
+    energy: Percentiles
+    gwp: Percentiles
+    adpe: Percentiles
+    pe: Percentiles
+    wcf: Percentiles
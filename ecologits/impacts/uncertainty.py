@@ -0,0 +1,231 @@
+from threading import Lock
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from ecologits.exceptions import ModelingError
+from ecologits.impacts.llm import (
+    BATCH_SIZE,
+    GPU_EMBODIED_IMPACT_ADPE,
+    GPU_EMBODIED_IMPACT_GWP,
+    GPU_EMBODIED_IMPACT_PE,
+    GPU_ENERGY_ALPHA,
+    GPU_ENERGY_BETA,
+    GPU_ENERGY_GAMMA,
+    GPU_MEMORY,
+    HARDWARE_LIFESPAN,
+    LATENCY_ALPHA,
+    LATENCY_BETA,
+    LATENCY_GAMMA,
+    MODEL_QUANTIZATION_BITS,
+    SERVER_EMBODIED_IMPACT_ADPE,
+    SERVER_EMBODIED_IMPACT_GWP,
+    SERVER_EMBODIED_IMPACT_PE,
+    SERVER_GPUS,
+    SERVER_POWER,
+    compiled_dag,
+)
+from ecologits.impacts.modeling import ImpactsPercentiles, Percentiles
+from ecologits.log import logger
+from ecologits.utils.range_value import RangeValue, ValueOrRange
+
+UnitDistribution = Callable[[np.random.Generator, int], np.ndarray]
+
+# Enough samples for percentiles within a fraction of a percent, evaluating many more is several times slower
+DEFAULT_SAMPLES = 4_096
+PERCENTILES = (5, 50, 95)
+
+# The active and total parameter counts share the same draw, a larger model being larger on both counts
+UNCERTAIN_INPUTS = ("model_parameter_count", "datacenter_pue", "datacenter_wue")
+
+IMPACTS = ("energy", "gwp", "adpe", "pe", "wcf")
+
+# Default parameters of the impacts DAG, the samples are evaluated on the compiled DAG directly since the conversions
+# of `compute_llm_impacts_dag` are only needed for ranges
+_DAG_DEFAULTS = {
+    "model_quantization_bits": MODEL_QUANTIZATION_BITS,
+    "gpu_energy_alpha": GPU_ENERGY_ALPHA,
+    "gpu_energy_beta": GPU_ENERGY_BETA,
+    "gpu_energy_gamma": GPU_ENERGY_GAMMA,
+    "latency_alpha": LATENCY_ALPHA,
+    "latency_beta": LATENCY_BETA,
+    "latency_gamma": LATENCY_GAMMA,
+    "gpu_memory": GPU_MEMORY,
+    "gpu_embodied_gwp": GPU_EMBODIED_IMPACT_GWP,
+    "gpu_embodied_adpe": GPU_EMBODIED_IMPACT_ADPE,
+    "gpu_embodied_pe": GPU_EMBODIED_IMPACT_PE,
+    "server_gpu_count": SERVER_GPUS,
+    "server_power": SERVER_POWER,
+    "server_embodied_gwp": SERVER_EMBODIED_IMPACT_GWP,
+    "server_embodied_adpe": SERVER_EMBODIED_IMPACT_ADPE,
+    "server_embodied_pe": SERVER_EMBODIED_IMPACT_PE,
+    "server_lifetime": HARDWARE_LIFESPAN,
+    "batch_size": BATCH_SIZE,
+}
+
+_rng = np.random.default_rng()
+_rng_lock = Lock()
+
+
+def uniform() -> UnitDistribution:
+    """
+    Uniform distribution over the range (default).
+    """
+    def sample(rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.random(size, dtype=np.float32)
+    return sample
+
+
+def triangular(mode: float = 0.5) -> UnitDistribution:
+    """
+    Triangular distribution over the range.
+
+    Args:
+        mode: Position of the most likely value in the range, from 0 (min) to 1 (max).
+    """
+    def sample(rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.triangular(0, mode, 1, size)
+    return sample
+
+
+def beta(a: float, b: float) -> UnitDistribution:
+    """
+    Beta distribution over the range.
+
+    Args:
+        a: Alpha parameter of the distribution.
+        b: Beta parameter of the distribution.
+    """
+    def sample(rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.beta(a, b, size)
+    return sample
+
+
+def _scale(value: ValueOrRange, quantiles: np.ndarray) -> Any:
+    if isinstance(value, RangeValue):
+        return quantiles.astype(np.float32, copy=False) * (value.max - value.min) + value.min
+    return value
+
+
+def _percentiles(samples: np.ndarray, percentiles: tuple[float, ...]) -> np.ndarray:
+    # Same as the default (linear) method of `np.percentile`, which is much slower for several percentiles. The
+    # samples are sorted in place.
+    samples.sort(axis=-1)
+    positions = np.asarray(percentiles) / 100 * (samples.shape[-1] - 1)
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.minimum(lower + 1, samples.shape[-1] - 1)
+    weights = positions - lower
+    return samples[..., lower] * (1 - weights) + samples[..., upper] * weights
+
+
+def sample_llm_impacts(
+        model_active_parameter_count: ValueOrRange,
+        model_total_parameter_count: ValueOrRange,
+        output_token_count: float,
+        if_electricity_mix_adpe: float,
+        if_electricity_mix_pe: float,
+        if_electricity_mix_gwp: float,
+        if_electricity_mix_wue: float,
+        datacenter_pue: ValueOrRange,
+        datacenter_wue: ValueOrRange,
+        request_latency: Optional[float] = None,
+        samples: int = DEFAULT_SAMPLES,
+        distributions: Optional[dict[str, UnitDistribution]] = None,
+        rng: Optional[np.random.Generator] = None,
+        **kwargs: Any
+) -> dict[str, np.ndarray]:
+    """
+    Sample the total impacts of an LLM generation request from the distributions of its uncertain inputs.
+
+    The ranged inputs are sampled from distributions defined on the unit interval and scaled to their range, and the
+    impacts DAG is evaluated once on the arrays of samples. Inputs that are not ranged are used as is. Samples are
+    drawn in single precision, which is more than enough to estimate percentiles and twice as fast to evaluate.
+
+    Args:
+        model_active_parameter_count: Number of active parameters of the model (in billion).
+        model_total_parameter_count: Number of total parameters of the model (in billion).
+        output_token_count: Number of generated tokens.
+        if_electricity_mix_adpe: ADPe impact factor of electricity consumption of kgSbeq / kWh (Antimony).
+        if_electricity_mix_pe: PE impact factor of electricity consumption in MJ / kWh.
+        if_electricity_mix_gwp: GWP impact factor of electricity consumption in kgCO2eq / kWh.
+        if_electricity_mix_wue: WCF impact factor of electricity consumption in L / kWh.
+        datacenter_pue: Power Usage Effectiveness of the data center.
+        datacenter_wue: Water Usage Effectiveness of the data center in L/kWh.
+        request_latency: Measured request latency in seconds.
+        samples: Number of samples.
+        distributions: Distributions of the uncertain inputs (see `UNCERTAIN_INPUTS`), uniform by default.
+        rng: Random number generator, a shared generator by default.
+        **kwargs: Any other optional parameter of the impacts DAG.
+
+    Returns:
+        The samples of the total impacts keyed by `energy`, `gwp`, `adpe`, `pe` and `wcf`.
+    """
+    distributions = distributions or {}
+    unknown_inputs = set(distributions) - set(UNCERTAIN_INPUTS)
+    if unknown_inputs:
+        logger.error(f"Unknown uncertain inputs {sorted(unknown_inputs)}, must be among {UNCERTAIN_INPUTS}.")
+        raise ModelingError(f"Unknown uncertain inputs {sorted(unknown_inputs)}.")
+    if request_latency is None:
+        request_latency = np.inf
+
+    ranged_inputs = {
+        "model_parameter_count": isinstance(model_active_parameter_count, RangeValue)
+        or isinstance(model_total_parameter_count, RangeValue),
+        "datacenter_pue": isinstance(datacenter_pue, RangeValue),
+        "datacenter_wue": isinstance(datacenter_wue, RangeValue),
+    }
+    quantiles = {}
+    if rng is None:
+        with _rng_lock:
+            for name, is_ranged in ranged_inputs.items():
+                if is_ranged:
+                    quantiles[name] = distributions.get(name, uniform())(_rng, samples)
+    else:
+        for name, is_ranged in ranged_inputs.items():
+            if is_ranged:
+                quantiles[name] = distributions.get(name, uniform())(rng, samples)
+
+    parameter_quantiles = quantiles.get("model_parameter_count")
+    results = compiled_dag.run(**{
+        **_DAG_DEFAULTS,
+        **kwargs,
+        "model_active_parameter_count": _scale(model_active_parameter_count, parameter_quantiles),
+        "model_total_parameter_count": _scale(model_total_parameter_count, parameter_quantiles),
+        "output_token_count": output_token_count,
+        "request_latency": request_latency,
+        "if_electricity_mix_adpe": if_electricity_mix_adpe,
+        "if_electricity_mix_pe": if_electricity_mix_pe,
+        "if_electricity_mix_gwp": if_electricity_mix_gwp,
+        "if_electricity_mix_wue": if_electricity_mix_wue,
+        "datacenter_pue": _scale(datacenter_pue, quantiles.get("datacenter_pue")),
+        "datacenter_wue": _scale(datacenter_wue, quantiles.get("datacenter_wue")),
+    })
+    impacts = np.empty((len(IMPACTS), samples), dtype=np.float32)
+    impacts[0] = results["request_energy"]
+    np.add(results["request_usage_gwp"], results["request_embodied_gwp"], out=impacts[1])
+    np.add(results["request_usage_adpe"], results["request_embodied_adpe"], out=impacts[2])
+    np.add(results["request_usage_pe"], results["request_embodied_pe"], out=impacts[3])
+    impacts[4] = results["request_usage_wcf"]
+    return dict(zip(IMPACTS, impacts))
+
+
+def compute_llm_impacts_percentiles(
+        samples: int = DEFAULT_SAMPLES,
+        **kwargs: Any
+) -> ImpactsPercentiles:
+    """
+    Estimate the percentiles of the total impacts of an LLM generation request by Monte Carlo sampling.
+
+    Args:
+        samples: Number of samples.
+        **kwargs: Parameters of the request, see `sample_llm_impacts`.
+
+    Returns:
+        The 5th, 50th and 95th percentiles of the total impacts.
+    """
+    impacts = sample_llm_impacts(samples=samples, **kwargs)
+    percentiles = _percentiles(np.stack([impacts[name] for name in IMPACTS]), PERCENTILES).tolist()
+    return ImpactsPercentiles(
+        samples=samples,
+        **{name: Percentiles(p5=p5, p50=p50, p95=p95) for name, (p5, p50, p95) in zip(IMPACTS, percentiles)}
+    )
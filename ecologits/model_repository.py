@@ -1,12 +1,24 @@
+import hashlib
 import json
 import os
+import struct
 from enum import Enum
-from typing import Any, Optional, Union
+from threading import Lock
+from typing import Any, Optional, Union, cast
 
 from pydantic import BaseModel
 
+from ecologits.log import logger
 from ecologits.status_messages import WarningMessage
-from ecologits.utils.range_value import ValueOrRange
+from ecologits.utils.lazy import LazyProxy
+from ecologits.utils.range_value import RangeValue, ValueOrRange
+
+_DATA_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "data")
+DEFAULT_MODELS_JSON_PATH = os.path.join(_DATA_DIR, "models.json")
+DEFAULT_MODELS_SNAPSHOT_PATH = os.path.join(_DATA_DIR, "models.snapshot")
+
+SNAPSHOT_MAGIC = b"ECOLOGITS-MODELS"
+SNAPSHOT_VERSION = 1
 
 
 class Providers(Enum):
@@ -84,7 +96,9 @@ class ModelRepository:
     """
 
     def __init__(self, models: Optional[list[Model]] = None, aliases: Optional[list[Alias]] = None) -> None:
-        self.__models: dict[tuple[str, str], Model] = {}
+        # Models loaded from a snapshot are stored as their offset in the snapshot until they are looked up
+        self.__models: dict[tuple[str, str], Union[Model, int]] = {}
+        self.__snapshot: Optional[_SnapshotReader] = None
         if models is not None:
             for m in models:
                 key = m.provider.value, m.name
@@ -98,7 +112,7 @@ class ModelRepository:
                 if model_key not in self.__models:
                     raise ValueError(f"model alias not found: {model_key}")
                 alias_key = a.provider.value, a.name
-                model = self.__models[model_key].model_copy()
+                model = cast(Model, self.__models[model_key]).model_copy()
                 model.name = a.name
                 self.__models[alias_key] = model
 
@@ -110,33 +124,260 @@ class ModelRepository:
         self.__models[key] = model
 
     def find_model(self, provider: str, model_name: str) -> Optional[Model]:
-        return self.__models.get((provider, model_name))
+        model = self.__models.get((provider, model_name))
+        if isinstance(model, int):
+            return self.__load_snapshot_model((provider, model_name), model)
+        return model
 
     def list_models(self) -> list[Model]:
-        return list(self.__models.values())
+        return [
+            self.__load_snapshot_model(key, model) if isinstance(model, int) else model
+            for key, model in self.__models.items()
+        ]
+
+    def __load_snapshot_model(self, key: tuple[str, str], offset: int) -> Model:
+        model = cast(_SnapshotReader, self.__snapshot).read_model(offset)
+        self.__models[key] = model
+        return model
 
     @classmethod
     def from_json(cls, filepath: Optional[str] = None) -> "ModelRepository":
         if filepath is None:
-            filepath = os.path.join(
-                os.path.dirname(os.path.realpath(__file__)), "data", "models.json"
-            )
+            filepath = DEFAULT_MODELS_JSON_PATH
         with open(filepath) as fd:
             data = json.load(fd)
+        return cls._from_json_data(data)
 
-            alias_list = []
-            if "aliases" in data and data["aliases"] is not None:
-                for alias in data["aliases"]:
-                    alias_list.append(Alias.model_validate(alias))
+    @classmethod
+    def _from_json_data(cls, data: dict[str, Any]) -> "ModelRepository":
+        alias_list = []
+        if "aliases" in data and data["aliases"] is not None:
+            for alias in data["aliases"]:
+                alias_list.append(Alias.model_validate(alias))
 
-            model_list = []
-            if "models" in data and data["models"] is not None:
-                for model in data["models"]:
-                    model_list.append(Model.from_json(model))
+        model_list = []
+        if "models" in data and data["models"] is not None:
+            for model in data["models"]:
+                model_list.append(Model.from_json(model))
 
         if len(model_list) == 0:
             raise ValueError("Cannot initialize on an empty model repository.")
         return cls(models=model_list, aliases=alias_list)
 
+    def to_snapshot(self, filepath: str, json_filepath: str) -> None:
+        """
+        Write the repository to a binary snapshot, to be loaded without validation with `from_snapshot`.
+
+        Args:
+            filepath: Path of the snapshot.
+            json_filepath: Path of the JSON file the repository was loaded from, to detect stale snapshots.
+        """
+        with open(json_filepath, "rb") as fd:
+            digest = hashlib.sha256(fd.read()).digest()
+
+        # Records of the models, preceded by an index of their offsets to load them on demand
+        records = _SnapshotWriter()
+        index = _SnapshotWriter()
+        for (provider, model_name), model in self.__models.items():
+            index.write_str(provider)
+            index.write_str(model_name)
+            index.buffer += struct.pack("<I", len(records.buffer))
+            records.write_model(cast(Model, model))
+
+        with open(filepath, "wb") as fd:
+            fd.write(SNAPSHOT_MAGIC)
+            fd.write(struct.pack("<H32sI", SNAPSHOT_VERSION, digest, len(self.__models)))
+            fd.write(index.buffer)
+            fd.write(records.buffer)
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        filepath: Optional[str] = None,
+        json_filepath: Optional[str] = None
+    ) -> "ModelRepository":
+        """
+        Load the repository from a binary snapshot, or from the JSON file if the snapshot is missing or stale.
+
+        Only the index of the snapshot is read at load time, each model is read on its first lookup without
+        validation.
+
+        Args:
+            filepath: Path of the snapshot.
+            json_filepath: Path of the JSON file the snapshot was built from.
+
+        Returns:
+            The repository of models.
+        """
+        if filepath is None:
+            filepath = DEFAULT_MODELS_SNAPSHOT_PATH
+        if json_filepath is None:
+            json_filepath = DEFAULT_MODELS_JSON_PATH
+        with open(json_filepath, "rb") as fd:
+            json_data = fd.read()
+
+        try:
+            with open(filepath, "rb") as fd:
+                reader = _SnapshotReader(fd.read())
+            offsets = reader.read_index(hashlib.sha256(json_data).digest())
+        except (OSError, ValueError, struct.error) as e:
+            logger.debug_once(f"Could not load models snapshot ({e}), loading models from JSON.")
+            return cls._from_json_data(json.loads(json_data))
+
+        repository = cls()
+        repository.__snapshot = reader
+        repository.__models.update(offsets)
+        return repository
+
+
+class _SnapshotWriter:
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+
+    def write_str(self, value: str) -> None:
+        data = value.encode()
+        self.buffer += struct.pack("<H", len(data))
+        self.buffer += data
+
+    def write_number(self, value: Union[int, float]) -> None:
+        if isinstance(value, int):
+            self.buffer += struct.pack("<cq", b"i", value)
+        else:
+            self.buffer += struct.pack("<cd", b"d", value)
+
+    def write_value_or_range(self, value: ValueOrRange) -> None:
+        if isinstance(value, RangeValue):
+            self.buffer += b"r"
+            self.write_number(value.min)
+            self.write_number(value.max)
+        else:
+            self.buffer += b"v"
+            self.write_number(value)
+
+    def write_model(self, model: Model) -> None:
+        self.write_str(model.provider.value)
+        self.write_str(model.name)
+        self.write_str(model.architecture.type.value)
+        parameters = model.architecture.parameters
+        if isinstance(parameters, ParametersMoE):
+            self.buffer += b"m"
+            self.write_value_or_range(parameters.total)
+            self.write_value_or_range(parameters.active)
+        else:
+            self.buffer += b"p"
+            self.write_value_or_range(parameters)
+        self.buffer += struct.pack("<H", len(model.warnings))
+        for warning in model.warnings:
+            self.write_str(warning.code)
+        self.buffer += struct.pack("<H", len(model.sources))
+        for source in model.sources:
+            self.write_str(source)
+
+
+class _SnapshotReader:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.offset = 0
+        self.records_offset = 0
+        self.lock = Lock()
+
+    def read(self, fmt: str) -> tuple[Any, ...]:
+        values = struct.unpack_from(fmt, self.data, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return values
+
+    def read_tag(self) -> bytes:
+        tag = self.data[self.offset:self.offset + 1]
+        self.offset += 1
+        return tag
+
+    def read_str(self) -> str:
+        (length,) = self.read("<H")
+        value = self.data[self.offset:self.offset + length].decode()
+        self.offset += length
+        return value
+
+    def read_number(self) -> Union[int, float]:
+        tag = self.read_tag()
+        if tag == b"i":
+            return cast(int, self.read("<q")[0])
+        if tag == b"d":
+            return cast(float, self.read("<d")[0])
+        raise ValueError(f"invalid number tag: {tag!r}")
+
+    def read_value_or_range(self) -> ValueOrRange:
+        tag = self.read_tag()
+        if tag == b"r":
+            return RangeValue.model_construct(min=self.read_number(), max=self.read_number())
+        if tag == b"v":
+            return self.read_number()
+        raise ValueError(f"invalid value tag: {tag!r}")
+
+    def read_index(self, json_digest: bytes) -> dict[tuple[str, str], int]:
+        if not self.data.startswith(SNAPSHOT_MAGIC):
+            raise ValueError("not a models snapshot")
+        self.offset = len(SNAPSHOT_MAGIC)
+        version, digest, model_count = self.read("<H32sI")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version {version}")
+        if digest != json_digest:
+            raise ValueError("stale snapshot")
+
+        offsets = {}
+        for _ in range(model_count):
+            key = self.read_str(), self.read_str()
+            (offsets[key],) = self.read("<I")
+        self.records_offset = self.offset
+        return offsets
+
+    def read_model(self, offset: int) -> Model:
+        with self.lock:
+            self.offset = self.records_offset + offset
+            return self._read_model()
+
+    def _read_model(self) -> Model:
+        provider = Providers(self.read_str())
+        name = self.read_str()
+        architecture_type = ArchitectureTypes(self.read_str())
+        parameters: Union[ValueOrRange, ParametersMoE]
+        tag = self.read_tag()
+        if tag == b"m":
+            parameters = ParametersMoE.model_construct(
+                total=self.read_value_or_range(),
+                active=self.read_value_or_range()
+            )
+        elif tag == b"p":
+            parameters = self.read_value_or_range()
+        else:
+            raise ValueError(f"invalid parameters tag: {tag!r}")
+        (warning_count,) = self.read("<H")
+        warnings = [WarningMessage.from_code(self.read_str()) for _ in range(warning_count)]
+        (source_count,) = self.read("<H")
+        sources = [self.read_str() for _ in range(source_count)]
+        # Entries were validated when the snapshot was built
+        return Model.model_construct(
+            provider=provider,
+            name=name,
+            architecture=Architecture.model_construct(type=architecture_type, parameters=parameters),
+            warnings=warnings,
+            sources=sources
+        )
+
+
+def build_snapshot(json_filepath: Optional[str] = None, filepath: Optional[str] = None) -> None:
+    """
+    Build the binary snapshot of the models JSON file (run `make models-snapshot` after editing `models.json`).
+
+    Args:
+        json_filepath: Path of the models JSON file.
+        filepath: Path of the snapshot.
+    """
+    if json_filepath is None:
+        json_filepath = DEFAULT_MODELS_JSON_PATH
+    if filepath is None:
+        filepath = DEFAULT_MODELS_SNAPSHOT_PATH
+    ModelRepository.from_json(json_filepath).to_snapshot(filepath, json_filepath)
+
 
-models = ModelRepository.from_json()
+# Loaded on first lookup to keep imports fast
+models = cast(ModelRepository, LazyProxy(ModelRepository.from_snapshot))
@@ -13,7 +13,7 @@ from typing_extensions import override
 from wrapt import wrap_function_wrapper  # type: ignore[import-untyped]
 
 from ecologits._ecologits import EcoLogits
-from ecologits.tracers.utils import ImpactsOutput, llm_impacts
+from ecologits.tracers.utils import ImpactsOutput, StreamTimer, attach_impacts, llm_impacts, record_request
 
 PROVIDER = "anthropic"
 
@@ -36,7 +36,7 @@ class MessageStream(_MessageStream):
 
     @override
     def __stream_text__(self) -> Iterator[str]:  # type: ignore[misc]
-        timer_start = time.perf_counter()
+        timer = StreamTimer()
         output_tokens = 0
         model_name = None
         input_tokens = 0
@@ -49,28 +49,32 @@ class MessageStream(_MessageStream):
             elif type(chunk) is MessageDeltaEvent:
                 output_tokens += chunk.usage.output_tokens
             elif chunk.type == "content_block_delta" and chunk.delta.type == "text_delta":
+                timer.tick()
                 yield chunk.delta.text
-        request_latency = time.perf_counter() - timer_start
+        timer.stop()
         if model_name is not None:
             impacts = llm_impacts(
                 provider=PROVIDER,
                 model_name=model_name,
                 output_token_count=output_tokens,
-                request_latency=request_latency,
+                request_latency=timer.impacts_latency,
                 electricity_mix_zone=EcoLogits.config.electricity_mix_zone
             )
+            if impacts is not None:
+                impacts.timings = timer.timings()
             self.impacts = impacts
 
             if impacts is not None \
-                and EcoLogits.config.opentelemetry:
-                    EcoLogits.config.opentelemetry.record_request(
+                and EcoLogits.config.records_requests:
+                    record_request(
                         input_tokens=input_tokens,
                         output_tokens=output_tokens,
-                        request_latency=request_latency,
+                        request_latency=timer.total_time,
                         impacts=impacts,
                         provider=PROVIDER,
                         model=model_name,
-                        endpoint="/messages"
+                        endpoint="/messages",
+                        timings=impacts.timings
                     )
 
 
@@ -83,7 +87,7 @@ class AsyncMessageStream(_AsyncMessageStream):
 
     @override
     async def __stream_text__(self) -> AsyncIterator[str]:  # type: ignore[misc]
-        timer_start = time.perf_counter()
+        timer = StreamTimer()
         output_tokens = 0
         model_name = None
         input_tokens = 0
@@ -96,28 +100,33 @@ class AsyncMessageStream(_AsyncMessageStream):
             elif type(chunk) is MessageDeltaEvent:
                 output_tokens += chunk.usage.output_tokens
             elif chunk.type == "content_block_delta" and chunk.delta.type == "text_delta":
+                timer.tick()
                 yield chunk.delta.text
-        request_latency = time.perf_counter() - timer_start
+        timer.stop()
         if model_name is not None:
             impacts = llm_impacts(
                 provider=PROVIDER,
                 model_name=model_name,
                 output_token_count=output_tokens,
-                request_latency=request_latency,
-                electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+                request_latency=timer.impacts_latency,
+                electricity_mix_zone=EcoLogits.config.electricity_mix_zone,
+                background=True
             )
+            if impacts is not None:
+                impacts.timings = timer.timings()
             self.impacts = impacts
 
             if impacts is not None \
-                and EcoLogits.config.opentelemetry:
-                    EcoLogits.config.opentelemetry.record_request(
+                and EcoLogits.config.records_requests:
+                    record_request(
                         input_tokens=input_tokens,
                         output_tokens=output_tokens,
-                        request_latency=request_latency,
+                        request_latency=timer.total_time,
                         impacts=impacts,
                         provider=PROVIDER,
                         model=model_name,
-                        endpoint="/messages"
+                        endpoint="/messages",
+                        timings=impacts.timings
                     )
 
 
@@ -195,8 +204,8 @@ def anthropic_chat_wrapper(
         electricity_mix_zone=EcoLogits.config.electricity_mix_zone
     )
     if impacts is not None:
-        if EcoLogits.config.opentelemetry:
-            EcoLogits.config.opentelemetry.record_request(
+        if EcoLogits.config.records_requests:
+            record_request(
                 input_tokens=response.usage.input_tokens,
                 output_tokens=response.usage.output_tokens,
                 request_latency=request_latency,
@@ -206,7 +215,7 @@ def anthropic_chat_wrapper(
                 endpoint="/messages"
             )
 
-        return Message(**response.model_dump(), impacts=impacts)
+        return attach_impacts(response, Message, impacts)
     else:
         return response
 
@@ -236,11 +245,12 @@ async def anthropic_async_chat_wrapper(
         model_name=model_name,
         output_token_count=response.usage.output_tokens,
         request_latency=request_latency,
-        electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+        electricity_mix_zone=EcoLogits.config.electricity_mix_zone,
+        background=True
     )
     if impacts is not None:
-        if EcoLogits.config.opentelemetry:
-            EcoLogits.config.opentelemetry.record_request(
+        if EcoLogits.config.records_requests:
+            record_request(
                 input_tokens=response.usage.input_tokens,
                 output_tokens=response.usage.output_tokens,
                 request_latency=request_latency,
@@ -250,7 +260,7 @@ async def anthropic_async_chat_wrapper(
                 endpoint="/messages"
             )
 
-        return Message(**response.model_dump(), impacts=impacts)
+        return attach_impacts(response, Message, impacts)
     else:
         return response
 
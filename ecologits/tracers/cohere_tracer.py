@@ -9,7 +9,7 @@ from cohere.types.streamed_chat_response import StreamEndStreamedChatResponse as
 from wrapt import wrap_function_wrapper  # type: ignore[import-untyped]
 
 from ecologits._ecologits import EcoLogits
-from ecologits.tracers.utils import ImpactsOutput, llm_impacts
+from ecologits.tracers.utils import ImpactsOutput, StreamTimer, attach_impacts, llm_impacts, record_request
 
 PROVIDER = "cohere"
 
@@ -62,8 +62,8 @@ def cohere_chat_wrapper(
         electricity_mix_zone=EcoLogits.config.electricity_mix_zone
     )
     if impacts is not None:
-        if EcoLogits.config.opentelemetry:
-            EcoLogits.config.opentelemetry.record_request(
+        if EcoLogits.config.records_requests:
+            record_request(
                 input_tokens=response.meta.tokens.input_tokens,
                 output_tokens=response.meta.tokens.output_tokens,
                 request_latency=request_latency,
@@ -73,7 +73,7 @@ def cohere_chat_wrapper(
                 endpoint="/chat"
             )
 
-        return NonStreamedChatResponse(**response.dict(), impacts=impacts)
+        return attach_impacts(response, NonStreamedChatResponse, impacts)
     else:
         return response
 
@@ -103,11 +103,12 @@ async def cohere_async_chat_wrapper(
         model_name=model_name,
         output_token_count=output_tokens,
         request_latency=request_latency,
-        electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+        electricity_mix_zone=EcoLogits.config.electricity_mix_zone,
+        background=True
     )
     if impacts is not None:
-        if EcoLogits.config.opentelemetry:
-            EcoLogits.config.opentelemetry.record_request(
+        if EcoLogits.config.records_requests:
+            record_request(
                 input_tokens=response.meta.tokens.input_tokens,
                 output_tokens=response.meta.tokens.output_tokens,
                 request_latency=request_latency,
@@ -117,7 +118,7 @@ async def cohere_async_chat_wrapper(
                 endpoint="/chat"
             )
 
-        return NonStreamedChatResponse(**response.dict(), impacts=impacts)
+        return attach_impacts(response, NonStreamedChatResponse, impacts)
     else:
         return response
 
@@ -139,33 +140,37 @@ def cohere_stream_chat_wrapper(
     """
 
     model_name = kwargs.get("model", "command-r")
-    timer_start = time.perf_counter()
+    timer = StreamTimer()
     stream = wrapped(*args, **kwargs)
     for event in stream:
+        if event.event_type == "text-generation":
+            timer.tick()
         if event.event_type == "stream-end":
-            request_latency = time.perf_counter() - timer_start
+            timer.stop()
             output_tokens = event.response.meta.tokens.output_tokens
             impacts = llm_impacts(
                 provider=PROVIDER,
                 model_name=model_name,
                 output_token_count=output_tokens,
-                request_latency=request_latency,
+                request_latency=timer.impacts_latency,
                 electricity_mix_zone=EcoLogits.config.electricity_mix_zone
             )
 
             if impacts is not None:
-                if EcoLogits.config.opentelemetry:
-                    EcoLogits.config.opentelemetry.record_request(
+                impacts.timings = timer.timings()
+                if EcoLogits.config.records_requests:
+                    record_request(
                         input_tokens=event.response.meta.tokens.input_tokens,
                         output_tokens=event.response.meta.tokens.output_tokens,
-                        request_latency=request_latency,
+                        request_latency=timer.total_time,
                         impacts=impacts,
                         provider=PROVIDER,
                         model=model_name,
-                        endpoint="/chat"
+                        endpoint="/chat",
+                        timings=impacts.timings
                     )
 
-                yield StreamEndStreamedChatResponse(**event.dict(), impacts=impacts)
+                yield attach_impacts(event, StreamEndStreamedChatResponse, impacts)
             else:
                 yield event
         else:
@@ -189,32 +194,37 @@ async def cohere_async_stream_chat_wrapper(
     """
 
     model_name = kwargs.get("model", "command-r")
-    timer_start = time.perf_counter()
+    timer = StreamTimer()
     stream = wrapped(*args, **kwargs)
     async for event in stream:
+        if event.event_type == "text-generation":
+            timer.tick()
         if event.event_type == "stream-end":
-            request_latency = time.perf_counter() - timer_start
+            timer.stop()
             output_tokens = event.response.meta.tokens.output_tokens
             impacts = llm_impacts(
                 provider=PROVIDER,
                 model_name=model_name,
                 output_token_count=output_tokens,
-                request_latency=request_latency,
-                electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+                request_latency=timer.impacts_latency,
+                electricity_mix_zone=EcoLogits.config.electricity_mix_zone,
+                background=True
             )
             if impacts is not None:
-                if EcoLogits.config.opentelemetry:
-                    EcoLogits.config.opentelemetry.record_request(
+                impacts.timings = timer.timings()
+                if EcoLogits.config.records_requests:
+                    record_request(
                         input_tokens=event.response.meta.tokens.input_tokens,
                         output_tokens=event.response.meta.tokens.output_tokens,
-                        request_latency=request_latency,
+                        request_latency=timer.total_time,
                         impacts=impacts,
                         provider=PROVIDER,
                         model=model_name,
-                        endpoint="/chat"
+                        endpoint="/chat",
+                        timings=impacts.timings
                     )
 
-                yield StreamEndStreamedChatResponse(**event.dict(), impacts=impacts)
+                yield attach_impacts(event, StreamEndStreamedChatResponse, impacts)
             else:
                 yield event
         else:
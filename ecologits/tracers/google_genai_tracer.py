@@ -7,7 +7,7 @@ from google.genai.types import GenerateContentResponse as _GenerateContentRespon
 from wrapt import wrap_function_wrapper  # type: ignore[import-untyped]
 
 from ecologits import EcoLogits
-from ecologits.tracers.utils import ImpactsOutput, llm_impacts
+from ecologits.tracers.utils import ImpactsOutput, StreamTimer, attach_impacts, llm_impacts, record_request
 
 PROVIDER = "google_genai"
 
@@ -51,8 +51,8 @@ def google_genai_content_wrapper(
         electricity_mix_zone=EcoLogits.config.electricity_mix_zone,
     )
     if impacts is not None:
-        if EcoLogits.config.opentelemetry:
-            EcoLogits.config.opentelemetry.record_request(
+        if EcoLogits.config.records_requests:
+            record_request(
                 input_tokens=input_tokens,
                 output_tokens=output_tokens,
                 request_latency=request_latency,
@@ -62,7 +62,7 @@ def google_genai_content_wrapper(
                 endpoint=f"/v1beta/models/{model_name}:generateContent"
             )
 
-        return GenerateContentResponse(**response.model_dump(), impacts=impacts)
+        return attach_impacts(response, GenerateContentResponse, impacts)
     else:
         return response
 
@@ -85,14 +85,14 @@ def google_genai_content_stream_wrapper(
     Yields:
         A wrapped `GenerateContentResponse` with impacts
     """
-    timer_start = time.perf_counter()
+    timer = StreamTimer()
     stream = wrapped(*args, **kwargs)
     for chunk in stream:
+        timer.tick()
         if chunk.candidates[0].finish_reason is None:
-            yield GenerateContentResponse(**chunk.model_dump(), impacts=None)
+            yield attach_impacts(chunk, GenerateContentResponse, None)
 
         else:
-            request_latency = time.perf_counter() - timer_start
             model_name = kwargs["model"]
             input_tokens = chunk.usage_metadata.candidates_token_count
             output_tokens = chunk.usage_metadata.total_token_count - input_tokens
@@ -100,24 +100,26 @@ def google_genai_content_stream_wrapper(
                 provider=PROVIDER,
                 model_name=model_name,
                 output_token_count=output_tokens,
-                request_latency=request_latency,
+                request_latency=timer.impacts_latency,
                 electricity_mix_zone=EcoLogits.config.electricity_mix_zone,
             )
             if impacts is not None:
-                if EcoLogits.config.opentelemetry:
-                    EcoLogits.config.opentelemetry.record_request(
+                impacts.timings = timer.timings()
+                if EcoLogits.config.records_requests:
+                    record_request(
                         input_tokens=input_tokens,
                         output_tokens=output_tokens,
-                        request_latency=request_latency,
+                        request_latency=timer.total_time,
                         impacts=impacts,
                         provider=PROVIDER,
                         model=model_name,
-                        endpoint=f"/v1beta/models/{model_name}:generateContent"
+                        endpoint=f"/v1beta/models/{model_name}:generateContent",
+                        timings=impacts.timings,
                     )
 
-                yield GenerateContentResponse(**chunk.model_dump(), impacts=impacts)
+                yield attach_impacts(chunk, GenerateContentResponse, impacts)
             else:
-                yield GenerateContentResponse(**chunk.model_dump(), impacts=None)
+                yield attach_impacts(chunk, GenerateContentResponse, None)
 
 
 async def google_genai_async_content_wrapper(
@@ -150,10 +152,11 @@ async def google_genai_async_content_wrapper(
         output_token_count=output_tokens,
         request_latency=request_latency,
         electricity_mix_zone=EcoLogits.config.electricity_mix_zone,
+        background=True,
     )
     if impacts is not None:
-        if EcoLogits.config.opentelemetry:
-            EcoLogits.config.opentelemetry.record_request(
+        if EcoLogits.config.records_requests:
+            record_request(
                 input_tokens=input_tokens,
                 output_tokens=output_tokens,
                 request_latency=request_latency,
@@ -163,46 +166,49 @@ async def google_genai_async_content_wrapper(
                 endpoint=f"/v1beta/models/{model_name}:generateContent"
             )
 
-        return GenerateContentResponse(**response.model_dump(), impacts=impacts)
+        return attach_impacts(response, GenerateContentResponse, impacts)
     else:
         return response
 
 
 async def _generator(
     stream: AsyncIterator[GenerateContentResponse],
-    timer_start: float,
+    timer: StreamTimer,
     model_name: str
 ) -> AsyncIterator[GenerateContentResponse]:
     async for chunk in stream:
+        timer.tick()
         if chunk.candidates[0].finish_reason is None:
-            yield GenerateContentResponse(**chunk.model_dump(), impacts=None)
+            yield attach_impacts(chunk, GenerateContentResponse, None)
 
         else:
-            request_latency = time.perf_counter() - timer_start
             input_tokens = chunk.usage_metadata.candidates_token_count
             output_tokens = chunk.usage_metadata.total_token_count - input_tokens
             impacts = llm_impacts(
                 provider=PROVIDER,
                 model_name=model_name,
                 output_token_count=output_tokens,
-                request_latency=request_latency,
+                request_latency=timer.impacts_latency,
                 electricity_mix_zone=EcoLogits.config.electricity_mix_zone,
+                background=True,
             )
             if impacts is not None:
-                if EcoLogits.config.opentelemetry:
-                    EcoLogits.config.opentelemetry.record_request(
+                impacts.timings = timer.timings()
+                if EcoLogits.config.records_requests:
+                    record_request(
                         input_tokens=input_tokens,
                         output_tokens=output_tokens,
-                        request_latency=request_latency,
+                        request_latency=timer.total_time,
                         impacts=impacts,
                         provider=PROVIDER,
                         model=model_name,
-                        endpoint=f"/v1beta/models/{model_name}:generateContent"
+                        endpoint=f"/v1beta/models/{model_name}:generateContent",
+                        timings=impacts.timings,
                     )
 
-                yield GenerateContentResponse(**chunk.model_dump(), impacts=impacts)
+                yield attach_impacts(chunk, GenerateContentResponse, impacts)
             else:
-                yield GenerateContentResponse(**chunk.model_dump(), impacts=None)
+                yield attach_impacts(chunk, GenerateContentResponse, None)
 
 
 async def google_genai_async_content_stream_wrapper(
@@ -223,9 +229,9 @@ async def google_genai_async_content_stream_wrapper(
     Yields:
         A wrapped `GenerateContentResponse` with impacts
     """
-    timer_start = time.perf_counter()
+    timer = StreamTimer()
     stream = await wrapped(*args, **kwargs)
-    return _generator(stream, timer_start=timer_start, model_name=kwargs["model"])
+    return _generator(stream, timer=timer, model_name=kwargs["model"])
 
 
 class GoogleGenaiInstrumentor:
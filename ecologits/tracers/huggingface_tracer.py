@@ -1,16 +1,25 @@
+import asyncio
 import time
 from collections.abc import AsyncIterable, Iterable
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from typing import Any, Callable, Optional, Union
 
-import tiktoken
 from huggingface_hub import AsyncInferenceClient, InferenceClient  # type: ignore[import-untyped]
 from huggingface_hub import ChatCompletionOutput as _ChatCompletionOutput
 from huggingface_hub import ChatCompletionStreamOutput as _ChatCompletionStreamOutput
 from wrapt import wrap_function_wrapper  # type: ignore[import-untyped]
 
 from ecologits._ecologits import EcoLogits
-from ecologits.tracers.utils import ImpactsOutput, llm_impacts
+from ecologits.tracers.utils import (
+    ImpactsOutput,
+    LLMImpactsAccumulator,
+    StreamTimer,
+    attach_impacts,
+    has_output_tokens,
+    llm_impacts,
+    record_request,
+)
+from ecologits.utils.tokenizer import count_tokens_in_background
 
 PROVIDER = "huggingface_hub"
 
@@ -76,8 +85,8 @@ def huggingface_chat_wrapper_non_stream(
         electricity_mix_zone=EcoLogits.config.electricity_mix_zone
     )
     if impacts is not None:
-        if EcoLogits.config.opentelemetry:
-            EcoLogits.config.opentelemetry.record_request(
+        if EcoLogits.config.records_requests:
+            record_request(
                 input_tokens=input_tokens,
                 output_tokens=output_tokens,
                 request_latency=request_latency,
@@ -87,7 +96,7 @@ def huggingface_chat_wrapper_non_stream(
                 endpoint="/chat/completions"
             )
 
-        return ChatCompletionOutput(**asdict(response), impacts=impacts)
+        return attach_impacts(response, ChatCompletionOutput, impacts)
     else:
         return response
 
@@ -98,37 +107,51 @@ def huggingface_chat_wrapper_stream(
     args: Any,
     kwargs: Any
 ) -> Iterable[ChatCompletionStreamOutput]:
-    encoder = tiktoken.get_encoding("cl100k_base")
-    prompt_text = "".join([m["content"] for m in kwargs["messages"]])
-    input_tokens = len(encoder.encode(prompt_text))
     model_name = instance.model or kwargs.get("model")
-    timer_start = time.perf_counter()
+    input_tokens_future = None
+    if EcoLogits.config.records_requests:
+        # Input tokens are counted while waiting for the response
+        input_tokens_future = count_tokens_in_background(
+            kwargs["messages"], model_name, EcoLogits.config.token_count
+        )
+    timer = StreamTimer()
     stream = wrapped(*args, **kwargs)
+    accumulator = LLMImpactsAccumulator(
+        provider=PROVIDER,
+        model_name=model_name,
+        electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+    )
     output_tokens = 0
     for chunk in stream:
         output_tokens += 1 # noqa: SIM113
-        request_latency = time.perf_counter() - timer_start
-        impacts = llm_impacts(
-            provider=PROVIDER,
-            model_name=model_name,
+        if has_output_tokens(chunk.choices[0]["delta"]):
+            timer.tick()
+        else:
+            timer.stop()
+        final = chunk.choices[0]["finish_reason"] is not None
+        impacts = accumulator.update(
             output_token_count=output_tokens,
-            request_latency=request_latency,
-            electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+            request_latency=timer.impacts_latency,
+            final=final
         )
         if impacts is not None:
-            if EcoLogits.config.opentelemetry \
-                    and chunk.choices[0]["finish_reason"] is not None:
-                EcoLogits.config.opentelemetry.record_request(
-                    input_tokens=input_tokens,
+            if final:
+                impacts.timings = timer.timings()
+            if EcoLogits.config.records_requests \
+                    and input_tokens_future is not None \
+                    and final:
+                record_request(
+                    input_tokens=input_tokens_future.result(),
                     output_tokens=output_tokens,
-                    request_latency=request_latency,
+                    request_latency=timer.total_time,
                     impacts=impacts,
                     provider=PROVIDER,
                     model=model_name,
-                    endpoint="/chat/completions"
+                    endpoint="/chat/completions",
+                    timings=impacts.timings
                 )
 
-            yield ChatCompletionStreamOutput(**asdict(chunk), impacts=impacts)
+            yield attach_impacts(chunk, ChatCompletionStreamOutput, impacts)
         else:
             yield chunk
 
@@ -175,11 +198,12 @@ async def huggingface_async_chat_wrapper_non_stream(
         model_name=model_name,
         output_token_count=output_tokens,
         request_latency=request_latency,
-        electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+        electricity_mix_zone=EcoLogits.config.electricity_mix_zone,
+        background=True
     )
     if impacts is not None:
-        if EcoLogits.config.opentelemetry:
-            EcoLogits.config.opentelemetry.record_request(
+        if EcoLogits.config.records_requests:
+            record_request(
                 input_tokens=input_tokens,
                 output_tokens=output_tokens,
                 request_latency=request_latency,
@@ -189,7 +213,7 @@ async def huggingface_async_chat_wrapper_non_stream(
                 endpoint="/chat/completions"
             )
 
-        return ChatCompletionOutput(**asdict(response), impacts=impacts)
+        return attach_impacts(response, ChatCompletionOutput, impacts)
     else:
         return response
 
@@ -200,37 +224,51 @@ async def huggingface_async_chat_wrapper_stream(
     args: Any,
     kwargs: Any
 ) -> AsyncIterable[ChatCompletionStreamOutput]:
-    encoder = tiktoken.get_encoding("cl100k_base")
-    prompt_text = "".join([m["content"] for m in kwargs["messages"]])
-    input_tokens = len(encoder.encode(prompt_text))
     model_name = instance.model or kwargs.get("model")
-    timer_start = time.perf_counter()
+    input_tokens_future = None
+    if EcoLogits.config.records_requests:
+        # Input tokens are counted while waiting for the response
+        input_tokens_future = count_tokens_in_background(
+            kwargs["messages"], model_name, EcoLogits.config.token_count
+        )
+    timer = StreamTimer()
     stream = await wrapped(*args, **kwargs)
+    accumulator = LLMImpactsAccumulator(
+        provider=PROVIDER,
+        model_name=model_name,
+        electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+    )
     output_tokens = 0
     async for chunk in stream:
         output_tokens += 1
-        request_latency = time.perf_counter() - timer_start
-        impacts = llm_impacts(
-            provider=PROVIDER,
-            model_name=model_name,
+        if has_output_tokens(chunk.choices[0]["delta"]):
+            timer.tick()
+        else:
+            timer.stop()
+        final = chunk.choices[0]["finish_reason"] is not None
+        impacts = accumulator.update(
             output_token_count=output_tokens,
-            request_latency=request_latency,
-            electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+            request_latency=timer.impacts_latency,
+            final=final
         )
         if impacts is not None:
-            if EcoLogits.config.opentelemetry \
-                    and chunk.choices[0]["finish_reason"] is not None:
-                EcoLogits.config.opentelemetry.record_request(
-                    input_tokens=input_tokens,
+            if final:
+                impacts.timings = timer.timings()
+            if EcoLogits.config.records_requests \
+                    and input_tokens_future is not None \
+                    and final:
+                record_request(
+                    input_tokens=await asyncio.wrap_future(input_tokens_future),
                     output_tokens=output_tokens,
-                    request_latency=request_latency,
+                    request_latency=timer.total_time,
                     impacts=impacts,
                     provider=PROVIDER,
                     model=model_name,
-                    endpoint="/chat/completions"
+                    endpoint="/chat/completions",
+                    timings=impacts.timings
                 )
 
-            yield ChatCompletionStreamOutput(**asdict(chunk), impacts=impacts)
+            yield attach_impacts(chunk, ChatCompletionStreamOutput, impacts)
         else:
             yield chunk
 
@@ -1,3 +1,4 @@
+import re
 import time
 from typing import Any, Callable, Optional, Union
 
@@ -10,7 +11,17 @@ from wrapt import wrap_function_wrapper  # type: ignore[import-untyped]
 
 from ecologits._ecologits import EcoLogits
 from ecologits.model_repository import models
-from ecologits.tracers.utils import ImpactsOutput, llm_impacts
+from ecologits.tracers.utils import (
+    ImpactsOutput,
+    LLMImpactsAccumulator,
+    StreamTimer,
+    attach_impacts,
+    has_output_tokens,
+    llm_impacts,
+    record_request,
+)
+from ecologits.utils.lazy import LazyProxy
+from ecologits.utils.lru_cache import LRUCache
 
 
 class ChatCompletion(ModelResponse):
@@ -27,29 +38,96 @@ class ChatCompletionChunk(ModelResponse):
     impacts: ImpactsOutput
 
 
-_model_choices = [f"{m.provider.value}/{m.name}" for m in models.list_models()]
+MATCH_CACHE_SIZE = 1024
+MATCH_SCORE_CUTOFF = 51
+
+_TOKEN_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+
+def _tokenize(model_name: str) -> set[str]:
+    return {token for token in _TOKEN_SEPARATORS.split(model_name.lower()) if token}
+
+
+class _ModelMatcher:
+    """
+    Match litellm model names with records of the ModelRepository.
+
+    Names of the form "provider/name" of a record are matched exactly, other names are matched with a fuzzy scan of
+    the records and the results are memoized in a bounded LRU cache. With the token index, the fuzzy scan only covers
+    the records that share a token (e.g. "claude", "3", "sonnet") with the model name, and falls back to all the
+    records if none of them matches.
+    """
+
+    def __init__(self, choices: list[str], cache_size: int = MATCH_CACHE_SIZE, token_index: bool = True) -> None:
+        """
+        Args:
+            choices: Records of the ModelRepository as "provider/name".
+            cache_size: Maximum number of memoized fuzzy matches.
+            token_index: Restrict the fuzzy scan to the records that share a token with the model name.
+        """
+        self.choices = choices
+        self.cache: LRUCache[str, Union[tuple[str, str], tuple[()]]] = LRUCache(maxsize=cache_size)
+        self.__exact_matches = {choice: self.__split(choice) for choice in choices}
+        self.__token_index: Optional[dict[str, list[int]]] = None
+        if token_index:
+            self.__token_index = {}
+            for i, choice in enumerate(choices):
+                for token in _tokenize(choice):
+                    self.__token_index.setdefault(token, []).append(i)
+
+    @staticmethod
+    def __split(choice: str) -> tuple[str, str]:
+        provider, model_name = choice.split("/", 1)
+        return provider, model_name
+
+    def __fuzzy_match(self, model_name: str, choices: list[str]) -> Optional[tuple[str, str]]:
+        candidate = process.extractOne(
+            query=model_name,
+            choices=choices,
+            scorer=fuzz.token_sort_ratio,
+            score_cutoff=MATCH_SCORE_CUTOFF
+        )
+        if candidate is not None:
+            return self.__split(candidate[0])
+        return None
+
+    def match(self, model_name: str) -> Optional[tuple[str, str]]:
+        exact_match = self.__exact_matches.get(model_name)
+        if exact_match is not None:
+            return exact_match
+        cached_match = self.cache.get(model_name)
+        if cached_match is not None:
+            return cached_match or None
+
+        match = None
+        if self.__token_index is not None:
+            indices = set()
+            for token in _tokenize(model_name):
+                indices.update(self.__token_index.get(token, ()))
+            # Candidates keep the order of the records, so that ties are broken as with a full scan
+            match = self.__fuzzy_match(model_name, [self.choices[i] for i in sorted(indices)])
+        if match is None:
+            match = self.__fuzzy_match(model_name, self.choices)
+        self.cache.put(model_name, match or ())
+        return match
+
+
+_model_matcher = LazyProxy(lambda: _ModelMatcher([f"{m.provider.value}/{m.name}" for m in models.list_models()]))
 
 
 def litellm_match_model(model_name: str) -> Optional[tuple[str, str]]:
     """
     Match according provider and model from a litellm model_name.
 
+    Matches are memoized, the first match of a model name is the only one that scans the ModelRepository.
+
     Args:
         model_name: Name of the model as used in litellm.
 
     Returns:
         A tuple (provider, model_name) matching a record of the ModelRepository.
     """
-    candidate = process.extractOne(
-        query=model_name,
-        choices=_model_choices,
-        scorer=fuzz.token_sort_ratio,
-        score_cutoff=51
-    )
-    if candidate is not None:
-        provider, model_name = candidate[0].split("/", 1)
-        return provider, model_name
-    return None
+    return _model_matcher.match(model_name)
 
 
 def litellm_chat_wrapper(
@@ -83,38 +161,52 @@ def litellm_chat_wrapper_stream(  # type: ignore[misc]
     args: Any,
     kwargs: Any
 ) -> CustomStreamWrapper:
-    timer_start = time.perf_counter()
+    timer = StreamTimer()
     stream = wrapped(*args, **kwargs)
     token_count = 0
+    model_match = None
+    accumulator = None
     for i, chunk in enumerate(stream):
+        if has_output_tokens(chunk.choices[0].delta):
+            timer.tick()
+        else:
+            timer.stop()
         if i > 0 and chunk.choices[0].finish_reason is None:
             token_count += 1
-        request_latency = time.perf_counter() - timer_start
 
-        model_match = litellm_match_model(chunk.model)
-        if model_match is not None:
-            impacts = llm_impacts(
-                provider=model_match[0],
-                model_name=model_match[1],
+        if accumulator is None:
+            model_match = litellm_match_model(chunk.model)
+            if model_match is not None:
+                accumulator = LLMImpactsAccumulator(
+                    provider=model_match[0],
+                    model_name=model_match[1],
+                    electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+                )
+        if model_match is not None and accumulator is not None:
+            final = chunk.choices[0].finish_reason is not None or getattr(chunk, "usage", None) is not None
+            impacts = accumulator.update(
                 output_token_count=token_count,
-                request_latency=request_latency,
-                electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+                request_latency=timer.impacts_latency,
+                final=final
             )
             if impacts is not None:
-                if EcoLogits.config.opentelemetry \
+                if final:
+                    impacts.timings = timer.timings()
+                if EcoLogits.config.records_requests \
                         and hasattr(chunk, "usage") \
                         and chunk.usage is not None:
-                    EcoLogits.config.opentelemetry.record_request(
+                    record_request(
                         input_tokens=chunk.usage.prompt_tokens,
                         output_tokens=chunk.usage.completion_tokens,
-                        request_latency=request_latency,
+                        request_latency=timer.total_time,
                         impacts=impacts,
                         provider=model_match[0],
                         model=model_match[1],
-                        endpoint="/chat/completions"
+                        endpoint="/chat/completions",
+                        timings=impacts.timings
                     )
 
-                yield ChatCompletionChunk(**chunk.model_dump(), impacts=impacts)
+                yield attach_impacts(chunk, ChatCompletionChunk, impacts)
             else:
                 yield chunk
         else:
@@ -141,8 +233,8 @@ def litellm_chat_wrapper_non_stream(
         electricity_mix_zone=EcoLogits.config.electricity_mix_zone
     )
     if impacts is not None:
-        if EcoLogits.config.opentelemetry:
-            EcoLogits.config.opentelemetry.record_request(
+        if EcoLogits.config.records_requests:
+            record_request(
                 input_tokens=response.usage.prompt_tokens,
                 output_tokens=response.usage.completion_tokens,
                 request_latency=request_latency,
@@ -152,7 +244,7 @@ def litellm_chat_wrapper_non_stream(
                 endpoint="/chat/completions"
             )
 
-        return ChatCompletion(**response.model_dump(), impacts=impacts)
+        return attach_impacts(response, ChatCompletion, impacts)
     else:
         return response
 
@@ -198,11 +290,12 @@ async def litellm_async_chat_wrapper_base(
         model_name=model_match[1],
         output_token_count=response.usage.completion_tokens,
         request_latency=request_latency,
-        electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+        electricity_mix_zone=EcoLogits.config.electricity_mix_zone,
+        background=True
     )
     if impacts is not None:
-        if EcoLogits.config.opentelemetry:
-            EcoLogits.config.opentelemetry.record_request(
+        if EcoLogits.config.records_requests:
+            record_request(
                 input_tokens=response.usage.prompt_tokens,
                 output_tokens=response.usage.completion_tokens,
                 request_latency=request_latency,
@@ -212,7 +305,7 @@ async def litellm_async_chat_wrapper_base(
                 endpoint="/chat/completions"
             )
 
-        return ChatCompletion(**response.model_dump(), impacts=impacts)
+        return attach_impacts(response, ChatCompletion, impacts)
     else:
         return response
 
@@ -223,38 +316,52 @@ async def litellm_async_chat_wrapper_stream(  # type: ignore[misc]
     args: Any,
     kwargs: Any
 ) -> CustomStreamWrapper:
-    timer_start = time.perf_counter()
+    timer = StreamTimer()
     stream = await wrapped(*args, **kwargs)
     i = 0
     token_count = 0
+    model_match = None
+    accumulator = None
     async for chunk in stream:
+        if has_output_tokens(chunk.choices[0].delta):
+            timer.tick()
+        else:
+            timer.stop()
         if i > 0 and chunk.choices[0].finish_reason is None:
             token_count += 1
-        request_latency = time.perf_counter() - timer_start
-        model_match = litellm_match_model(chunk.model)
-        if model_match is not None:
-            impacts = llm_impacts(
-                provider=model_match[0],
-                model_name=model_match[1],
+        if accumulator is None:
+            model_match = litellm_match_model(chunk.model)
+            if model_match is not None:
+                accumulator = LLMImpactsAccumulator(
+                    provider=model_match[0],
+                    model_name=model_match[1],
+                    electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+                )
+        if model_match is not None and accumulator is not None:
+            final = chunk.choices[0].finish_reason is not None or getattr(chunk, "usage", None) is not None
+            impacts = accumulator.update(
                 output_token_count=token_count,
-                request_latency=request_latency,
-                electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+                request_latency=timer.impacts_latency,
+                final=final
             )
             if impacts is not None:
-                if EcoLogits.config.opentelemetry \
+                if final:
+                    impacts.timings = timer.timings()
+                if EcoLogits.config.records_requests \
                         and hasattr(chunk, "usage") \
                         and chunk.usage is not None:
-                    EcoLogits.config.opentelemetry.record_request(
+                    record_request(
                         input_tokens=chunk.usage.prompt_tokens,
                         output_tokens=chunk.usage.completion_tokens,
-                        request_latency=request_latency,
+                        request_latency=timer.total_time,
                         impacts=impacts,
                         provider=model_match[0],
                         model=model_match[1],
-                        endpoint="/chat/completions"
+                        endpoint="/chat/completions",
+                        timings=impacts.timings
                     )
 
-                yield ChatCompletionChunk(**chunk.model_dump(), impacts=impacts)
+                yield attach_impacts(chunk, ChatCompletionChunk, impacts)
             else:
                 yield chunk
         else:
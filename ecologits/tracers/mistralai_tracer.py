@@ -9,7 +9,15 @@ from mistralai.models import CompletionEvent
 from wrapt import wrap_function_wrapper  # type: ignore[import-untyped]
 
 from ecologits._ecologits import EcoLogits
-from ecologits.tracers.utils import ImpactsOutput, llm_impacts
+from ecologits.tracers.utils import (
+    ImpactsOutput,
+    LLMImpactsAccumulator,
+    StreamTimer,
+    attach_impacts,
+    has_output_tokens,
+    llm_impacts,
+    record_request,
+)
 
 PROVIDER = "mistralai"
 
@@ -55,8 +63,8 @@ def mistralai_chat_wrapper(
         electricity_mix_zone=EcoLogits.config.electricity_mix_zone
     )
     if impacts is not None:
-        if EcoLogits.config.opentelemetry:
-            EcoLogits.config.opentelemetry.record_request(
+        if EcoLogits.config.records_requests:
+            record_request(
                 input_tokens=response.usage.prompt_tokens,
                 output_tokens=response.usage.completion_tokens,
                 request_latency=request_latency,
@@ -66,7 +74,7 @@ def mistralai_chat_wrapper(
                 endpoint="/chat/completions"
             )
 
-        return ChatCompletionResponse(**response.model_dump(), impacts=impacts)
+        return attach_impacts(response, ChatCompletionResponse, impacts)
     else:
         return response
 
@@ -86,36 +94,46 @@ def mistralai_chat_wrapper_stream(
     Returns:
         A wrapped `Iterable[CompletionEvent]` with impacts
     """
-    timer_start = time.perf_counter()
+    timer = StreamTimer()
     stream = wrapped(*args, **kwargs)
     token_count = 0
+    accumulator = None
     for i, chunk in enumerate(stream):
-        if i > 0 and chunk.data.choices[0].finish_reason is None:
+        if has_output_tokens(chunk.data.choices[0].delta):
+            timer.tick()
+        else:
+            timer.stop()
+        final = chunk.data.choices[0].finish_reason is not None
+        if i > 0 and not final:
             token_count += 1
-        request_latency = time.perf_counter() - timer_start
         model_name = chunk.data.model
-        impacts = llm_impacts(
-            provider=PROVIDER,
-            model_name=model_name,
+        if accumulator is None:
+            accumulator = LLMImpactsAccumulator(
+                provider=PROVIDER,
+                model_name=model_name,
+                electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+            )
+        impacts = accumulator.update(
             output_token_count=token_count,
-            request_latency=request_latency,
-            electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+            request_latency=timer.impacts_latency,
+            final=final
         )
         if impacts is not None:
-            if EcoLogits.config.opentelemetry \
-                and chunk.data.choices[0].finish_reason is not None:
-
-                EcoLogits.config.opentelemetry.record_request(
+            if final:
+                impacts.timings = timer.timings()
+            if EcoLogits.config.records_requests and final:
+                record_request(
                     input_tokens=chunk.data.usage.prompt_tokens,
                     output_tokens=chunk.data.usage.completion_tokens,
-                    request_latency=request_latency,
+                    request_latency=timer.total_time,
                     impacts=impacts,
                     provider=PROVIDER,
                     model=model_name,
-                    endpoint="/chat/completions"
+                    endpoint="/chat/completions",
+                    timings=impacts.timings
                 )
 
-            chunk.data = CompletionChunk(**chunk.data.model_dump(), impacts=impacts)
+            chunk.data = attach_impacts(chunk.data, CompletionChunk, impacts)
             yield chunk
         else:
             yield chunk
@@ -147,11 +165,12 @@ async def mistralai_async_chat_wrapper(
         model_name=response.model,
         output_token_count=response.usage.completion_tokens,
         request_latency=request_latency,
-        electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+        electricity_mix_zone=EcoLogits.config.electricity_mix_zone,
+        background=True
     )
     if impacts is not None:
-        if EcoLogits.config.opentelemetry:
-            EcoLogits.config.opentelemetry.record_request(
+        if EcoLogits.config.records_requests:
+            record_request(
                 input_tokens=response.usage.prompt_tokens,
                 output_tokens=response.usage.completion_tokens,
                 request_latency=request_latency,
@@ -161,42 +180,52 @@ async def mistralai_async_chat_wrapper(
                 endpoint="/chat/completions"
             )
 
-        return ChatCompletionResponse(**response.model_dump(), impacts=impacts)
+        return attach_impacts(response, ChatCompletionResponse, impacts)
     else:
         return response
 
 async def _generator(
     stream: AsyncGenerator[CompletionEvent, None],
-    timer_start: float
+    timer: StreamTimer
 ) -> AsyncGenerator[CompletionEvent, None]:
     token_count = 0
+    accumulator = None
     async for chunk in stream:
+        if has_output_tokens(chunk.data.choices[0].delta):
+            timer.tick()
+        else:
+            timer.stop()
+        final = chunk.data.choices[0].finish_reason is not None
         if chunk.data.usage is not None:
             token_count = chunk.data.usage.completion_tokens
-        request_latency = time.perf_counter() - timer_start
         model_name = chunk.data.model
-        impacts = llm_impacts(
-            provider=PROVIDER,
-            model_name=model_name,
+        if accumulator is None:
+            accumulator = LLMImpactsAccumulator(
+                provider=PROVIDER,
+                model_name=model_name,
+                electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+            )
+        impacts = accumulator.update(
             output_token_count=token_count,
-            request_latency=request_latency,
-            electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+            request_latency=timer.impacts_latency,
+            final=final
         )
         if impacts is not None:
-            if EcoLogits.config.opentelemetry \
-                and chunk.data.choices[0].finish_reason is not None:
-
-                EcoLogits.config.opentelemetry.record_request(
+            if final:
+                impacts.timings = timer.timings()
+            if EcoLogits.config.records_requests and final:
+                record_request(
                     input_tokens=chunk.data.usage.prompt_tokens,
                     output_tokens=chunk.data.usage.completion_tokens,
-                    request_latency=request_latency,
+                    request_latency=timer.total_time,
                     impacts=impacts,
                     provider=PROVIDER,
                     model=model_name,
-                    endpoint="/chat/completions"
+                    endpoint="/chat/completions",
+                    timings=impacts.timings
                 )
 
-            chunk.data = CompletionChunk(**chunk.data.model_dump(), impacts=impacts)
+            chunk.data = attach_impacts(chunk.data, CompletionChunk, impacts)
             yield chunk
         else:
             yield chunk
@@ -220,9 +249,9 @@ async def mistralai_async_chat_wrapper_stream(
     Returns:
         A wrapped `AsyncGenerator[CompletionEvent, None]` with impacts
     """
-    timer_start = time.perf_counter()
+    timer = StreamTimer()
     stream = await wrapped(*args, **kwargs)
-    return _generator(stream, timer_start)
+    return _generator(stream, timer)
 
 
 class MistralAIInstrumentor:
@@ -1,3 +1,4 @@
+import asyncio
 import time
 from typing import Any, Callable, Union
 
@@ -8,7 +9,16 @@ from openai.types.chat import ChatCompletionChunk as _ChatCompletionChunk
 from wrapt import wrap_function_wrapper  # type: ignore[import-untyped]
 
 from ecologits._ecologits import EcoLogits
-from ecologits.tracers.utils import ImpactsOutput, llm_impacts
+from ecologits.tracers.utils import (
+    ImpactsOutput,
+    LLMImpactsAccumulator,
+    StreamTimer,
+    attach_impacts,
+    has_output_tokens,
+    llm_impacts,
+    record_request,
+)
+from ecologits.utils.tokenizer import count_tokens_in_background
 
 PROVIDER = "openai"
 
@@ -69,8 +79,8 @@ def openai_chat_wrapper_non_stream(
         electricity_mix_zone=EcoLogits.config.electricity_mix_zone
     )
     if impacts is not None:
-        if EcoLogits.config.opentelemetry:
-            EcoLogits.config.opentelemetry.record_request(
+        if EcoLogits.config.records_requests:
+            record_request(
                 input_tokens=response.usage.prompt_tokens,
                 output_tokens=response.usage.completion_tokens,
                 request_latency=request_latency,
@@ -80,7 +90,7 @@ def openai_chat_wrapper_non_stream(
                 endpoint="/chat/completions"
             )
 
-        return ChatCompletion(**response.model_dump(), impacts=impacts)
+        return attach_impacts(response, ChatCompletion, impacts)
     else:
         return response
 
@@ -91,44 +101,57 @@ def openai_chat_wrapper_stream(  # type: ignore[misc]
     args: Any,
     kwargs: Any
 ) -> Stream[ChatCompletionChunk]:
-    timer_start = time.perf_counter()
+    input_token_count_future = None
+    if EcoLogits.config.records_requests:
+        # Input tokens are counted while waiting for the response
+        input_token_count_future = count_tokens_in_background(
+            kwargs["messages"], kwargs.get("model"), EcoLogits.config.token_count
+        )
+    timer = StreamTimer()
     stream = wrapped(*args, **kwargs)
     output_token_count = 0
+    accumulator = None
     for i, chunk in enumerate(stream):
         # azure openai has an empty first chunk so we skip it
         if i == 0 and chunk.model == "":
             continue
-        if i > 0 and chunk.choices[0].finish_reason is None:
+        if has_output_tokens(chunk.choices[0].delta):
+            timer.tick()
+        else:
+            timer.stop()
+        final = chunk.choices[0].finish_reason is not None
+        if i > 0 and not final:
             output_token_count += 1
-        request_latency = time.perf_counter() - timer_start
         model_name = chunk.model
-        impacts = llm_impacts(
-            provider=PROVIDER,
-            model_name=model_name,
+        if accumulator is None:
+            accumulator = LLMImpactsAccumulator(
+                provider=PROVIDER,
+                model_name=model_name,
+                electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+            )
+        impacts = accumulator.update(
             output_token_count=output_token_count,
-            request_latency=request_latency,
-            electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+            request_latency=timer.impacts_latency,
+            final=final
         )
         if impacts is not None:
-            if EcoLogits.config.opentelemetry \
-                    and chunk.choices[0].finish_reason is not None:
-                import tiktoken
-
-                # Compute input tokens
-                encoder = tiktoken.get_encoding("cl100k_base")
-                input_token_count =  len(encoder.encode(kwargs["messages"][0]["content"]))
-
-                EcoLogits.config.opentelemetry.record_request(
-                    input_tokens=input_token_count,
+            if final:
+                impacts.timings = timer.timings()
+            if EcoLogits.config.records_requests \
+                    and input_token_count_future is not None \
+                    and final:
+                record_request(
+                    input_tokens=input_token_count_future.result(),
                     output_tokens=output_token_count,
-                    request_latency=request_latency,
+                    request_latency=timer.total_time,
                     impacts=impacts,
                     provider=PROVIDER,
                     model=model_name,
-                    endpoint="/chat/completions"
+                    endpoint="/chat/completions",
+                    timings=impacts.timings
                 )
 
-            yield ChatCompletionChunk(**chunk.model_dump(), impacts=impacts)
+            yield attach_impacts(chunk, ChatCompletionChunk, impacts)
         else:
             yield chunk
 
@@ -172,11 +195,12 @@ async def openai_async_chat_wrapper_base(
         model_name=model_name,
         output_token_count=response.usage.completion_tokens,
         request_latency=request_latency,
-        electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+        electricity_mix_zone=EcoLogits.config.electricity_mix_zone,
+        background=True
     )
     if impacts is not None:
-        if EcoLogits.config.opentelemetry:
-            EcoLogits.config.opentelemetry.record_request(
+        if EcoLogits.config.records_requests:
+            record_request(
                 input_tokens=response.usage.prompt_tokens,
                 output_tokens=response.usage.completion_tokens,
                 request_latency=request_latency,
@@ -186,7 +210,7 @@ async def openai_async_chat_wrapper_base(
                 endpoint="/chat/completions"
             )
 
-        return ChatCompletion(**response.model_dump(), impacts=impacts)
+        return attach_impacts(response, ChatCompletion, impacts)
     else:
         return response
 
@@ -197,44 +221,57 @@ async def openai_async_chat_wrapper_stream(  # type: ignore[misc]
     args: Any,
     kwargs: Any,
 ) -> AsyncStream[ChatCompletionChunk]:
-    timer_start = time.perf_counter()
+    input_token_count_future = None
+    if EcoLogits.config.records_requests:
+        # Input tokens are counted while waiting for the response
+        input_token_count_future = count_tokens_in_background(
+            kwargs["messages"], kwargs.get("model"), EcoLogits.config.token_count
+        )
+    timer = StreamTimer()
     stream = await wrapped(*args, **kwargs)
     i = 0
     output_token_count = 0
+    accumulator = None
     async for chunk in stream:
         if i == 0 and chunk.model == "":
             continue
-        if i > 0 and chunk.choices[0].finish_reason is None:
+        if has_output_tokens(chunk.choices[0].delta):
+            timer.tick()
+        else:
+            timer.stop()
+        final = chunk.choices[0].finish_reason is not None
+        if i > 0 and not final:
             output_token_count += 1
-        request_latency = time.perf_counter() - timer_start
         model_name = chunk.model
-        impacts = llm_impacts(
-            provider=PROVIDER,
-            model_name=model_name,
+        if accumulator is None:
+            accumulator = LLMImpactsAccumulator(
+                provider=PROVIDER,
+                model_name=model_name,
+                electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+            )
+        impacts = accumulator.update(
             output_token_count=output_token_count,
-            request_latency=request_latency,
-            electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+            request_latency=timer.impacts_latency,
+            final=final
         )
         if impacts is not None:
-            if EcoLogits.config.opentelemetry \
-                    and chunk.choices[0].finish_reason is not None:
-                import tiktoken
-
-                # Compute input tokens
-                encoder = tiktoken.get_encoding("cl100k_base")
-                input_token_count =  len(encoder.encode(kwargs["messages"][0]["content"]))
-
-                EcoLogits.config.opentelemetry.record_request(
-                    input_tokens=input_token_count,
+            if final:
+                impacts.timings = timer.timings()
+            if EcoLogits.config.records_requests \
+                    and input_token_count_future is not None \
+                    and final:
+                record_request(
+                    input_tokens=await asyncio.wrap_future(input_token_count_future),
                     output_tokens=output_token_count,
-                    request_latency=request_latency,
+                    request_latency=timer.total_time,
                     impacts=impacts,
                     provider=PROVIDER,
                     model=model_name,
-                    endpoint="/chat/completions"
+                    endpoint="/chat/completions",
+                    timings=impacts.timings
                 )
 
-            yield ChatCompletionChunk(**chunk.model_dump(), impacts=impacts)
+            yield attach_impacts(chunk, ChatCompletionChunk, impacts)
         else:
             yield chunk
         i += 1
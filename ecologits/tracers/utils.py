@@ -1,17 +1,35 @@
-from __future__ import annotations
+import copy
+import math
+import time
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, is_dataclass
+from typing import TYPE_CHECKING, Any, Optional, TypeVar, Union
 
-from dataclasses import dataclass
+from pydantic import BaseModel, PrivateAttr, SerializerFunctionWrapHandler, model_serializer
 
-from pydantic import BaseModel
-
-from ecologits.electricity_mix_repository import electricity_mixes
-from ecologits.impacts.llm import compute_llm_impacts
-from ecologits.impacts.modeling import GWP, PE, WCF, ADPe, Embodied, Energy, Usage
+from ecologits._ecologits import EcoLogits
+from ecologits.electricity_mix_repository import ElectricityMix, Timestamp, electricity_mixes
+from ecologits.impacts.llm import (
+    BATCH_SIZE,
+    LATENCY_ALPHA,
+    LATENCY_BETA,
+    LATENCY_GAMMA,
+    LLMImpactsCoefficients,
+    compute_llm_impacts_coefficients,
+    generation_latency,
+)
+from ecologits.impacts.modeling import GWP, PE, WCF, ADPe, Embodied, Energy, ImpactsPercentiles, Usage
 from ecologits.log import logger
-from ecologits.model_repository import ParametersMoE, models
+from ecologits.model_repository import Model, ParametersMoE, models
 from ecologits.status_messages import ErrorMessage, ModelNotRegisteredError, WarningMessage, ZoneNotRegisteredError
+from ecologits.utils.lazy import LazyFuture
+from ecologits.utils.lru_cache import LRUCache
 from ecologits.utils.range_value import RangeValue
 
+ResponseT = TypeVar("ResponseT")
+
+COEFFICIENTS_TABLE_SIZE = 4096
+
 
 class ImpactsOutput(BaseModel):
     """
@@ -25,18 +43,111 @@ class ImpactsOutput(BaseModel):
         wcf: Usage-only Water Consumption Footprint (WCF) impact
         usage: Impacts for the usage phase
         embodied: Impacts for the embodied phase
+        percentiles: Percentiles of the total impacts (when the uncertainty mode is enabled)
         warnings: List of warnings
         errors: List of errors
+        timings: Timings of the response (on the last chunk of streamed responses)
+
+    Impacts computed in the background or lazily are deferred: they are created with `ImpactsOutput.deferred(future)`
+    and wait for the result of the computation when one of their fields is first accessed, or when they are copied or
+    pickled.
     """
-    energy: Energy | None = None
-    gwp: GWP | None = None
-    adpe: ADPe | None = None
-    pe: PE | None = None
-    wcf: WCF | None = None
-    usage: Usage | None = None
-    embodied: Embodied | None = None
-    warnings: list[WarningMessage] | None = None
-    errors: list[ErrorMessage] | None = None
+    energy: Optional[Energy] = None
+    gwp: Optional[GWP] = None
+    adpe: Optional[ADPe] = None
+    pe: Optional[PE] = None
+    wcf: Optional[WCF] = None
+    usage: Optional[Usage] = None
+    embodied: Optional[Embodied] = None
+    percentiles: Optional[ImpactsPercentiles] = None
+    warnings: Optional[list[WarningMessage]] = None
+    errors: Optional[list[ErrorMessage]] = None
+
+    _future: Optional[Future["ImpactsOutput"]] = PrivateAttr(default=None)
+    # Timings are measured by the tracers, they are not part of the computed (or cached) impacts
+    _timings: Optional["StreamTimings"] = PrivateAttr(default=None)
+
+    @classmethod
+    def deferred(cls, future: Future["ImpactsOutput"]) -> "ImpactsOutput":
+        """
+        Create impacts that are resolved with the result of a computation on first access.
+
+        Args:
+            future: Future result of the computation of the impacts.
+
+        Returns:
+            The deferred impacts.
+        """
+        # Fields are missing until resolved, so that their access falls back to `__getattr__`
+        impacts = cls.__new__(cls)
+        object.__setattr__(impacts, "__dict__", {})
+        object.__setattr__(impacts, "__pydantic_fields_set__", set())
+        object.__setattr__(impacts, "__pydantic_extra__", None)
+        object.__setattr__(impacts, "__pydantic_private__", {"_future": future, "_timings": None})
+        return impacts
+
+    @property
+    def is_resolved(self) -> bool:
+        return self._future is None
+
+    @property
+    def timings(self) -> Optional["StreamTimings"]:
+        return self._timings
+
+    @timings.setter
+    def timings(self, timings: Optional["StreamTimings"]) -> None:
+        self._timings = timings
+
+    def resolve(self) -> "ImpactsOutput":
+        """
+        Wait for the computation of deferred impacts, does nothing if they are already computed.
+
+        Returns:
+            The resolved impacts.
+        """
+        future = self._future
+        if future is not None:
+            impacts = future.result()
+            self.__dict__.update(impacts.__dict__)
+            self.__pydantic_fields_set__.update(impacts.__pydantic_fields_set__)
+            self._future = None
+        return self
+
+    if not TYPE_CHECKING:
+        def __getattr__(self, name: str) -> Any:
+            if name in type(self).model_fields and self.__pydantic_private__.get("_future") is not None:
+                return getattr(self.resolve(), name)
+            return super().__getattr__(name)
+
+    # Futures cannot be copied nor pickled, deferred impacts are resolved first
+
+    def __copy__(self) -> "ImpactsOutput":
+        return super(ImpactsOutput, self.resolve()).__copy__()
+
+    def __deepcopy__(self, memo: Optional[dict[int, Any]] = None) -> "ImpactsOutput":
+        return super(ImpactsOutput, self.resolve()).__deepcopy__(memo)
+
+    def __getstate__(self) -> dict[Any, Any]:
+        return super(ImpactsOutput, self.resolve()).__getstate__()
+
+    def __iter__(self) -> Any:
+        return super(ImpactsOutput, self.resolve()).__iter__()
+
+    @property
+    def model_fields_set(self) -> set[str]:
+        return self.resolve().__pydantic_fields_set__
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ImpactsOutput):
+            other.resolve()
+        return super(ImpactsOutput, self.resolve()).__eq__(other)
+
+    def __repr_args__(self) -> Any:
+        return super(ImpactsOutput, self.resolve()).__repr_args__()
+
+    @model_serializer(mode="wrap")
+    def _serialize(self, handler: SerializerFunctionWrapHandler) -> Any:
+        return handler(self.resolve())
 
     @property
     def has_warnings(self) -> bool:
@@ -57,27 +168,389 @@ class ImpactsOutput(BaseModel):
         self.errors.append(error)
 
 
+class StreamTimings(BaseModel):
+    """
+    Timings of a streamed response, in seconds.
+
+    Latencies between tokens are measured between consecutive chunks, most providers stream one token per chunk.
+
+    Attributes:
+        time_to_first_token: Time from the request to the first chunk (queueing, prefill and network time)
+        inter_token_latency: Mean time between two consecutive chunks
+        min_inter_token_latency: Minimum time between two consecutive chunks
+        max_inter_token_latency: Maximum time between two consecutive chunks
+        decode_time: Estimated generation time of the chunks, from the first chunk to the last chunk plus the mean
+            time between chunks for the first one
+        total_time: Time from the request to the end of the stream
+        chunk_count: Number of chunks
+    """
+    time_to_first_token: Optional[float] = None
+    inter_token_latency: Optional[float] = None
+    min_inter_token_latency: Optional[float] = None
+    max_inter_token_latency: Optional[float] = None
+    decode_time: Optional[float] = None
+    total_time: float
+    chunk_count: int = 0
+
+
+class StreamTimer:
+    """
+    Measure the time to first token, the latencies between tokens and the total time of a streamed response.
+
+    Only chunks with tokens are ticked, chunks with only the role, the finish reason or the usage stop the timer, so
+    that timings mean the same for every provider.
+
+    With `EcoLogits.init(latency_mode="decode")`, the generation latency of the impacts is capped with the decode
+    time of the response instead of its total time, so that queueing, prefill and network time before the first
+    chunk are not counted as generation time.
+
+    Examples:
+        ```python
+        timer = StreamTimer()
+        for output_token_count, chunk in enumerate(stream, start=1):
+            if has_output_tokens(chunk.choices[0].delta):
+                timer.tick()
+            else:
+                timer.stop()
+            impacts = accumulator.update(output_token_count, request_latency=timer.impacts_latency)
+        impacts.timings = timer.timings()
+        ```
+    """
+    __slots__ = ("_decode_only", "chunk_count", "end", "first_chunk", "last_chunk", "max_interval", "min_interval",
+                 "start")
+
+    def __init__(self) -> None:
+        self._decode_only = EcoLogits.config.latency_mode == "decode"
+        self.start = time.perf_counter()
+        self.end = self.start
+        self.first_chunk: Optional[float] = None
+        self.last_chunk: Optional[float] = None
+        self.chunk_count = 0
+        self.min_interval = math.inf
+        self.max_interval = 0.0
+
+    def tick(self) -> None:
+        """
+        Record the reception of a chunk with tokens.
+        """
+        now = time.perf_counter()
+        if self.last_chunk is None:
+            self.first_chunk = now
+        else:
+            interval = now - self.last_chunk
+            self.min_interval = min(self.min_interval, interval)
+            self.max_interval = max(self.max_interval, interval)
+        self.last_chunk = self.end = now
+        self.chunk_count += 1
+
+    def stop(self) -> None:
+        """
+        Record the end of a stream that ends with chunks without tokens.
+        """
+        self.end = time.perf_counter()
+
+    @property
+    def total_time(self) -> float:
+        return self.end - self.start
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        return self.first_chunk - self.start if self.first_chunk is not None else None
+
+    @property
+    def inter_token_latency(self) -> Optional[float]:
+        if self.chunk_count < 2:  # noqa: PLR2004
+            return None
+        return (self.last_chunk - self.first_chunk) / (self.chunk_count - 1)  # type: ignore[operator]
+
+    @property
+    def decode_time(self) -> Optional[float]:
+        inter_token_latency = self.inter_token_latency
+        if inter_token_latency is None:
+            return None
+        # The first chunk is generated after the prefill, it is estimated to take the mean time between chunks
+        return self.last_chunk - self.first_chunk + inter_token_latency  # type: ignore[operator]
+
+    @property
+    def impacts_latency(self) -> float:
+        """
+        Latency of the response so far that caps the generation latency of the impacts, the decode time in `decode`
+        latency mode (when at least two chunks are received) or the total time otherwise.
+        """
+        if self._decode_only:
+            decode_time = self.decode_time
+            if decode_time is not None:
+                return decode_time
+        return self.total_time
+
+    def timings(self) -> StreamTimings:
+        """
+        Get the timings of the response so far.
+
+        Returns:
+            The timings of the response.
+        """
+        has_intervals = self.chunk_count > 1
+        return StreamTimings(
+            time_to_first_token=self.time_to_first_token,
+            inter_token_latency=self.inter_token_latency,
+            min_inter_token_latency=self.min_interval if has_intervals else None,
+            max_inter_token_latency=self.max_interval if has_intervals else None,
+            decode_time=self.decode_time,
+            total_time=self.total_time,
+            chunk_count=self.chunk_count
+        )
+
+
+def has_output_tokens(delta: Any) -> bool:
+    """
+    Check if the delta of a streamed chat completion chunk holds generated tokens.
+
+    Args:
+        delta: Delta of the first choice of the chunk.
+
+    Returns:
+        True if the delta holds text or tool calls, False for chunks with only the role, the finish reason or the
+        usage.
+    """
+    return delta is not None and bool(getattr(delta, "content", None) or getattr(delta, "tool_calls", None))
+
+
+def attach_impacts(response: Any, response_type: type[ResponseT], impacts: Optional[ImpactsOutput]) -> ResponseT:
+    """
+    Attach impacts to a provider response without copying it.
+
+    The class of the response is swapped with `response_type`, a subclass of the provider class that defines the
+    `impacts` field, so the response remains an instance of the provider class. When `response_type` does not
+    subclass the class of the response, a copy of the response is created instead.
+
+    Args:
+        response: Response (or chunk) returned by the provider client.
+        response_type: Wrapper class of the response with `ImpactsOutput`.
+        impacts: Impacts of the request.
+
+    Returns:
+        The response with impacts.
+    """
+    if not issubclass(response_type, type(response)):
+        if isinstance(response, BaseModel):
+            return response_type(**response.model_dump(), impacts=impacts)
+        if is_dataclass(response):
+            return response_type(**asdict(response), impacts=impacts)  # type: ignore[arg-type]
+        return response_type(**response.dict(), impacts=impacts)
+
+    response.__class__ = response_type
+    if isinstance(response, BaseModel):
+        # Bypass validation, the impacts are already validated
+        response.__dict__["impacts"] = impacts
+        response.__pydantic_fields_set__.add("impacts")
+    else:
+        response.impacts = impacts
+    return response
+
+
+def record_request(
+    input_tokens: int,
+    output_tokens: int,
+    request_latency: float,
+    impacts: ImpactsOutput,
+    provider: str,
+    model: str,
+    endpoint: str,
+    timings: Optional[StreamTimings] = None
+) -> None:
+    """
+    Record a request with OpenTelemetry and in the impact ledger, when enabled with `EcoLogits.init`.
+
+    Args:
+        input_tokens: Number of input tokens.
+        output_tokens: Number of output tokens.
+        request_latency: Measured request latency in seconds.
+        impacts: Impacts of the request.
+        provider: Name of the provider.
+        model: Name of the model.
+        endpoint: Endpoint of the request.
+        timings: Timings of streamed responses.
+    """
+    if EcoLogits.config.opentelemetry is not None:
+        EcoLogits.config.opentelemetry.record_request(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            request_latency=request_latency,
+            impacts=impacts,
+            provider=provider,
+            model=model,
+            endpoint=endpoint,
+            timings=timings
+        )
+    if EcoLogits.config.ledger is not None:
+        EcoLogits.config.ledger.record_request(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            request_latency=request_latency,
+            impacts=impacts,
+            provider=provider,
+            model=model,
+            endpoint=endpoint,
+            electricity_mix_zone=EcoLogits.config.electricity_mix_zone
+        )
+
+
 def llm_impacts(
     provider: str,
     model_name: str,
     output_token_count: int,
     request_latency: float,
-    electricity_mix_zone: str | None  = None,
+    electricity_mix_zone: Optional[str] = None,
+    request_timestamp: Optional[Timestamp] = None,
+    background: bool = False,
 ) -> ImpactsOutput:
     """
     High-level function to compute the impacts of an LLM generation request.
 
+    When the impacts cache is enabled with `EcoLogits.init(impacts_cache_size=...)`, the impacts of requests that
+    share the same provider, model, zone and output token count are computed once, as long as the measured latency
+    does not cap the estimated generation latency.
+
+    When time-resolved electricity mixes are enabled with `EcoLogits.init(electricity_mix_timeseries=...)`, the
+    electricity mix of the zone at the time of the request is used if available.
+
+    When the background computation is enabled with `EcoLogits.init(background_queue_size=...)`, `background`
+    impacts are computed in a worker thread and deferred impacts are returned immediately. When lazy impacts are
+    enabled with `EcoLogits.init(lazy_impacts=True)`, other impacts are only computed when first accessed.
+
     Args:
         provider: Name of the provider.
         model_name: Name of the LLM used.
         output_token_count: Number of generated tokens.
         request_latency: Measured request latency in seconds.
         electricity_mix_zone: ISO 3166-1 alpha-3 code of the electricity mix zone (WOR by default).
+        request_timestamp: Time of the request for time-resolved electricity mixes (now by default).
+        background: Compute the impacts in the background if enabled.
 
     Returns:
         The impacts of an LLM generation request.
     """
+    worker = EcoLogits.config.background_worker if background else None
+    if worker is not None or EcoLogits.config.lazy_impacts:
+        if request_timestamp is None:
+            request_timestamp = time.time()
+        args = (provider, model_name, output_token_count, request_latency, electricity_mix_zone, request_timestamp)
+        if worker is not None:
+            return ImpactsOutput.deferred(worker.submit(_compute_llm_impacts, *args))
+        return ImpactsOutput.deferred(LazyFuture(_compute_llm_impacts, *args))
+    return _compute_llm_impacts(
+        provider, model_name, output_token_count, request_latency, electricity_mix_zone, request_timestamp
+    )
+
+
+def _compute_llm_impacts(
+    provider: str,
+    model_name: str,
+    output_token_count: int,
+    request_latency: float,
+    electricity_mix_zone: Optional[str],
+    request_timestamp: Optional[Timestamp]
+) -> ImpactsOutput:
+    request = _resolve_llm_request(provider, model_name, electricity_mix_zone, request_timestamp)
+    if isinstance(request, ImpactsOutput):
+        return request
+    cache = EcoLogits.config.impacts_cache
+    cache_key = None
+    if cache is not None:
+        latency_capped = is_latency_capped(request.model_active_params, output_token_count, request_latency)
+        # Capped impacts depend on the measured latency, they are never cached
+        if not latency_capped:
+            cache_key = (provider, model_name, request.electricity_mix_key, output_token_count, latency_capped)
+            cached_impacts = cache.get(cache_key)
+            if cached_impacts is not None:
+                return _copy_cached_impacts(cached_impacts)
+
+    coefficients = _find_llm_impacts_coefficients(provider, model_name, request)
+    impacts = coefficients.compute(output_token_count=output_token_count, request_latency=request_latency)
+    # Share the impact sub-models instead of dumping and re-validating them
+    impacts = ImpactsOutput(
+        energy=impacts.energy,
+        gwp=impacts.gwp,
+        adpe=impacts.adpe,
+        pe=impacts.pe,
+        wcf=impacts.wcf,
+        usage=impacts.usage,
+        embodied=impacts.embodied
+    )
+
+    _add_model_warnings(impacts, request.model)
+    if EcoLogits.config.uncertainty_samples is not None:
+        impacts.percentiles = _compute_llm_impacts_percentiles(request, output_token_count, request_latency)
 
+    if cache is not None and cache_key is not None:
+        cache.put(cache_key, _copy_cached_impacts(impacts))
+
+    return impacts
+
+
+def _copy_cached_impacts(impacts: ImpactsOutput) -> ImpactsOutput:
+    # Impact sub-models are shared, messages are copied so that changing them does not change the other cache hits
+    update = {
+        name: copy.deepcopy(messages)
+        for name, messages in (("warnings", impacts.warnings), ("errors", impacts.errors))
+        if messages is not None
+    }
+    return impacts.model_copy(update=update)
+
+
+@dataclass
+class _LLMRequest:
+    model: Model
+    model_active_params: Union[float, RangeValue]
+    model_total_params: Union[float, RangeValue]
+    provider_config: "_ProviderConfig"
+    electricity_mix_zone: str
+    electricity_mix: ElectricityMix
+
+    @property
+    def electricity_mix_key(self) -> tuple[str, float, float, float, float]:
+        # Time-resolved electricity mixes of the same zone differ, the values of the mix are part of the key
+        mix = self.electricity_mix
+        return mix.zone, mix.adpe, mix.pe, mix.gwp, mix.wue
+
+
+# Precomputed coefficients per (provider, model, electricity mix), bounded for time-resolved electricity mixes
+_coefficients_table: LRUCache[tuple, LLMImpactsCoefficients] = LRUCache(maxsize=COEFFICIENTS_TABLE_SIZE)
+
+
+def _find_llm_impacts_coefficients(provider: str, model_name: str, request: _LLMRequest) -> LLMImpactsCoefficients:
+    """
+    Find the precomputed coefficients of the impacts of a request, computed once per provider, model and electricity
+    mix.
+    """
+    key = (provider, model_name, request.electricity_mix_key)
+    coefficients = _coefficients_table.get(key)
+    if coefficients is None:
+        coefficients = compute_llm_impacts_coefficients(
+            model_active_parameter_count=request.model_active_params,
+            model_total_parameter_count=request.model_total_params,
+            if_electricity_mix_adpe=request.electricity_mix.adpe,
+            if_electricity_mix_pe=request.electricity_mix.pe,
+            if_electricity_mix_gwp=request.electricity_mix.gwp,
+            if_electricity_mix_wue=request.electricity_mix.wue,
+            datacenter_pue=request.provider_config.datacenter_pue,
+            datacenter_wue=request.provider_config.datacenter_wue,
+        )
+        _coefficients_table.put(key, coefficients)
+    return coefficients
+
+
+def _resolve_llm_request(
+    provider: str,
+    model_name: str,
+    electricity_mix_zone: Optional[str],
+    request_timestamp: Optional[Timestamp] = None
+) -> Union[_LLMRequest, ImpactsOutput]:
+    """
+    Find the model, the provider configuration and the electricity mix of a request, or the errors that prevent the
+    computation of its impacts.
+    """
     model = models.find_model(provider=provider, model_name=model_name)
     if model is None:
         error = ModelNotRegisteredError(message=f"Could not find model `{model_name}` for {provider} provider.")
@@ -91,47 +564,208 @@ def llm_impacts(
         model_total_params = model.architecture.parameters
         model_active_params = model.architecture.parameters
 
-    datacenter_location = PROVIDER_CONFIG_MAP[provider].datacenter_location
-    datacenter_pue = PROVIDER_CONFIG_MAP[provider].datacenter_pue
-    datacenter_wue = PROVIDER_CONFIG_MAP[provider].datacenter_wue
+    provider_config = PROVIDER_CONFIG_MAP[provider]
 
     if electricity_mix_zone is None:
-        electricity_mix_zone = datacenter_location
+        electricity_mix_zone = provider_config.datacenter_location
     if electricity_mix_zone is None:
         electricity_mix_zone = "WOR"
-    if_electricity_mix = electricity_mixes.find_electricity_mix(zone=electricity_mix_zone)
+    if_electricity_mix = None
+    electricity_mix_timeseries = EcoLogits.config.electricity_mix_timeseries
+    if electricity_mix_timeseries is not None:
+        if request_timestamp is None:
+            request_timestamp = time.time()
+        if_electricity_mix = electricity_mix_timeseries.find_electricity_mix(
+            zone=electricity_mix_zone,
+            timestamp=request_timestamp
+        )
+    if if_electricity_mix is None:
+        if_electricity_mix = electricity_mixes.find_electricity_mix(zone=electricity_mix_zone)
     if if_electricity_mix is None:
         error = ZoneNotRegisteredError(message=f"Could not find electricity mix for `{electricity_mix_zone}` zone.")
         logger.warning_once(str(error))
         return ImpactsOutput(errors=[error])
 
-    impacts = compute_llm_impacts(
-        model_active_parameter_count=model_active_params,
-        model_total_parameter_count=model_total_params,
+    return _LLMRequest(
+        model=model,
+        model_active_params=model_active_params,
+        model_total_params=model_total_params,
+        provider_config=provider_config,
+        electricity_mix_zone=electricity_mix_zone,
+        electricity_mix=if_electricity_mix
+    )
+
+
+def _compute_llm_impacts_percentiles(
+    request: _LLMRequest,
+    output_token_count: int,
+    request_latency: float
+) -> ImpactsPercentiles:
+    """
+    Estimate the percentiles of the impacts of a request with the uncertainty mode of `EcoLogits.config`.
+    """
+    from ecologits.impacts.uncertainty import compute_llm_impacts_percentiles
+
+    return compute_llm_impacts_percentiles(
+        samples=EcoLogits.config.uncertainty_samples,
+        distributions=EcoLogits.config.uncertainty_distributions,
+        model_active_parameter_count=request.model_active_params,
+        model_total_parameter_count=request.model_total_params,
         output_token_count=output_token_count,
         request_latency=request_latency,
-        if_electricity_mix_adpe=if_electricity_mix.adpe,
-        if_electricity_mix_pe=if_electricity_mix.pe,
-        if_electricity_mix_gwp=if_electricity_mix.gwp,
-        if_electricity_mix_wue=if_electricity_mix.wue,
-        datacenter_pue=datacenter_pue,
-        datacenter_wue=datacenter_wue,
+        if_electricity_mix_adpe=request.electricity_mix.adpe,
+        if_electricity_mix_pe=request.electricity_mix.pe,
+        if_electricity_mix_gwp=request.electricity_mix.gwp,
+        if_electricity_mix_wue=request.electricity_mix.wue,
+        datacenter_pue=request.provider_config.datacenter_pue,
+        datacenter_wue=request.provider_config.datacenter_wue,
     )
-    impacts = ImpactsOutput.model_validate(impacts.model_dump())
 
+
+def _add_model_warnings(impacts: ImpactsOutput, model: Model) -> None:
     if model.has_warnings:
         for w in model.warnings:
             logger.warning_once(str(w))
             impacts.add_warning(w)
 
-    return impacts
+
+class LLMImpactsAccumulator:
+    """
+    Incremental computation of the impacts of a streamed LLM generation request.
+
+    The terms of the impacts that only depend on the model and on the electricity mix are computed once per stream,
+    so that each update only costs a few arithmetic operations. The impacts are only computed on the updates selected
+    by the stream impacts policy (see `EcoLogits.init`) and always on the final update.
+
+    Examples:
+        ```python
+        accumulator = LLMImpactsAccumulator(provider="openai", model_name="gpt-4o-mini")
+        for output_token_count, chunk in enumerate(stream, start=1):
+            impacts = accumulator.update(output_token_count, request_latency=time.perf_counter() - timer_start)
+        ```
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        model_name: str,
+        electricity_mix_zone: Optional[str] = None,
+        stream_impacts: Optional[str] = None,
+        stream_impacts_interval: Optional[int] = None
+    ) -> None:
+        """
+        Args:
+            provider: Name of the provider.
+            model_name: Name of the LLM used.
+            electricity_mix_zone: ISO 3166-1 alpha-3 code of the electricity mix zone (WOR by default).
+            stream_impacts: Policy to compute the impacts, defaults to the one of `EcoLogits.config`.
+            stream_impacts_interval: Number of updates or of milliseconds between two computations of the impacts,
+                defaults to the one of `EcoLogits.config`.
+        """
+        self.__stream_impacts = stream_impacts or EcoLogits.config.stream_impacts
+        self.__stream_impacts_interval = stream_impacts_interval or EcoLogits.config.stream_impacts_interval
+        self.__update_count = 0
+        self.__last_emit: Optional[float] = None
+        self.__errors: Optional[ImpactsOutput] = None
+        self.__coefficients: Optional[LLMImpactsCoefficients] = None
+        self.__request: Optional[_LLMRequest] = None
+
+        request = _resolve_llm_request(provider, model_name, electricity_mix_zone)
+        if isinstance(request, ImpactsOutput):
+            self.__errors = request
+            self.__model = None
+            return
+
+        self.__request = request
+        self.__model = request.model
+        self.__coefficients = _find_llm_impacts_coefficients(provider, model_name, request)
+
+    def _should_emit(self, final: bool) -> bool:
+        update_index = self.__update_count
+        self.__update_count += 1
+        if final or self.__stream_impacts == "every_chunk":
+            return True
+        if self.__stream_impacts == "every_n_chunks":
+            return update_index % self.__stream_impacts_interval == 0
+        if self.__stream_impacts == "every_n_ms":
+            now = time.perf_counter()
+            if self.__last_emit is None or (now - self.__last_emit) * 1000 >= self.__stream_impacts_interval:
+                self.__last_emit = now
+                return True
+        return False
+
+    def update(self, output_token_count: int, request_latency: float, final: bool = False) -> Optional[ImpactsOutput]:
+        """
+        Update the impacts of the stream.
+
+        Args:
+            output_token_count: Number of tokens generated so far.
+            request_latency: Latency of the request so far in seconds.
+            final: True on the last update of the stream.
+
+        Returns:
+            The impacts of the stream so far, or None if the policy skips this update.
+        """
+        if not self._should_emit(final):
+            return None
+
+        if self.__coefficients is None or self.__model is None:
+            return self.__errors
+
+        impacts = self.__coefficients.compute(output_token_count=output_token_count, request_latency=request_latency)
+        output = ImpactsOutput(
+            energy=impacts.energy,
+            gwp=impacts.gwp,
+            adpe=impacts.adpe,
+            pe=impacts.pe,
+            wcf=impacts.wcf,
+            usage=impacts.usage,
+            embodied=impacts.embodied
+        )
+        _add_model_warnings(output, self.__model)
+        # Percentiles are only estimated for the whole response to keep the updates cheap
+        if final and self.__request is not None and EcoLogits.config.uncertainty_samples is not None:
+            output.percentiles = _compute_llm_impacts_percentiles(self.__request, output_token_count, request_latency)
+        return output
+
+
+def is_latency_capped(
+    model_active_parameter_count: Union[float, RangeValue],
+    output_token_count: int,
+    request_latency: Optional[float]
+) -> bool:
+    """
+    Check if the measured request latency is lower than the estimated generation latency of the model.
+
+    Args:
+        model_active_parameter_count: Number of active parameters of the model (in billion).
+        output_token_count: Number of generated tokens.
+        request_latency: Measured request latency in seconds.
+
+    Returns:
+        True if the generation latency is capped by the request latency (for at least one bound of the range).
+    """
+    if request_latency is None:
+        return False
+    if isinstance(model_active_parameter_count, RangeValue):
+        model_active_parameter_count = model_active_parameter_count.max
+    gpu_latency = generation_latency(
+        model_active_parameter_count=model_active_parameter_count,
+        output_token_count=output_token_count,
+        batch_size=BATCH_SIZE,
+        latency_alpha=LATENCY_ALPHA,
+        latency_beta=LATENCY_BETA,
+        latency_gamma=LATENCY_GAMMA,
+        request_latency=math.inf
+    )
+    return request_latency < gpu_latency
 
 
 @dataclass
 class _ProviderConfig:
     datacenter_location: str
-    datacenter_pue: float | RangeValue
-    datacenter_wue: float | RangeValue
+    datacenter_pue: Union[float, RangeValue]
+    datacenter_wue: Union[float, RangeValue]
 
 
 PROVIDER_CONFIG_MAP = {
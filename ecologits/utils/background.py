@@ -0,0 +1,99 @@
+from concurrent.futures import Future
+from queue import Full, Queue
+from threading import Lock, Thread
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_QUEUE_SIZE = 1024
+
+
+def _run(future: Future, func: Callable[..., Any], args: tuple[Any, ...]) -> None:
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        result = func(*args)
+    except BaseException as e:
+        future.set_exception(e)
+    else:
+        future.set_result(result)
+
+
+class BackgroundWorker:
+    """
+    Worker thread that runs tasks off the caller's thread, in submission order.
+
+    The queue of pending tasks is bounded: when it is full, tasks are run by the caller instead (back-pressure), so
+    that tasks are never dropped and memory stays bounded under load.
+
+    Examples:
+        ```python
+        worker = BackgroundWorker()
+        future = worker.submit(llm_impacts, "openai", "gpt-4o-mini", 100, 5.0)
+        impacts = future.result()
+        ```
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_QUEUE_SIZE, name: str = "ecologits-worker") -> None:
+        """
+        Args:
+            maxsize: Maximum number of pending tasks.
+            name: Name of the worker thread.
+        """
+        self.__queue: Queue[Optional[tuple[Future, Callable[..., Any], tuple[Any, ...]]]] = Queue(maxsize)
+        self.__name = name
+        self.__thread: Optional[Thread] = None
+        self.__lock = Lock()
+
+    def __start(self) -> None:
+        with self.__lock:
+            if self.__thread is None or not self.__thread.is_alive():
+                self.__thread = Thread(target=self.__loop, name=self.__name, daemon=True)
+                self.__thread.start()
+
+    def __loop(self) -> None:
+        while True:
+            task = self.__queue.get()
+            try:
+                if task is None:
+                    return
+                _run(*task)
+            finally:
+                self.__queue.task_done()
+
+    def submit(self, func: Callable[..., T], *args: Any) -> "Future[T]":
+        """
+        Schedule a task on the worker thread.
+
+        Args:
+            func: Function to call.
+            *args: Arguments of the function.
+
+        Returns:
+            The future result of the task.
+        """
+        future: Future[T] = Future()
+        if self.__thread is None or not self.__thread.is_alive():
+            self.__start()
+        try:
+            self.__queue.put_nowait((future, func, args))
+        except Full:
+            _run(future, func, args)
+        return future
+
+    def join(self) -> None:
+        """
+        Wait for all the pending tasks to be done.
+        """
+        self.__queue.join()
+
+    def shutdown(self) -> None:
+        """
+        Run the pending tasks and stop the worker thread.
+        """
+        with self.__lock:
+            thread = self.__thread
+            self.__thread = None
+        if thread is not None and thread.is_alive():
+            self.__queue.put(None)
+            thread.join()
@@ -0,0 +1,92 @@
+from typing import Any, Union
+
+from ecologits.utils.range_value import RangeValue
+
+
+class Interval:
+    """
+    Lightweight interval used for the arithmetic of the impacts engine.
+
+    Intervals have the same semantics as `RangeValue` but are not Pydantic models, so operations do not validate a
+    new model each time. They are converted to `RangeValue` at the output of the engine.
+
+    Attributes:
+        min: Lower bound of the interval.
+        max: Upper bound of the interval.
+    """
+    __slots__ = ("max", "min")
+
+    def __init__(self, min: Union[float, int], max: Union[float, int]) -> None:  # noqa: A002
+        self.min = min
+        self.max = max
+
+    def __repr__(self) -> str:
+        return f"Interval(min={self.min!r}, max={self.max!r})"
+
+    def __add__(self, other: Union["Interval", int, float]) -> "Interval":
+        if isinstance(other, Interval):
+            return Interval(self.min + other.min, self.max + other.max)
+        if not isinstance(other, (int, float)) and hasattr(other, "__array_ufunc__"):
+            return NotImplemented   # Let arrays (e.g. `RangeArray`) broadcast the interval
+        return Interval(self.min + other, self.max + other)
+
+    def __mul__(self, other: Union["Interval", int, float]) -> "Interval":
+        if isinstance(other, Interval):
+            return Interval(self.min * other.min, self.max * other.max)
+        if not isinstance(other, (int, float)) and hasattr(other, "__array_ufunc__"):
+            return NotImplemented   # Let arrays (e.g. `RangeArray`) broadcast the interval
+        return Interval(self.min * other, self.max * other)
+
+    def __truediv__(self, other: Union[int, float]) -> "Interval":
+        return Interval(self.min / other, self.max / other)
+
+    __radd__ = __add__
+    __rmul__ = __mul__
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Interval):
+            return self.min == other.min and self.max == other.max
+        if not isinstance(other, (int, float)) and hasattr(other, "__array_ufunc__"):
+            return NotImplemented
+        return bool(self.min == other and self.max == other)
+
+    def __le__(self, other: Any) -> bool:
+        if isinstance(other, Interval):
+            return bool(self.max <= other.max)
+        return bool(self.max <= other)
+
+    def __lt__(self, other: Any) -> bool:
+        if isinstance(other, Interval):
+            return bool(self.max < other.min)
+        return bool(self.max < other)
+
+    def __ge__(self, other: Any) -> bool:
+        if isinstance(other, Interval):
+            return bool(self.min >= other.min)
+        return bool(self.min >= other)
+
+    def __gt__(self, other: Any) -> bool:
+        if isinstance(other, Interval):
+            return bool(self.min > other.max)
+        return bool(self.min > other)
+
+
+IntervalOrValue = Union[int, float, Interval]
+
+
+def to_interval(value: Any) -> Any:
+    """
+    Convert a `RangeValue` to an `Interval`, other values are returned as is.
+    """
+    if isinstance(value, RangeValue):
+        return Interval(value.min, value.max)
+    return value
+
+
+def to_range_value(value: Any) -> Any:
+    """
+    Convert an `Interval` to a `RangeValue`, other values are returned as is.
+    """
+    if isinstance(value, Interval):
+        return RangeValue(min=value.min, max=value.max)
+    return value
@@ -0,0 +1,85 @@
+from concurrent.futures import Future
+from threading import Lock
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LazyProxy(Generic[T]):
+    """
+    Thread-safe proxy that creates its target object on first attribute access.
+
+    Used for module-level singletons that are costly to create (e.g. repositories loaded from data files), so that
+    importing a module does not pay for them until they are used.
+
+    Examples:
+        ```python
+        models = LazyProxy(ModelRepository.from_json)
+        models.find_model(provider="openai", model_name="gpt-4o-mini")  # Loads the repository
+        ```
+    """
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        self.__factory = factory
+        self.__target: Optional[T] = None
+        self.__lock = Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__target is not None
+
+    def get(self) -> T:
+        target = self.__target
+        if target is None:
+            with self.__lock:
+                if self.__target is None:
+                    self.__target = self.__factory()
+                target = self.__target
+        return target
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_LazyProxy__"):
+            # Not initialized yet (e.g. during unpickling)
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+
+class LazyFuture(Future[T]):
+    """
+    Future of a task that is run by the first caller waiting for its result.
+
+    Examples:
+        ```python
+        future = LazyFuture(llm_impacts, "openai", "gpt-4o-mini", 100, 5.0)
+        impacts = future.result()  # Computes the impacts
+        ```
+    """
+
+    def __init__(self, func: Callable[..., T], *args: Any) -> None:
+        super().__init__()
+        self.__task: Optional[tuple[Callable[..., T], tuple[Any, ...]]] = (func, args)
+        self.__lock = Lock()
+
+    def run(self) -> None:
+        """
+        Run the task unless it is already running or done.
+        """
+        with self.__lock:
+            task, self.__task = self.__task, None
+        if task is None or not self.set_running_or_notify_cancel():
+            return
+        func, args = task
+        try:
+            result = func(*args)
+        except BaseException as e:
+            self.set_exception(e)
+        else:
+            self.set_result(result)
+
+    def result(self, timeout: Optional[float] = None) -> T:
+        self.run()
+        return super().result(timeout)
+
+    def exception(self, timeout: Optional[float] = None) -> Optional[BaseException]:
+        self.run()
+        return super().exception(timeout)
@@ -0,0 +1,238 @@
+import atexit
+import json
+import sqlite3
+import time
+from queue import Empty, Queue
+from threading import Lock, Thread
+from typing import Any, Callable, Optional, Union
+
+from ecologits.log import logger
+from ecologits.tracers.utils import PROVIDER_CONFIG_MAP, ImpactsOutput
+from ecologits.utils.range_value import RangeValue
+
+DEFAULT_QUEUE_SIZE = 4096
+DEFAULT_BATCH_SIZE = 256
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS requests (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    endpoint TEXT,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    request_latency REAL,
+    electricity_mix_zone TEXT,
+    energy_min REAL,
+    energy_max REAL,
+    gwp_min REAL,
+    gwp_max REAL,
+    adpe_min REAL,
+    adpe_max REAL,
+    pe_min REAL,
+    pe_max REAL,
+    wcf_min REAL,
+    wcf_max REAL,
+    labels TEXT
+)
+"""
+
+_INSERT = """
+INSERT INTO requests (
+    timestamp, provider, model, endpoint, input_tokens, output_tokens, request_latency, electricity_mix_zone,
+    energy_min, energy_max, gwp_min, gwp_max, adpe_min, adpe_max, pe_min, pe_max, wcf_min, wcf_max, labels
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Recorded request: timestamp, provider, model, endpoint, input tokens, output tokens, request latency, electricity
+# mix zone, impacts and labels
+_Record = tuple[float, str, str, str, int, int, float, Optional[str], ImpactsOutput, dict[str, str]]
+
+
+def _bounds(impact: Any) -> tuple[Optional[float], Optional[float]]:
+    if impact is None:
+        return None, None
+    value: Union[float, RangeValue] = impact.value
+    if isinstance(value, RangeValue):
+        return value.min, value.max
+    return value, value
+
+
+class ImpactLedger:
+    """
+    Persistent ledger of the impacts of requests, with one row per request in the `requests` table of a SQLite
+    database.
+
+    Recording a request only appends it to a bounded queue. A writer thread inserts the queued requests in batches,
+    one transaction per batch, so that requests never wait for the disk. When the queue is full, requests wait for the
+    writer instead (back-pressure), so that no request is dropped and memory stays bounded under load. The impacts of
+    the requests are only read by the writer, so that deferred impacts are computed off the hot path.
+
+    Impacts are stored with their bounds (`<impact>_min` and `<impact>_max` columns) in the units of `ImpactsOutput`,
+    and the labels of the request (see `EcoLogits.label`) as a JSON object.
+
+    Examples:
+        ```python
+        ledger = ImpactLedger("impacts.db")
+        ledger.record_request(input_tokens=10, output_tokens=100, request_latency=1.2, impacts=impacts,
+                              provider="openai", model="gpt-4o-mini", endpoint="/chat/completions")
+        ledger.join()
+        ```
+    """
+
+    def __init__(
+        self,
+        path: str,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> None:
+        """
+        Args:
+            path: Path of the SQLite database, created if it does not exist.
+            queue_size: Maximum number of requests waiting to be written.
+            batch_size: Maximum number of requests written in a single transaction.
+        """
+        self.path = path
+        self.__batch_size = batch_size
+        self.__queue: Queue[Optional[_Record]] = Queue(queue_size)
+        self.__thread: Optional[Thread] = None
+        self.__lock = Lock()
+        self.__get_labels: Callable[[], dict[str, str]] = dict
+
+        from ecologits._ecologits import is_opentelemetry_installed
+
+        # Labels are set with `EcoLogits.label`, in the OpenTelemetry context
+        if is_opentelemetry_installed():
+            from ecologits.utils.opentelemetry import get_current_labels
+
+            self.__get_labels = get_current_labels
+
+        # Create the table on init, so that an invalid path fails early
+        with sqlite3.connect(path) as connection:
+            connection.execute(_CREATE_TABLE)
+        connection.close()
+
+        # Requests still in the queue are written before the interpreter exits
+        atexit.register(self.shutdown)
+
+    def __start(self) -> None:
+        with self.__lock:
+            if self.__thread is None or not self.__thread.is_alive():
+                self.__thread = Thread(target=self.__loop, name="ecologits-ledger", daemon=True)
+                self.__thread.start()
+
+    def __loop(self) -> None:
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        try:
+            while True:
+                batch = [self.__queue.get()]
+                while len(batch) < self.__batch_size and batch[-1] is not None:
+                    try:
+                        batch.append(self.__queue.get_nowait())
+                    except Empty:
+                        break
+                try:
+                    self.__write(connection, [record for record in batch if record is not None])
+                finally:
+                    for _ in batch:
+                        self.__queue.task_done()
+                if batch[-1] is None:
+                    return
+        finally:
+            connection.close()
+
+    @staticmethod
+    def __write(connection: sqlite3.Connection, records: list[_Record]) -> None:
+        rows = []
+        for record in records:
+            timestamp, provider, model, endpoint, input_tokens, output_tokens, request_latency, zone, impacts, \
+                labels = record
+            if zone is None:
+                provider_config = PROVIDER_CONFIG_MAP.get(provider)
+                if provider_config is not None:
+                    zone = provider_config.datacenter_location
+            try:
+                rows.append((
+                    timestamp,
+                    provider,
+                    model,
+                    endpoint,
+                    input_tokens,
+                    output_tokens,
+                    request_latency,
+                    zone or "WOR",
+                    *_bounds(impacts.energy),
+                    *_bounds(impacts.gwp),
+                    *_bounds(impacts.adpe),
+                    *_bounds(impacts.pe),
+                    *_bounds(impacts.wcf),
+                    json.dumps(labels) if labels else None
+                ))
+            except Exception as e:
+                logger.error(f"Skipped writing a request to the impact ledger: {e}")
+        if not rows:
+            return
+        try:
+            with connection:
+                connection.executemany(_INSERT, rows)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write {len(rows)} requests to the impact ledger: {e}")
+
+    def record_request(
+            self,
+            input_tokens: int,
+            output_tokens: int,
+            request_latency: float,
+            impacts: ImpactsOutput,
+            provider: str,
+            model: str,
+            endpoint: str,
+            electricity_mix_zone: Optional[str] = None
+    ) -> None:
+        """
+        Queue a request to be written to the ledger, waits for the writer if the queue is full.
+
+        Args:
+            input_tokens: Number of input tokens.
+            output_tokens: Number of output tokens.
+            request_latency: Measured request latency in seconds.
+            impacts: Impacts of the request.
+            provider: Name of the provider.
+            model: Name of the model.
+            endpoint: Endpoint of the request.
+            electricity_mix_zone: Electricity mix zone of the request, the zone of the provider by default.
+        """
+        if self.__thread is None or not self.__thread.is_alive():
+            self.__start()
+        self.__queue.put((
+            time.time(),
+            provider,
+            model,
+            endpoint,
+            input_tokens,
+            output_tokens,
+            request_latency,
+            electricity_mix_zone,
+            impacts,
+            self.__get_labels()
+        ))
+
+    def join(self) -> None:
+        """
+        Wait for all the queued requests to be written.
+        """
+        self.__queue.join()
+
+    def shutdown(self) -> None:
+        """
+        Write the queued requests and stop the writer thread.
+        """
+        with self.__lock:
+            thread = self.__thread
+            self.__thread = None
+        if thread is not None and thread.is_alive():
+            self.__queue.put(None)
+            thread.join()
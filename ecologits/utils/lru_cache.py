@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from collections.abc import Hashable
+from threading import Lock
+from typing import Generic, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Thread-safe bounded cache that evicts the Least Recently Used (LRU) entries first.
+
+    Attributes:
+        maxsize: Maximum number of entries kept in the cache.
+        hits: Number of lookups that found an entry.
+        misses: Number of lookups that did not find an entry.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__data: OrderedDict[K, V] = OrderedDict()
+        self.__lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.__data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self.__data
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.
+
+    def get(self, key: K) -> Optional[V]:
+        with self.__lock:
+            value = self.__data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.__data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        with self.__lock:
+            self.__data[key] = value
+            self.__data.move_to_end(key)
+            if len(self.__data) > self.maxsize:
+                self.__data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__data.clear()
+            self.hits = 0
+            self.misses = 0
@@ -1,14 +1,19 @@
 import asyncio
+from collections import deque
+from collections.abc import Iterable
 from functools import wraps
-from typing import Any, Callable, Optional
+from threading import Lock
+from typing import Any, Callable, Optional, Union
 
 from opentelemetry import context, metrics
 from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+from opentelemetry.metrics import CallbackOptions, Observation
 from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 
 from ecologits.log import logger
-from ecologits.tracers.utils import ImpactsOutput
+from ecologits.tracers.utils import ImpactsOutput, StreamTimings
+from ecologits.utils.background import BackgroundWorker
 from ecologits.utils.range_value import RangeValue
 
 # Create a context key for your labels
@@ -68,8 +73,73 @@ def get_current_labels() -> dict[str, str]:
     return context.get_value(_LABELS_KEY) or {}
 
 
+# Maximum number of buffered requests before they are aggregated without waiting for the next collection
+RECORD_BUFFER_SIZE = 65536
+
+
+def _mean(value: Union[float, RangeValue]) -> float:
+    return value.mean if isinstance(value, RangeValue) else value
+
+
+class _LabelSetMetrics:
+    """Aggregated metrics of the requests that share the same label set."""
+    __slots__ = (
+        "adpe",
+        "energy",
+        "gwp",
+        "input_tokens",
+        "inter_token_latency",
+        "labels",
+        "output_tokens",
+        "pe",
+        "request_latency",
+        "requests",
+        "time_to_first_token",
+    )
+
+    def __init__(self, labels: dict[str, str]) -> None:
+        self.labels = labels
+        self.requests = 0
+        # Gauges are reset once reported, so that only the label sets updated since the last collection are reported
+        self.input_tokens: Optional[int] = None
+        self.output_tokens: Optional[int] = None
+        self.request_latency: Optional[float] = None
+        # Only measured for streamed responses
+        self.time_to_first_token: Optional[float] = None
+        self.inter_token_latency: Optional[float] = None
+        self.energy: Optional[float] = None
+        self.gwp: Optional[float] = None
+        self.adpe: Optional[float] = None
+        self.pe: Optional[float] = None
+
+
 class OpenTelemetry:
-    def __init__(self, endpoint: str) -> None:
+    """
+    Record the metrics of requests with OpenTelemetry.
+
+    Recording a request only appends it to a buffer. Buffered requests are aggregated per label set when the metrics
+    are collected, in the background at the export interval: the request counter is incremented by the number of
+    requests and gauges are set to the values of the last request. Gauges only report the label sets with requests
+    since the last collection. A full buffer is aggregated by a background thread instead. The impacts of the requests are only read then,
+    so that deferred impacts are computed off the hot path.
+    """
+
+    def __init__(self, endpoint: str, buffer_size: int = RECORD_BUFFER_SIZE) -> None:
+        """
+        Args:
+            endpoint: URL of the OTLP metrics endpoint.
+            buffer_size: Maximum number of buffered requests, they are aggregated in the background beyond that.
+        """
+        self.__records: deque[
+            tuple[tuple, dict[str, str], int, int, float, ImpactsOutput, Optional[StreamTimings]]
+        ] = deque()
+        self.__buffer_size = buffer_size
+        self.__metrics: dict[tuple, _LabelSetMetrics] = {}
+        self.__lock = Lock()
+        # Aggregates a full buffer off the caller's thread, since it computes the deferred impacts
+        self.__worker = BackgroundWorker(name="ecologits-opentelemetry")
+        self.__flush_pending = False
+
         exporter = OTLPMetricExporter(endpoint=endpoint)
         reader = PeriodicExportingMetricReader(exporter, export_interval_millis=5000)
         provider = MeterProvider(metric_readers=[reader])
@@ -77,43 +147,63 @@ class OpenTelemetry:
 
         meter = metrics.get_meter("ecologits")
 
-        self.request_counter = meter.create_counter(
+        self.request_counter = meter.create_observable_counter(
             name="ecologits_requests",
+            callbacks=[self.__observe("requests", cumulative=True)],
             description="Total number of AI requests",
             unit="1"
         )
-        self.input_tokens = meter.create_gauge(
+        self.input_tokens = meter.create_observable_gauge(
             name="ecologits_input_tokens",
+            callbacks=[self.__observe("input_tokens")],
             description="Input tokens",
             unit="1"
         )
-        self.output_tokens = meter.create_gauge(
+        self.output_tokens = meter.create_observable_gauge(
             name="ecologits_output_tokens",
+            callbacks=[self.__observe("output_tokens")],
             description="Output tokens",
             unit="1"
         )
-        self.request_latency = meter.create_gauge(
+        self.request_latency = meter.create_observable_gauge(
             name="ecologits_request_latency",
+            callbacks=[self.__observe("request_latency")],
             description="Request latency in seconds",
             unit="s"
         )
-        self.energy_value = meter.create_gauge(
+        self.time_to_first_token = meter.create_observable_gauge(
+            name="ecologits_time_to_first_token",
+            callbacks=[self.__observe("time_to_first_token")],
+            description="Time to first token of streamed responses in seconds",
+            unit="s"
+        )
+        self.inter_token_latency = meter.create_observable_gauge(
+            name="ecologits_inter_token_latency",
+            callbacks=[self.__observe("inter_token_latency")],
+            description="Mean latency between tokens of streamed responses in seconds",
+            unit="s"
+        )
+        self.energy_value = meter.create_observable_gauge(
             name="ecologits_energy",
+            callbacks=[self.__observe("energy")],
             description="Energy consumption in joules",
             unit="joules"
         )
-        self.gwp_value = meter.create_gauge(
+        self.gwp_value = meter.create_observable_gauge(
             name="ecologits_gwp",
+            callbacks=[self.__observe("gwp")],
             description="Global Warming Potential in grams of CO2 equivalent",
             unit="gCO2eq"
         )
-        self.adpe_value = meter.create_gauge(
+        self.adpe_value = meter.create_observable_gauge(
             name="ecologits_adpe",
+            callbacks=[self.__observe("adpe")],
             description="Abiotic Depletion Potential for Elements in grams of Sb equivalent",
             unit="gSbeq"
         )
-        self.pe_value = meter.create_gauge(
+        self.pe_value = meter.create_observable_gauge(
             name="ecologits_pe",
+            callbacks=[self.__observe("pe")],
             description="Primary Energy in joules",
             unit="joules"
         )
@@ -126,45 +216,68 @@ class OpenTelemetry:
             impacts: ImpactsOutput,
             provider: str,
             model: str,
-            endpoint: str
+            endpoint: str,
+            timings: Optional[StreamTimings] = None
     ) -> None:
-        if impacts.energy is None \
-                or impacts.gwp is None \
-                or impacts.adpe is None \
-                or impacts.pe is None:
-            logger.error("Skipped sending request metrics because at least one of the impact values is none.")
-            return
-
-        # Build default labels
-        labels = {
-            "provider": provider,
-            "endpoint": endpoint,
-            "model": model
-        }
-
-        # Merge with user-defined labels from context
+        # User-defined labels are read from the context of the request
         user_labels = get_current_labels()
-        labels.update(user_labels)
-
-        energy_value = (
-            impacts.energy.value.mean if isinstance(impacts.energy.value, RangeValue) else impacts.energy.value
+        label_set = (provider, endpoint, model, tuple(sorted(user_labels.items())) if user_labels else ())
+        self.__records.append(
+            (label_set, user_labels, input_tokens, output_tokens, request_latency, impacts, timings)
         )
-        energy_value *= 3_600_000  # convert kWh to J
+        if len(self.__records) > self.__buffer_size and not self.__flush_pending:
+            self.__flush_pending = True
+            self.__worker.submit(self.__flush_full_buffer)
+
+    def __flush_full_buffer(self) -> None:
+        self.__flush_pending = False
+        self.flush()
 
-        gwp_value = impacts.gwp.value.mean if isinstance(impacts.gwp.value, RangeValue) else impacts.gwp.value
-        gwp_value *= 1000  # convert kg to g
+    def flush(self) -> None:
+        """
+        Aggregate the buffered requests per label set.
+        """
+        with self.__lock:
+            while self.__records:
+                label_set, user_labels, input_tokens, output_tokens, request_latency, impacts, timings = \
+                    self.__records.popleft()
+                if impacts.energy is None \
+                        or impacts.gwp is None \
+                        or impacts.adpe is None \
+                        or impacts.pe is None:
+                    logger.error("Skipped sending request metrics because at least one of the impact values is none.")
+                    continue
 
-        adpe_value = impacts.adpe.value.mean if isinstance(impacts.adpe.value, RangeValue) else impacts.adpe.value
-        adpe_value *= 1000  # convert kg to g
+                label_set_metrics = self.__metrics.get(label_set)
+                if label_set_metrics is None:
+                    # Build default labels merged with user-defined labels
+                    labels = {"provider": label_set[0], "endpoint": label_set[1], "model": label_set[2]}
+                    labels.update(user_labels)
+                    label_set_metrics = self.__metrics[label_set] = _LabelSetMetrics(labels)
 
-        pe_value = impacts.pe.value.mean if isinstance(impacts.pe.value, RangeValue) else impacts.pe.value
-        pe_value *= 1_000_000  # convert MJ to J
+                label_set_metrics.requests += 1
+                label_set_metrics.input_tokens = input_tokens
+                label_set_metrics.output_tokens = output_tokens
+                label_set_metrics.request_latency = request_latency
+                if timings is not None:
+                    label_set_metrics.time_to_first_token = timings.time_to_first_token
+                    label_set_metrics.inter_token_latency = timings.inter_token_latency
+                label_set_metrics.energy = _mean(impacts.energy.value) * 3_600_000  # convert kWh to J
+                label_set_metrics.gwp = _mean(impacts.gwp.value) * 1000  # convert kg to g
+                label_set_metrics.adpe = _mean(impacts.adpe.value) * 1000  # convert kg to g
+                label_set_metrics.pe = _mean(impacts.pe.value) * 1_000_000  # convert MJ to J
 
-        self.request_counter.add(1, labels)
-        self.input_tokens.set(input_tokens, labels)
-        self.output_tokens.set(output_tokens, labels)
-        self.request_latency.set(request_latency, labels)
-        self.energy_value.set(energy_value, labels)
-        self.gwp_value.set(gwp_value, labels)
-        self.adpe_value.set(adpe_value, labels)
-        self.pe_value.set(pe_value, labels)
+    def __observe(self, metric: str, *, cumulative: bool = False) -> Callable[[CallbackOptions], Iterable[Observation]]:
+        def callback(options: CallbackOptions) -> Iterable[Observation]:  # noqa: ARG001
+            self.flush()
+            observations = []
+            with self.__lock:
+                for m in self.__metrics.values():
+                    value = getattr(m, metric)
+                    if value is None:
+                        continue
+                    observations.append(Observation(value, m.labels))
+                    if not cumulative:
+                        setattr(m, metric, None)
+            return observations
+        return callback
@@ -0,0 +1,176 @@
+from typing import Any, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from ecologits.utils.interval import Interval
+from ecologits.utils.range_value import RangeValue
+
+# Functions that can be applied independently to both bounds because they are non-decreasing
+_NON_DECREASING_UFUNCS = frozenset({np.ceil, np.floor, np.exp, np.exp2, np.log, np.log2, np.sqrt})
+
+# NumPy functions mapped to the (operator, reflected operator) of `RangeArray`
+_UFUNC_OPERATORS = {
+    np.add: ("__add__", "__radd__"),
+    np.multiply: ("__mul__", "__rmul__"),
+    np.true_divide: ("__truediv__", None),
+    np.minimum: ("minimum", "minimum"),
+    np.maximum: ("maximum", "maximum"),
+    np.equal: ("__eq__", "__eq__"),
+    np.not_equal: ("__ne__", "__ne__"),
+    np.less: ("__lt__", "__gt__"),
+    np.less_equal: ("__le__", "__ge__"),
+    np.greater: ("__gt__", "__lt__"),
+    np.greater_equal: ("__ge__", "__le__"),
+}
+
+
+def _bounds(value: Any) -> tuple[Any, Any]:
+    if isinstance(value, (RangeArray, RangeValue, Interval)):
+        return value.min, value.max
+    return value, value
+
+
+class RangeArray:
+    """
+    Array of intervals stored as two NumPy arrays of lower and upper bounds.
+
+    Operations have the same semantics as `RangeValue`, applied element by element, and broadcast with scalars,
+    NumPy arrays and single `RangeValue`. The impacts DAG can be evaluated on `RangeArray` inputs to compute the
+    impacts of many requests at once.
+
+    Attributes:
+        min: Lower bounds of the intervals.
+        max: Upper bounds of the intervals.
+
+    Examples:
+        ```python
+        params = RangeArray(min=[3, 60], max=[8, 120])
+        params * 2 + RangeValue(min=1, max=2)  # RangeArray(min=[7., 121.], max=[18., 242.])
+        ```
+    """
+    __slots__ = ("max", "min")
+
+    def __init__(self, min: npt.ArrayLike, max: npt.ArrayLike) -> None:  # noqa: A002
+        min_array, max_array = np.broadcast_arrays(
+            np.asarray(min, dtype=np.float64),
+            np.asarray(max, dtype=np.float64)
+        )
+        if np.any(min_array > max_array):
+            raise ValueError("min value must be lower than max value")
+        self.min = min_array
+        self.max = max_array
+
+    @classmethod
+    def _from_bounds(cls, min: Any, max: Any) -> "RangeArray":  # noqa: A002
+        # Results of operations are valid by construction and are not checked again
+        range_array = cls.__new__(cls)
+        range_array.min, range_array.max = np.broadcast_arrays(min, max)
+        return range_array
+
+    @classmethod
+    def from_range_values(cls, values: list[Union[RangeValue, int, float]]) -> "RangeArray":
+        """
+        Create an array of intervals from a list of `RangeValue` or numbers.
+
+        Args:
+            values: List of ranges or numbers.
+
+        Returns:
+            The array of intervals.
+        """
+        bounds = [_bounds(value) for value in values]
+        return cls(min=[b[0] for b in bounds], max=[b[1] for b in bounds])
+
+    def to_range_values(self) -> list[RangeValue]:
+        """
+        Convert the array of intervals to a list of `RangeValue`.
+
+        Returns:
+            The list of ranges, flattened if the array has more than one dimension.
+        """
+        return [RangeValue(min=a, max=b) for a, b in zip(self.min.ravel().tolist(), self.max.ravel().tolist())]
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self.min.shape
+
+    @property
+    def mean(self) -> np.ndarray:
+        return (self.min + self.max) / 2
+
+    def __len__(self) -> int:
+        return len(self.min)
+
+    def __getitem__(self, key: Any) -> Union["RangeArray", RangeValue]:
+        min_value, max_value = self.min[key], self.max[key]
+        if np.ndim(min_value) == 0:
+            return RangeValue(min=float(min_value), max=float(max_value))
+        return RangeArray._from_bounds(min_value, max_value)
+
+    def __repr__(self) -> str:
+        return f"RangeArray(min={self.min!r}, max={self.max!r})"
+
+    def __add__(self, other: Any) -> "RangeArray":
+        other_min, other_max = _bounds(other)
+        return RangeArray._from_bounds(self.min + other_min, self.max + other_max)
+
+    def __mul__(self, other: Any) -> "RangeArray":
+        other_min, other_max = _bounds(other)
+        return RangeArray._from_bounds(self.min * other_min, self.max * other_max)
+
+    def __truediv__(self, other: npt.ArrayLike) -> "RangeArray":
+        return RangeArray._from_bounds(self.min / other, self.max / other)
+
+    __radd__ = __add__
+    __rmul__ = __mul__
+
+    def minimum(self, other: Any) -> "RangeArray":
+        """
+        Element-wise minimum of the bounds with a number, an array or intervals.
+        """
+        other_min, other_max = _bounds(other)
+        return RangeArray._from_bounds(np.minimum(self.min, other_min), np.minimum(self.max, other_max))
+
+    def maximum(self, other: Any) -> "RangeArray":
+        """
+        Element-wise maximum of the bounds with a number, an array or intervals.
+        """
+        other_min, other_max = _bounds(other)
+        return RangeArray._from_bounds(np.maximum(self.min, other_min), np.maximum(self.max, other_max))
+
+    def __eq__(self, other: Any) -> np.ndarray:  # type: ignore[override]
+        other_min, other_max = _bounds(other)
+        return (self.min == other_min) & (self.max == other_max)
+
+    def __ne__(self, other: Any) -> np.ndarray:  # type: ignore[override]
+        return ~(self == other)
+
+    def __le__(self, other: Any) -> np.ndarray:
+        return self.max <= _bounds(other)[1]
+
+    def __lt__(self, other: Any) -> np.ndarray:
+        return self.max < _bounds(other)[0]
+
+    def __ge__(self, other: Any) -> np.ndarray:
+        return self.min >= _bounds(other)[0]
+
+    def __gt__(self, other: Any) -> np.ndarray:
+        return self.min > _bounds(other)[1]
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __array_ufunc__(self, ufunc: np.ufunc, method: str, *inputs: Any, **kwargs: Any) -> Any:
+        # Called by NumPy for operations with arrays (e.g. `array * range_array`) and functions (e.g. `np.ceil`)
+        if method != "__call__" or kwargs:
+            return NotImplemented
+        if ufunc in _NON_DECREASING_UFUNCS and len(inputs) == 1:
+            return RangeArray._from_bounds(ufunc(self.min), ufunc(self.max))
+        if ufunc in _UFUNC_OPERATORS:
+            left, right = inputs
+            operator, reflected_operator = _UFUNC_OPERATORS[ufunc]
+            if isinstance(left, RangeArray):
+                return getattr(left, operator)(right)
+            if reflected_operator is not None:
+                return getattr(right, reflected_operator)(left)
+        return NotImplemented
@@ -4,6 +4,13 @@ from pydantic import BaseModel, model_validator
 from typing_extensions import Self
 
 
+def _is_range_array(value: Any) -> bool:
+    if isinstance(value, (int, float)) or not hasattr(value, "__array_ufunc__"):
+        return False
+    from ecologits.utils.range_array import RangeArray  # Only loaded (with NumPy) when comparing with arrays
+    return isinstance(value, RangeArray)
+
+
 class RangeValue(BaseModel):
     """
     RangeValue data model to represent intervals.
@@ -31,6 +38,8 @@ class RangeValue(BaseModel):
                 min=self.min + other.min,
                 max=self.max + other.max,
             )
+        elif not isinstance(other, (int, float)) and hasattr(other, "__array_ufunc__"):
+            return NotImplemented   # Let arrays (e.g. `RangeArray`) broadcast the range
         else:
             return RangeValue(
                 min=self.min + other,
@@ -43,6 +52,8 @@ class RangeValue(BaseModel):
                 min=self.min * other.min,
                 max=self.max * other.max,
             )
+        elif not isinstance(other, (int, float)) and hasattr(other, "__array_ufunc__"):
+            return NotImplemented   # Let arrays (e.g. `RangeArray`) broadcast the range
         else:
             return RangeValue(
                 min=self.min * other,
@@ -62,29 +73,31 @@ class RangeValue(BaseModel):
     def __eq__(self, other: Any) -> bool:
         if isinstance(other, RangeValue):
             return self.min == other.min and self.max == other.max
+        elif not isinstance(other, (int, float)) and hasattr(other, "__array_ufunc__"):
+            return NotImplemented
         else:
             return self.min == other and self.max == other
 
     def __le__(self, other: Any) -> bool:
-        if isinstance(other, RangeValue):
+        if isinstance(other, RangeValue) or _is_range_array(other):
             return self.max <= other.max
         else:
             return self.max <= other
 
     def __lt__(self, other: Any) -> bool:
-        if isinstance(other, RangeValue):
+        if isinstance(other, RangeValue) or _is_range_array(other):
             return self.max < other.min
         else:
             return self.max < other
 
     def __ge__(self, other: Any) -> bool:
-        if isinstance(other, RangeValue):
+        if isinstance(other, RangeValue) or _is_range_array(other):
             return self.min >= other.min
         else:
             return self.min >= other
 
     def __gt__(self, other: Any) -> bool:
-        if isinstance(other, RangeValue):
+        if isinstance(other, RangeValue) or _is_range_array(other):
             return self.min > other.max
         else:
             return self.min > other
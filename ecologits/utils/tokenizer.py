@@ -0,0 +1,187 @@
+import hashlib
+import importlib.util
+import math
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Optional
+
+from ecologits.utils.background import BackgroundWorker
+from ecologits.utils.lru_cache import LRUCache
+
+if TYPE_CHECKING:
+    from tiktoken import Encoding
+
+DEFAULT_ENCODING = "cl100k_base"
+
+# Heuristics of the approximate mode, characters per token of ASCII text and UTF-8 bytes per token of other text
+CHARS_PER_TOKEN = 4
+BYTES_PER_TOKEN = 3
+
+# Token counts of texts that are at least that long are cached
+MIN_CACHED_TEXT_LENGTH = 256
+TOKEN_COUNT_CACHE_SIZE = 4096
+
+# Token counts by (encoding name, hash of the text), so that messages repeated across requests (e.g. system prompts,
+# tool definitions or previous turns of a conversation) are only encoded once
+token_count_cache: LRUCache[tuple[str, bytes], int] = LRUCache(maxsize=TOKEN_COUNT_CACHE_SIZE)
+
+# Encoding names by model name, encoders by encoding name (one per model family)
+_encoding_names: LRUCache[str, str] = LRUCache(maxsize=256)
+_encoders: dict[str, "Encoding"] = {}
+_encoders_lock = Lock()
+_worker = BackgroundWorker(name="ecologits-tokenizer")
+_is_tiktoken_installed = importlib.util.find_spec("tiktoken") is not None
+
+
+def get_encoding_name(model_name: Optional[str]) -> str:
+    """
+    Get the name of the tiktoken encoding of a model, `cl100k_base` for models unknown to tiktoken.
+
+    Args:
+        model_name: Name of the model.
+
+    Returns:
+        The name of the encoding.
+    """
+    if model_name is None:
+        return DEFAULT_ENCODING
+    encoding_name = _encoding_names.get(model_name)
+    if encoding_name is None:
+        from tiktoken.model import encoding_name_for_model
+
+        try:
+            encoding_name = encoding_name_for_model(model_name)
+        except KeyError:
+            encoding_name = DEFAULT_ENCODING
+        _encoding_names.put(model_name, encoding_name)
+    return encoding_name
+
+
+def get_encoder(model_name: Optional[str] = None) -> "Encoding":
+    """
+    Get the tiktoken encoder of a model, loaded once per encoding.
+
+    Args:
+        model_name: Name of the model.
+
+    Returns:
+        The encoder.
+    """
+    return _load_encoder(get_encoding_name(model_name))
+
+
+def _load_encoder(encoding_name: str) -> "Encoding":
+    encoder = _encoders.get(encoding_name)
+    if encoder is None:
+        with _encoders_lock:
+            encoder = _encoders.get(encoding_name)
+            if encoder is None:
+                import tiktoken
+
+                encoder = _encoders[encoding_name] = tiktoken.get_encoding(encoding_name)
+    return encoder
+
+
+def _get(value: Any, key: str) -> Any:
+    if isinstance(value, dict):
+        return value.get(key)
+    return getattr(value, key, None)
+
+
+def message_texts(messages: Iterable[Any]) -> Iterator[str]:
+    """
+    Iterate over the texts of chat messages.
+
+    Messages are dicts or objects with a `content` that is either a string or a list of content parts. Only the text
+    of content parts is yielded (e.g. `{"type": "text", "text": "..."}`), other parts such as images are skipped.
+
+    Args:
+        messages: Chat messages.
+
+    Returns:
+        The texts of the messages.
+    """
+    for message in messages:
+        content = _get(message, "content")
+        if isinstance(content, str):
+            yield content
+        elif isinstance(content, list):
+            for part in content:
+                if isinstance(part, str):
+                    yield part
+                else:
+                    text = _get(part, "text")
+                    if isinstance(text, str):
+                        yield text
+
+
+def count_text_tokens(text: str, model_name: Optional[str] = None, mode: str = "exact") -> int:
+    """
+    Count the tokens of a text.
+
+    In exact mode, the token counts of long texts are cached by hash in `token_count_cache`.
+
+    Args:
+        text: Text to count the tokens of.
+        model_name: Name of the model, selects the encoding of the model family.
+        mode: `exact` to encode the text with tiktoken (if installed), `approximate` to estimate the count from the
+            length of the text.
+
+    Returns:
+        The number of tokens.
+    """
+    if mode == "approximate" or not _is_tiktoken_installed:
+        if text.isascii():
+            return math.ceil(len(text) / CHARS_PER_TOKEN)
+        return math.ceil(len(text.encode()) / BYTES_PER_TOKEN)
+
+    encoding_name = get_encoding_name(model_name)
+    if len(text) < MIN_CACHED_TEXT_LENGTH:
+        return len(_load_encoder(encoding_name).encode_ordinary(text))
+    key = (encoding_name, hashlib.blake2b(text.encode(), digest_size=16).digest())
+    token_count = token_count_cache.get(key)
+    if token_count is None:
+        token_count = len(_load_encoder(encoding_name).encode_ordinary(text))
+        token_count_cache.put(key, token_count)
+    return token_count
+
+
+def count_tokens(messages: Iterable[Any], model_name: Optional[str] = None, mode: str = "exact") -> int:
+    """
+    Count the tokens of all the text of chat messages.
+
+    Messages are counted one by one, so that only the new messages of a conversation are encoded.
+
+    Args:
+        messages: Chat messages.
+        model_name: Name of the model, selects the encoding of the model family.
+        mode: `exact` or `approximate`, see `count_text_tokens`.
+
+    Returns:
+        The number of tokens.
+    """
+    return sum(count_text_tokens(text, model_name, mode) for text in message_texts(messages))
+
+
+def count_tokens_in_background(
+    messages: Iterable[Any],
+    model_name: Optional[str] = None,
+    mode: str = "exact"
+) -> "Future[int]":
+    """
+    Count the tokens of chat messages in a background thread.
+
+    Encoding releases the GIL, so long prompts are encoded while the caller keeps running (e.g. waits for the
+    response). In async code, wait for the result with `await asyncio.wrap_future(future)`. When too many counts are
+    pending, the tokens are counted by the caller instead.
+
+    Args:
+        messages: Chat messages.
+        model_name: Name of the model, selects the encoding of the model family.
+        mode: `exact` or `approximate`, see `count_text_tokens`.
+
+    Returns:
+        The future number of tokens.
+    """
+    return _worker.submit(count_tokens, list(messages), model_name, mode)
@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+from ecologits.tracers.utils import ImpactsOutput, attach_impacts, llm_impacts
+
+
+class _Choice(BaseModel):
+    index: int
+    content: str
+
+
+class _Response(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    model: str
+    choices: list[_Choice]
+
+
+class Response(_Response):
+    impacts: Optional[ImpactsOutput] = None
+
+
+class _OtherResponse(BaseModel):
+    model: str
+    choices: list[_Choice]
+
+
+@dataclass
+class _Output:
+    model: str
+
+
+@dataclass
+class Output(_Output):
+    impacts: Optional[ImpactsOutput] = None
+
+
+def get_impacts() -> ImpactsOutput:
+    return llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=10, request_latency=1)
+
+
+def test_attach_impacts_pydantic():
+    impacts = get_impacts()
+    response = _Response(model="gpt-4o-mini", choices=[_Choice(index=0, content="Hello")], system="fp_123")
+    choices = response.choices
+
+    wrapped = attach_impacts(response, Response, impacts)
+    assert wrapped is response
+    assert wrapped.choices is choices
+    assert isinstance(wrapped, Response)
+    assert isinstance(wrapped, _Response)
+    assert wrapped.impacts is impacts
+    assert wrapped.model_dump() == Response(**response.model_dump()).model_dump()
+    assert "impacts" in wrapped.model_dump_json()
+
+
+def test_attach_impacts_dataclass():
+    impacts = get_impacts()
+    output = _Output(model="gpt-4o-mini")
+    wrapped = attach_impacts(output, Output, impacts)
+    assert wrapped is output
+    assert isinstance(wrapped, Output)
+    assert wrapped.impacts is impacts
+
+
+def test_attach_impacts_copy_fallback():
+    impacts = get_impacts()
+    response = _OtherResponse(model="gpt-4o-mini", choices=[_Choice(index=0, content="Hello")])
+    wrapped = attach_impacts(response, Response, impacts)
+    assert wrapped is not response
+    assert isinstance(wrapped, Response)
+    assert wrapped.choices == response.choices
+    assert wrapped.impacts == impacts
@@ -0,0 +1,146 @@
+import copy
+import pickle
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from ecologits import EcoLogits
+from ecologits.tracers.utils import ImpactsOutput, llm_impacts
+from ecologits.utils.background import BackgroundWorker
+
+
+@pytest.fixture
+def background_worker():
+    EcoLogits.config.background_worker = BackgroundWorker(maxsize=16)
+    yield EcoLogits.config.background_worker
+    EcoLogits.config.background_worker.shutdown()
+    EcoLogits.config.background_worker = None
+
+
+def test_background_worker_runs_in_order():
+    worker = BackgroundWorker()
+    results = []
+    futures = [worker.submit(results.append, i) for i in range(100)]
+    worker.join()
+    assert results == list(range(100))
+    assert all(f.done() for f in futures)
+    assert futures[0].result() is None
+    worker.shutdown()
+
+
+def test_background_worker_runs_off_thread():
+    worker = BackgroundWorker()
+    assert worker.submit(threading.get_ident).result() != threading.get_ident()
+    worker.shutdown()
+
+
+def test_background_worker_exception():
+    worker = BackgroundWorker()
+    future = worker.submit(int, "not a number")
+    with pytest.raises(ValueError):
+        future.result()
+    assert worker.submit(int, "42").result() == 42
+    worker.shutdown()
+
+
+def test_background_worker_back_pressure():
+    worker = BackgroundWorker(maxsize=1)
+    release = threading.Event()
+    blocked = worker.submit(release.wait)
+    # The worker may not have taken the first task from the queue yet, a second one fills the queue
+    pending = [worker.submit(threading.get_ident) for _ in range(2)]
+    inline = worker.submit(threading.get_ident)
+    assert inline.done()
+    assert inline.result() == threading.get_ident()
+    release.set()
+    assert blocked.result() is True
+    assert all(f.result() is not None for f in pending)
+    worker.shutdown()
+
+
+def test_background_worker_shutdown_runs_pending_tasks():
+    worker = BackgroundWorker()
+    results = []
+    for i in range(10):
+        worker.submit(results.append, i)
+    worker.shutdown()
+    assert results == list(range(10))
+    # The worker thread is restarted on demand
+    assert worker.submit(len, results).result() == 10
+    worker.shutdown()
+
+
+def test_deferred_impacts():
+    expected = llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=100, request_latency=5)
+    future = Future()
+    impacts = ImpactsOutput.deferred(future)
+    assert not impacts.is_resolved
+
+    threading.Timer(0.05, future.set_result, args=(expected,)).start()
+    assert impacts.energy == expected.energy
+    assert impacts.is_resolved
+    assert impacts == expected
+    assert impacts.has_warnings
+    assert impacts.model_fields_set == expected.model_fields_set
+
+
+def test_deferred_impacts_serialization():
+    expected = llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=100, request_latency=5)
+    future = Future()
+    future.set_result(expected)
+    assert ImpactsOutput.deferred(future).model_dump() == expected.model_dump()
+    assert ImpactsOutput.deferred(future).model_dump_json() == expected.model_dump_json()
+    assert repr(ImpactsOutput.deferred(future)) == repr(expected)
+
+
+def test_deferred_impacts_exception():
+    future = Future()
+    future.set_exception(RuntimeError("failed"))
+    impacts = ImpactsOutput.deferred(future)
+    with pytest.raises(RuntimeError):
+        _ = impacts.gwp
+
+
+def test_llm_impacts_background(background_worker):
+    kwargs = dict(provider="openai", model_name="gpt-4o-mini", output_token_count=100, request_latency=5)
+    impacts = llm_impacts(**kwargs, background=True)
+    assert isinstance(impacts, ImpactsOutput)
+    assert impacts == llm_impacts(**kwargs)
+    assert llm_impacts(**kwargs).is_resolved
+
+
+def test_llm_impacts_background_copy(background_worker):
+    kwargs = dict(provider="openai", model_name="gpt-4o-mini", output_token_count=100, request_latency=5)
+    expected = llm_impacts(**kwargs)
+    assert dict(llm_impacts(**kwargs, background=True)) == dict(expected)
+    for copy_impacts in (
+        copy.copy,
+        copy.deepcopy,
+        lambda impacts: pickle.loads(pickle.dumps(impacts)),
+        lambda impacts: impacts.model_copy(deep=True)
+    ):
+        impacts = llm_impacts(**kwargs, background=True)
+        copied = copy_impacts(impacts)
+        assert copied.is_resolved
+        assert copied == expected
+
+
+def test_llm_impacts_background_disabled():
+    impacts = llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=100, request_latency=5,
+                          background=True)
+    assert impacts.is_resolved
+
+
+def test_llm_impacts_background_error(background_worker):
+    impacts = llm_impacts(provider="openai", model_name="unknown-model", output_token_count=100, request_latency=5,
+                          background=True)
+    assert impacts.has_errors
+    assert impacts.energy is None
+
+
+def test_init_background_worker():
+    EcoLogits.init(providers=[], background_queue_size=32)
+    assert isinstance(EcoLogits.config.background_worker, BackgroundWorker)
+    EcoLogits.init(providers=[])
+    assert EcoLogits.config.background_worker is None
@@ -0,0 +1,355 @@
+"""
+Micro-benchmarks of the hot paths of EcoLogits.
+
+Benchmarks depend on the load of the machine, they are skipped unless the `ECOLOGITS_BENCHMARKS` environment variable
+is set. Timings are printed, run with `ECOLOGITS_BENCHMARKS=1 pytest -s tests/test_benchmarks.py`.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import timeit
+from unittest.mock import patch
+
+import pytest
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from pydantic import BaseModel
+
+from ecologits import EcoLogits
+from ecologits.impacts.llm import (
+    BATCH_SIZE,
+    GPU_EMBODIED_IMPACT_ADPE,
+    GPU_EMBODIED_IMPACT_GWP,
+    GPU_EMBODIED_IMPACT_PE,
+    GPU_ENERGY_ALPHA,
+    GPU_ENERGY_BETA,
+    GPU_ENERGY_GAMMA,
+    GPU_MEMORY,
+    HARDWARE_LIFESPAN,
+    LATENCY_ALPHA,
+    LATENCY_BETA,
+    LATENCY_GAMMA,
+    MODEL_QUANTIZATION_BITS,
+    SERVER_EMBODIED_IMPACT_ADPE,
+    SERVER_EMBODIED_IMPACT_GWP,
+    SERVER_EMBODIED_IMPACT_PE,
+    SERVER_GPUS,
+    SERVER_POWER,
+    compiled_dag,
+    compute_llm_impacts,
+    compute_llm_impacts_dag,
+)
+from ecologits.impacts.uncertainty import DEFAULT_SAMPLES, compute_llm_impacts_percentiles
+from ecologits.model_repository import ModelRepository
+from ecologits.tracers.utils import ImpactsOutput, attach_impacts, llm_impacts
+from ecologits.utils.background import BackgroundWorker
+from ecologits.utils.interval import to_interval, to_range_value
+from ecologits.utils.opentelemetry import OpenTelemetry, OpenTelemetryLabels, get_current_labels
+from ecologits.utils.range_value import RangeValue
+
+pytestmark = pytest.mark.skipif(
+    not os.getenv("ECOLOGITS_BENCHMARKS"), reason="Set ECOLOGITS_BENCHMARKS=1 to run the benchmarks."
+)
+
+
+def per_call_us(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+
+def test_benchmark_impacts_output_conversion():
+    impacts = compute_llm_impacts(
+        model_active_parameter_count=RangeValue(min=3, max=8),
+        model_total_parameter_count=RangeValue(min=10, max=20),
+        output_token_count=100,
+        request_latency=5,
+        if_electricity_mix_adpe=0.0000000737708,
+        if_electricity_mix_pe=9.988,
+        if_electricity_mix_gwp=0.590478,
+        if_electricity_mix_wue=5.04,
+        datacenter_pue=RangeValue(min=1.09, max=1.14),
+        datacenter_wue=0.569
+    )
+
+    def round_trip() -> ImpactsOutput:
+        return ImpactsOutput.model_validate(impacts.model_dump())
+
+    def shared() -> ImpactsOutput:
+        return ImpactsOutput(
+            energy=impacts.energy,
+            gwp=impacts.gwp,
+            adpe=impacts.adpe,
+            pe=impacts.pe,
+            wcf=impacts.wcf,
+            usage=impacts.usage,
+            embodied=impacts.embodied
+        )
+
+    assert round_trip() == shared()
+
+    before = per_call_us(round_trip, number=2000)
+    after = per_call_us(shared, number=2000)
+    print(f"\nImpactsOutput conversion: {before:.1f}µs (model_dump/model_validate) -> {after:.1f}µs (shared)")
+
+
+def test_benchmark_attach_impacts():
+    class _Message(BaseModel):
+        role: str
+        content: str
+        tool_calls: list[dict]
+
+    class _Response(BaseModel):
+        model: str
+        choices: list[_Message]
+
+    class Response(_Response):
+        impacts: ImpactsOutput | None = None
+
+    impacts = llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=100, request_latency=5)
+    for choice_count in (1, 8, 64):
+        choices = [
+            _Message(role="assistant", content="Hello " * 200, tool_calls=[{"name": "search", "arguments": "{}"}] * 4)
+            for _ in range(choice_count)
+        ]
+
+        def copy(choices=choices) -> Response:
+            return Response(**_Response(model="gpt-4o-mini", choices=choices).model_dump(), impacts=impacts)
+
+        def swap(choices=choices) -> Response:
+            return attach_impacts(_Response(model="gpt-4o-mini", choices=choices), Response, impacts)
+
+        assert copy().model_dump() == swap().model_dump()
+
+        before = per_call_us(copy, number=200)
+        after = per_call_us(swap, number=200)
+        print(f"\nAttach impacts ({choice_count} choices): {before:.1f}µs (copy) -> {after:.1f}µs (class swap)")
+
+
+def test_benchmark_import_time():
+    def import_time(code: str) -> float:
+        return min(
+            float(subprocess.check_output([sys.executable, "-c", f"""
+import time
+import ecologits.status_messages, ecologits.utils.range_value
+timer_start = time.perf_counter()
+{code}
+print(time.perf_counter() - timer_start)
+"""]))
+            for _ in range(5)
+        ) * 1e3
+
+    imports = "import ecologits.model_repository, ecologits.electricity_mix_repository\n"
+    lazy = import_time(imports)
+    # Repositories eagerly loaded at import time, as before
+    loaded = import_time(
+        imports +
+        "ecologits.model_repository.ModelRepository.from_json()\n"
+        "ecologits.electricity_mix_repository.ElectricityMixRepository.from_csv()"
+    )
+    print(f"\nImport time: {loaded:.1f}ms (with repositories loaded) -> {lazy:.1f}ms (lazy repositories)")
+
+
+def test_benchmark_model_repository_loading():
+    def from_json() -> None:
+        ModelRepository.from_json().find_model(provider="openai", model_name="gpt-4o-mini")
+
+    def from_snapshot() -> None:
+        ModelRepository.from_snapshot().find_model(provider="openai", model_name="gpt-4o-mini")
+
+    before = per_call_us(from_json, number=10) / 1e3
+    after = per_call_us(from_snapshot, number=10) / 1e3
+    print(f"\nModel repository loading: {before:.2f}ms (JSON) -> {after:.2f}ms (snapshot)")
+
+
+def test_benchmark_interval_arithmetic():
+    kwargs = dict(
+        model_active_parameter_count=RangeValue(min=3, max=8),
+        model_total_parameter_count=RangeValue(min=10, max=20),
+        output_token_count=100,
+        request_latency=5,
+        if_electricity_mix_adpe=0.0000000737708,
+        if_electricity_mix_pe=9.988,
+        if_electricity_mix_gwp=0.590478,
+        if_electricity_mix_wue=5.04,
+        datacenter_pue=RangeValue(min=1.09, max=1.14),
+        datacenter_wue=RangeValue(min=0.13, max=0.999)
+    )
+    dag_inputs = dict(
+        kwargs,
+        model_active_parameter_count=8,
+        model_total_parameter_count=20,
+        model_quantization_bits=MODEL_QUANTIZATION_BITS,
+        gpu_energy_alpha=GPU_ENERGY_ALPHA,
+        gpu_energy_beta=GPU_ENERGY_BETA,
+        gpu_energy_gamma=GPU_ENERGY_GAMMA,
+        latency_alpha=LATENCY_ALPHA,
+        latency_beta=LATENCY_BETA,
+        latency_gamma=LATENCY_GAMMA,
+        gpu_memory=GPU_MEMORY,
+        gpu_embodied_gwp=GPU_EMBODIED_IMPACT_GWP,
+        gpu_embodied_adpe=GPU_EMBODIED_IMPACT_ADPE,
+        gpu_embodied_pe=GPU_EMBODIED_IMPACT_PE,
+        server_gpu_count=SERVER_GPUS,
+        server_power=SERVER_POWER,
+        server_embodied_gwp=SERVER_EMBODIED_IMPACT_GWP,
+        server_embodied_adpe=SERVER_EMBODIED_IMPACT_ADPE,
+        server_embodied_pe=SERVER_EMBODIED_IMPACT_PE,
+        server_lifetime=HARDWARE_LIFESPAN,
+        batch_size=BATCH_SIZE
+    )
+    interval_inputs = dict(
+        dag_inputs,
+        datacenter_pue=to_interval(kwargs["datacenter_pue"]),
+        datacenter_wue=to_interval(kwargs["datacenter_wue"])
+    )
+
+    # Interval arithmetic gives the same results as the evaluation of the DAG with RangeValue
+    range_value_outputs = compiled_dag.run(**dag_inputs)
+    interval_outputs = compiled_dag.run(**interval_inputs)
+    assert {k: to_range_value(v) for k, v in interval_outputs.items()} == range_value_outputs
+
+    with_range_values = per_call_us(lambda: compiled_dag.run(**dag_inputs), number=1000)
+    with_intervals = per_call_us(lambda: compiled_dag.run(**interval_inputs), number=1000)
+    total = per_call_us(lambda: compute_llm_impacts(**kwargs), number=1000)
+    print(f"\nDAG evaluation with ranged PUE and WUE: {with_range_values:.1f}µs (RangeValue) -> "
+          f"{with_intervals:.1f}µs (Interval), compute_llm_impacts with ranged inputs: {total:.1f}µs")
+
+
+def test_benchmark_single_pass_intervals():
+    active_params = RangeValue(min=3, max=8)
+    total_params = RangeValue(min=10, max=20)
+    kwargs = dict(
+        output_token_count=100,
+        request_latency=5,
+        if_electricity_mix_adpe=0.0000000737708,
+        if_electricity_mix_pe=9.988,
+        if_electricity_mix_gwp=0.590478,
+        if_electricity_mix_wue=5.04,
+        datacenter_pue=to_interval(RangeValue(min=1.09, max=1.14)),
+        datacenter_wue=0.569
+    )
+
+    def per_bound() -> list[dict]:
+        return [
+            compute_llm_impacts_dag(
+                model_active_parameter_count=getattr(active_params, bound),
+                model_total_parameter_count=getattr(total_params, bound),
+                **kwargs
+            )
+            for bound in ("min", "max")
+        ]
+
+    def single_pass() -> dict:
+        return compute_llm_impacts_dag(
+            model_active_parameter_count=to_interval(active_params),
+            model_total_parameter_count=to_interval(total_params),
+            **kwargs
+        )
+
+    minimum, maximum = per_bound()
+    assert single_pass()["request_energy"].min == minimum["request_energy"].min
+    assert single_pass()["request_energy"].max == maximum["request_energy"].max
+
+    # Measurements are interleaved, the difference is small compared to the timing noise of a busy machine
+    before, after = float("inf"), float("inf")
+    for _ in range(5):
+        before = min(before, per_call_us(per_bound, number=500))
+        after = min(after, per_call_us(single_pass, number=500))
+    print(f"\nDAG evaluation with ranged parameters: {before:.1f}µs (once per bound) -> {after:.1f}µs (single pass)")
+
+
+def test_benchmark_monte_carlo_percentiles():
+    kwargs = dict(
+        model_active_parameter_count=RangeValue(min=3, max=8),
+        model_total_parameter_count=RangeValue(min=10, max=20),
+        output_token_count=100,
+        request_latency=5,
+        if_electricity_mix_adpe=0.0000000737708,
+        if_electricity_mix_pe=9.988,
+        if_electricity_mix_gwp=0.590478,
+        if_electricity_mix_wue=5.04,
+        datacenter_pue=RangeValue(min=1.09, max=1.14),
+        datacenter_wue=RangeValue(min=0.13, max=0.999)
+    )
+    for samples in (DEFAULT_SAMPLES, 10_000):
+        duration = per_call_us(lambda: compute_llm_impacts_percentiles(samples=samples, **kwargs), number=100)
+        print(f"\nMonte Carlo percentiles with {samples} samples: {duration:.1f}µs")
+
+
+def test_benchmark_background_impacts():
+    class Response(BaseModel):
+        content: str
+
+    class ResponseWithImpacts(Response):
+        impacts: ImpactsOutput | None = None
+
+    async def wrapper() -> ResponseWithImpacts:
+        # Time spent by an async tracer on the event loop once the response is received
+        response = Response(content="Hello")
+        impacts = llm_impacts(
+            provider="openai", model_name="gpt-4o-mini", output_token_count=100, request_latency=5, background=True
+        )
+        return attach_impacts(response, ResponseWithImpacts, impacts)
+
+    def event_loop_us() -> float:
+        loop = asyncio.new_event_loop()
+        try:
+            return per_call_us(lambda: loop.run_until_complete(wrapper()), number=500)
+        finally:
+            loop.close()
+
+    inline = event_loop_us()
+    EcoLogits.config.background_worker = BackgroundWorker(maxsize=4096)
+    try:
+        background = event_loop_us()
+        response = asyncio.run(wrapper())
+        assert response.impacts.energy is not None
+    finally:
+        EcoLogits.config.background_worker.shutdown()
+        EcoLogits.config.background_worker = None
+    print(f"\nEvent loop time per async response: {inline:.1f}µs (inline) -> {background:.1f}µs (background)")
+
+
+def test_benchmark_opentelemetry_recording():
+    impacts = llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=100, request_latency=5)
+    requests_per_second = 10_000
+
+    # Baseline: one call per instrument and per request
+    meter = MeterProvider(metric_readers=[InMemoryMetricReader()]).get_meter("ecologits")
+    counter = meter.create_counter("ecologits_requests")
+    gauges = [meter.create_gauge(f"ecologits_gauge_{i}") for i in range(7)]
+
+    def record_per_instrument() -> None:
+        labels = {"provider": "openai", "endpoint": "/chat/completions", "model": "gpt-4o-mini"}
+        labels.update(get_current_labels())
+        counter.add(1, labels)
+        for gauge in gauges:
+            gauge.set(impacts.energy.value.mean * 3_600_000, labels)
+
+    reader = InMemoryMetricReader()
+    with patch("ecologits.utils.opentelemetry.OTLPMetricExporter"), \
+            patch("ecologits.utils.opentelemetry.PeriodicExportingMetricReader", return_value=reader), \
+            patch("ecologits.utils.opentelemetry.MeterProvider", side_effect=MeterProvider), \
+            patch("ecologits.utils.opentelemetry.metrics.set_meter_provider"):
+        telemetry = OpenTelemetry("http://fake-endpoint:4318/v1/metrics")
+
+    def record_batched() -> None:
+        # One second of requests, then one collection of the metrics
+        for _ in range(requests_per_second):
+            telemetry.record_request(
+                input_tokens=10,
+                output_tokens=100,
+                request_latency=5,
+                impacts=impacts,
+                provider="openai",
+                model="gpt-4o-mini",
+                endpoint="/chat/completions"
+            )
+        reader.collect()
+
+    with OpenTelemetryLabels(task="benchmark"):
+        before = per_call_us(record_per_instrument, number=requests_per_second)
+        after = min(timeit.repeat(record_batched, number=1, repeat=3)) / requests_per_second * 1e6
+    print(f"\nOpenTelemetry recording at {requests_per_second} requests/s: {before:.2f}µs "
+          f"({before * requests_per_second / 1e4:.1f}% of a core) -> {after:.2f}µs "
+          f"({after * requests_per_second / 1e4:.1f}% of a core) per request")
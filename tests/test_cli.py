@@ -0,0 +1,156 @@
+import csv
+import json
+
+import pytest
+
+from ecologits.cli import main, score, score_records
+from ecologits.exceptions import EcoLogitsError
+from ecologits.tracers.utils import llm_impacts
+
+RECORDS = [
+    {"provider": "openai", "model": "gpt-4o-mini", "output_tokens": 100, "request_latency": 1.5},
+    {"provider": "mistralai", "model": "mistral-small-latest", "output_tokens": 20, "request_latency": 0.2, "zone": "FRA"},
+    {"provider": "openai", "model": "unknown-model", "output_tokens": 10, "request_latency": 1},
+    {"provider": "anthropic", "model": "claude-3-5-sonnet-latest", "output_tokens": 300},
+]
+
+
+def test_score_records_matches_llm_impacts():
+    scored = score_records([dict(r) for r in RECORDS])
+    for record, result in zip(RECORDS, scored):
+        impacts = llm_impacts(
+            provider=record["provider"],
+            model_name=record["model"],
+            output_token_count=record["output_tokens"],
+            request_latency=record.get("request_latency", float("inf")),
+            electricity_mix_zone=record.get("zone"),
+        )
+        if impacts.has_errors:
+            assert result["error"] is not None
+            assert result["energy_max"] is None
+            continue
+        assert result["error"] is None
+        energy = impacts.energy.value
+        assert result["energy_min"] == pytest.approx(getattr(energy, "min", energy), rel=1e-12)
+        assert result["energy_max"] == pytest.approx(getattr(energy, "max", energy), rel=1e-12)
+        gwp = impacts.gwp.value
+        assert result["gwp_max"] == pytest.approx(getattr(gwp, "max", gwp), rel=1e-12)
+
+
+def test_score_records_with_default_zone():
+    scored = score_records([dict(RECORDS[0]), dict(RECORDS[1])], electricity_mix_zone="FRA")
+    assert scored[0]["zone"] == "FRA"
+    assert scored[1]["zone"] == "FRA"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_score_jsonl(tmp_path, workers):
+    input_path = tmp_path / "requests.jsonl"
+    output_path = tmp_path / "impacts.jsonl"
+    input_path.write_text("\n".join(json.dumps(r) for r in RECORDS * 5))
+
+    count = score(str(input_path), str(output_path), chunk_size=3, workers=workers)
+
+    assert count == 20
+    lines = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert len(lines) == 20
+    assert [r["model"] for r in lines] == [r["model"] for r in RECORDS * 5]
+    assert all(r["gwp_min"] <= r["gwp_max"] for r in lines if r["error"] is None)
+
+
+def test_score_csv_cli(tmp_path, capsys):
+    input_path = tmp_path / "requests.csv"
+    output_path = tmp_path / "impacts.csv"
+    with open(input_path, "w", newline="") as fd:
+        writer = csv.DictWriter(fd, fieldnames=["provider", "model", "output_tokens", "request_latency", "zone"])
+        writer.writeheader()
+        writer.writerows(RECORDS)
+
+    assert main(["score", str(input_path), "-o", str(output_path), "--workers", "1"]) == 0
+
+    with open(output_path, newline="") as fd:
+        rows = list(csv.DictReader(fd))
+    assert len(rows) == len(RECORDS)
+    assert float(rows[0]["energy_max"]) > 0
+    assert rows[2]["error"] != ""
+    assert "rows/s" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("output_tokens", [None, "", "many", [100], {"value": 100}])
+def test_score_records_with_invalid_tokens(output_tokens):
+    invalid = {"provider": "openai", "model": "gpt-4o-mini", "output_tokens": output_tokens}
+    scored = score_records([invalid, dict(RECORDS[0]), dict(RECORDS[0], request_latency=[1.5])])
+    assert "output_tokens" in scored[0]["error"]
+    assert scored[0]["energy_max"] is None
+    assert scored[1]["error"] is None
+    assert "request_latency" in scored[2]["error"]
+
+
+def test_score_csv_header_from_all_records(tmp_path):
+    input_path = tmp_path / "requests.jsonl"
+    output_path = tmp_path / "impacts.csv"
+    records = [
+        {"provider": "openai", "model": "gpt-4o-mini", "output_tokens": 100},
+        {"provider": "openai", "model": "gpt-4o-mini", "output_tokens": 100, "request_latency": 1.5, "user": "u1"},
+    ]
+    input_path.write_text("\n".join(json.dumps(r) for r in records))
+
+    score(str(input_path), str(output_path), workers=1)
+
+    with open(output_path, newline="") as fd:
+        rows = list(csv.DictReader(fd))
+    assert rows[0]["user"] == ""
+    assert rows[1]["request_latency"] == "1.5"
+    assert rows[1]["user"] == "u1"
+
+
+def test_score_csv_with_new_fields_in_later_chunks(tmp_path):
+    input_path = tmp_path / "requests.jsonl"
+    output_path = tmp_path / "impacts.csv"
+    records = [
+        {"provider": "openai", "model": "gpt-4o-mini", "output_tokens": 100},
+        {"provider": "openai", "model": "gpt-4o-mini", "output_tokens": 100, "user": "u1"},
+    ]
+    input_path.write_text("\n".join(json.dumps(r) for r in records))
+
+    with pytest.raises(EcoLogitsError):
+        score(str(input_path), str(output_path), chunk_size=1, workers=1)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_score_jsonl_with_invalid_lines(tmp_path, workers):
+    input_path = tmp_path / "requests.jsonl"
+    output_path = tmp_path / "impacts.jsonl"
+    lines = [json.dumps(RECORDS[0]), "{not json", "[1, 2]", "null", json.dumps(RECORDS[1])]
+    input_path.write_text("\n".join(lines))
+
+    assert score(str(input_path), str(output_path), chunk_size=2, workers=workers) == 5
+
+    results = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert [r["error"] is None for r in results] == [True, False, False, False, True]
+    assert "Invalid JSON on line 2" in results[1]["error"]
+    assert "on line 3" in results[2]["error"]
+    assert "not an object" in results[3]["error"]
+    assert results[2]["energy_max"] is None
+    assert results[4]["energy_max"] > 0
+
+
+def test_score_csv_with_invalid_lines(tmp_path):
+    input_path = tmp_path / "requests.jsonl"
+    output_path = tmp_path / "impacts.csv"
+    input_path.write_text("\n".join([json.dumps(RECORDS[0]), "{not json", json.dumps(RECORDS[0])]))
+
+    assert score(str(input_path), str(output_path), chunk_size=1, workers=1) == 3
+
+    with open(output_path, newline="") as fd:
+        rows = list(csv.DictReader(fd))
+    assert rows[1]["provider"] == ""
+    assert rows[1]["error"] != ""
+    assert rows[2]["error"] == ""
+
+
+def test_score_records_not_objects():
+    scored = score_records([[1, 2], dict(RECORDS[0])])
+    assert scored[0]["error"] is not None
+    assert scored[0]["energy_max"] is None
+    assert scored[1]["error"] is None
@@ -0,0 +1,88 @@
+import pytest
+
+from ecologits.impacts.dag import DAG
+from ecologits.impacts.llm import compiled_dag, dag
+
+
+def make_dag() -> DAG:
+    test_dag = DAG()
+
+    @test_dag.asset
+    def double(value: float) -> float:
+        return 2 * value
+
+    @test_dag.asset
+    def total(double: float, offset: float) -> float:
+        return double + offset
+
+    return test_dag
+
+
+def test_compiled_dag_inputs():
+    plan = make_dag().compile()
+    assert plan.inputs == frozenset({"value", "offset"})
+
+
+def test_compiled_dag_run():
+    test_dag = make_dag()
+    plan = test_dag.compile()
+    assert plan.run(value=1, offset=3) == test_dag.execute(value=1, offset=3)
+    assert plan.run(value=2, offset=0)["total"] == 4
+
+
+def test_compiled_dag_skips_provided_tasks():
+    plan = make_dag().compile(inputs=["double", "offset"])
+    assert plan.run(double=10, offset=1)["total"] == 11
+
+
+def test_compiled_dag_skips_tasks_provided_on_run():
+    test_dag = make_dag()
+    plan = test_dag.compile()
+    assert plan.run(value=1, double=10, offset=1) == test_dag.execute(value=1, double=10, offset=1)
+    assert plan.run(value=1, double=10, offset=1)["double"] == 10
+
+
+@pytest.mark.parametrize(
+    ["model_active_parameter_count", "model_total_parameter_count", "output_token_count", "request_latency"],
+    [
+        (7.3, 7.3, 200, 5),
+        (12.9, 46.7, 200, 10),
+        (12.9, 46.7, 200, 0.1),
+    ]
+)
+def test_compiled_llm_dag_matches_execute(model_active_parameter_count: float,
+                                          model_total_parameter_count: float,
+                                          output_token_count: int,
+                                          request_latency: float):
+    inputs = dict(
+        model_active_parameter_count=model_active_parameter_count,
+        model_total_parameter_count=model_total_parameter_count,
+        model_quantization_bits=16,
+        output_token_count=output_token_count,
+        request_latency=request_latency,
+        if_electricity_mix_gwp=0.590478,
+        if_electricity_mix_adpe=0.0000000737708,
+        if_electricity_mix_pe=9.988,
+        if_electricity_mix_wue=5.04,
+        datacenter_wue=0.37,
+        datacenter_pue=1.26,
+        gpu_energy_alpha=1.1665273170451914e-06,
+        gpu_energy_beta=-0.011205921025579175,
+        gpu_energy_gamma=4.052928146734005e-05,
+        latency_alpha=0.0006785088094353663,
+        latency_beta=0.0003119310311688259,
+        latency_gamma=0.019473717579473387,
+        gpu_memory=80,
+        gpu_embodied_gwp=164,
+        gpu_embodied_adpe=5.1e-3,
+        gpu_embodied_pe=1828,
+        server_gpu_count=8,
+        server_power=1.2,
+        server_embodied_gwp=5700,
+        server_embodied_adpe=0.37,
+        server_embodied_pe=70000,
+        server_lifetime=3 * 365 * 24 * 60 * 60,
+        batch_size=64
+    )
+    assert compiled_dag.inputs == frozenset(inputs.keys())
+    assert compiled_dag.run(**inputs) == dag.execute(**inputs)
@@ -1,4 +1,14 @@
-from ecologits.electricity_mix_repository import ElectricityMix, ElectricityMixRepository
+import math
+from datetime import datetime, timezone
+
+import pytest
+
+from ecologits.electricity_mix_repository import (
+    ElectricityMix,
+    ElectricityMixRepository,
+    TimeSeriesElectricityMixRepository,
+    to_timestamp,
+)
 
 
 def test_create_electricity_mix_repository_default():
@@ -33,3 +43,106 @@ def test_list_electricity_mixes():
     assert len(electricity_mixes) == 2
     assert em1 in electricity_mixes
     assert em2 in electricity_mixes
+
+
+def test_find_first_duplicated_zone():
+    em1 = ElectricityMix(zone="AAA", adpe=0., pe=0., gwp=0., wue=0.)
+    em2 = ElectricityMix(zone="AAA", adpe=1., pe=1., gwp=1., wue=1.)
+    repository = ElectricityMixRepository([em1, em2])
+    assert repository.find_electricity_mix(zone="AAA") is em1
+
+
+def test_find_many():
+    electricity_mixes = ElectricityMixRepository.from_csv()
+    columns = electricity_mixes.find_many(["FRA", "AAA", "USA", "FRA"])
+    fra = electricity_mixes.find_electricity_mix(zone="FRA")
+    usa = electricity_mixes.find_electricity_mix(zone="USA")
+    assert columns.zones == ["FRA", "AAA", "USA", "FRA"]
+    assert columns.found == [True, False, True, True]
+    assert columns.gwp[0] == columns.gwp[3] == fra.gwp
+    assert columns.wue[2] == usa.wue
+    assert math.isnan(columns.adpe[1])
+
+
+def test_find_many_numpy():
+    np = pytest.importorskip("numpy")
+    electricity_mixes = ElectricityMixRepository.from_csv()
+    columns = electricity_mixes.find_many(["FRA", "USA"])
+    gwp = np.frombuffer(columns.gwp)
+    assert gwp.dtype == np.float64
+    assert gwp.tolist() == [
+        electricity_mixes.find_electricity_mix(zone="FRA").gwp,
+        electricity_mixes.find_electricity_mix(zone="USA").gwp,
+    ]
+
+
+@pytest.fixture
+def timeseries_csv(tmp_path):
+    filepath = tmp_path / "electricity_mixes_timeseries.csv"
+    filepath.write_text(
+        "zone,datetime,adpe,pe,gwp,wue\n"
+        "FRA,2024-01-01T01:00:00Z,0.0,1.0,0.02,1.0\n"
+        "FRA,2024-01-01T00:00:00Z,0.0,1.0,0.01,1.0\n"
+        "FRA,2024-01-01T02:00:00Z,0.0,1.0,0.03,1.0\n"
+        "USA,2024-01-01T00:00:00,0.0,1.0,0.4,1.0\n"
+    )
+    return str(filepath)
+
+
+def test_timeseries_find_electricity_mix(timeseries_csv):
+    repository = TimeSeriesElectricityMixRepository.from_csv(timeseries_csv)
+    assert sorted(repository.list_zones()) == ["FRA", "USA"]
+    assert repository.find_electricity_mix(zone="FRA", timestamp="2024-01-01T00:00:00Z").gwp == 0.01
+    assert repository.find_electricity_mix(zone="FRA", timestamp="2024-01-01T00:59:59Z").gwp == 0.01
+    assert repository.find_electricity_mix(zone="FRA", timestamp=datetime(2024, 1, 1, 1, 30)).gwp == 0.02
+    assert repository.find_electricity_mix(zone="FRA", timestamp="2024-01-01T02:30:00+00:00").gwp == 0.03
+    # Single mix of a zone applies from its timestamp onward
+    assert repository.find_electricity_mix(zone="USA", timestamp="2025-01-01T00:00:00Z").gwp == 0.4
+
+
+def test_timeseries_find_uncovered_time(timeseries_csv):
+    repository = TimeSeriesElectricityMixRepository.from_csv(timeseries_csv)
+    assert repository.find_electricity_mix(zone="FRA", timestamp="2023-12-31T23:59:59Z") is None
+    assert repository.find_electricity_mix(zone="FRA", timestamp="2024-01-01T03:00:00Z") is None
+    assert repository.find_electricity_mix(zone="AAA", timestamp="2024-01-01T00:00:00Z") is None
+
+
+@pytest.mark.parametrize("value", [
+    "2024-01-01T01:30:00Z",
+    "2024-01-01T01:30:00+00:00",
+    "2024-01-01T02:30:00+01:00",
+    "2024-01-01T01:30:00",
+    datetime(2024, 1, 1, 1, 30),
+    1704072600,
+    "1704072600",
+])
+def test_to_timestamp(value):
+    assert to_timestamp(value) == datetime(2024, 1, 1, 1, 30, tzinfo=timezone.utc).timestamp()
+
+
+def test_timeseries_find_many(timeseries_csv):
+    repository = TimeSeriesElectricityMixRepository.from_csv(timeseries_csv)
+    timestamp = datetime(2024, 1, 1, 1, 15, tzinfo=timezone.utc).timestamp()
+    columns = repository.find_many(["FRA", "FRA", "AAA"], [timestamp, "2024-01-01T00:15:00Z", timestamp])
+    assert columns.found == [True, True, False]
+    assert columns.gwp[:2].tolist() == [0.02, 0.01]
+    assert math.isnan(columns.gwp[2])
+
+
+def test_llm_impacts_with_timeseries(timeseries_csv):
+    from ecologits import EcoLogits
+    from ecologits.tracers.utils import llm_impacts
+
+    EcoLogits.config.electricity_mix_timeseries = TimeSeriesElectricityMixRepository.from_csv(timeseries_csv)
+    try:
+        kwargs = dict(provider="openai", model_name="gpt-4o-mini", output_token_count=10, request_latency=1,
+                      electricity_mix_zone="FRA")
+        first_hour = llm_impacts(**kwargs, request_timestamp="2024-01-01T00:30:00Z")
+        second_hour = llm_impacts(**kwargs, request_timestamp="2024-01-01T01:30:00Z")
+        # Falls back to the static electricity mix when the time is not covered
+        fallback = llm_impacts(**kwargs, request_timestamp="2025-01-01T00:00:00Z")
+    finally:
+        EcoLogits.config.electricity_mix_timeseries = None
+
+    assert first_hour.usage.gwp.value.max * 2 == pytest.approx(second_hour.usage.gwp.value.max)
+    assert fallback == llm_impacts(**kwargs)
@@ -0,0 +1,70 @@
+import pytest
+
+from ecologits import EcoLogits
+from ecologits.status_messages import ModelNotRegisteredError
+from ecologits.tracers.utils import llm_impacts
+from ecologits.utils.lru_cache import LRUCache
+
+
+@pytest.fixture
+def impacts_cache():
+    EcoLogits.config.impacts_cache = LRUCache(maxsize=8)
+    yield EcoLogits.config.impacts_cache
+    EcoLogits.config.impacts_cache = None
+
+
+def test_llm_impacts_cache_hit(impacts_cache):
+    first = llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=5, request_latency=60)
+    second = llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=5, request_latency=30)
+    assert impacts_cache.misses == 1
+    assert impacts_cache.hits == 1
+    assert first == second
+    assert first is not second
+    assert second.warnings == first.warnings
+
+
+def test_llm_impacts_cache_key(impacts_cache):
+    llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=5, request_latency=60)
+    llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=6, request_latency=60)
+    llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=5, request_latency=60,
+                electricity_mix_zone="FRA")
+    assert impacts_cache.hits == 0
+    assert len(impacts_cache) == 3
+
+
+def test_llm_impacts_cache_skips_capped_latency(impacts_cache):
+    first = llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=1000, request_latency=0.01)
+    second = llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=1000, request_latency=0.02)
+    assert len(impacts_cache) == 0
+    assert first.energy.value != second.energy.value
+
+
+def test_llm_impacts_cache_matches_uncached(impacts_cache):
+    cached = [llm_impacts(provider="mistralai", model_name="mistral-small-latest", output_token_count=3,
+                          request_latency=10) for _ in range(3)]
+    EcoLogits.config.impacts_cache = None
+    uncached = llm_impacts(provider="mistralai", model_name="mistral-small-latest", output_token_count=3,
+                           request_latency=10)
+    assert all(c == uncached for c in cached)
+
+
+def test_init_impacts_cache():
+    EcoLogits.init(providers=[], impacts_cache_size=16)
+    assert EcoLogits.config.impacts_cache is not None
+    assert EcoLogits.config.impacts_cache.maxsize == 16
+    EcoLogits.init(providers=[])
+    assert EcoLogits.config.impacts_cache is None
+
+
+def test_llm_impacts_cache_copies_messages(impacts_cache):
+    first = llm_impacts(provider="cohere", model_name="c4ai-aya-vision-8b", output_token_count=5, request_latency=60)
+    assert first.has_warnings
+    first.warnings.clear()
+    first.add_errors(ModelNotRegisteredError(message="Changed by the caller"))
+    second = llm_impacts(provider="cohere", model_name="c4ai-aya-vision-8b", output_token_count=5, request_latency=60)
+    assert impacts_cache.hits == 1
+    assert second.has_warnings
+    assert not second.has_errors
+    second.warnings[0].message = "Changed by the caller"
+    third = llm_impacts(provider="cohere", model_name="c4ai-aya-vision-8b", output_token_count=5, request_latency=60)
+    assert third.warnings[0].message != "Changed by the caller"
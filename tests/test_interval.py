@@ -0,0 +1,49 @@
+import operator
+import random
+
+import pytest
+
+from ecologits.utils.interval import Interval, to_interval, to_range_value
+from ecologits.utils.range_value import RangeValue
+
+
+def as_interval(value):
+    return Interval(value.min, value.max) if isinstance(value, RangeValue) else value
+
+
+@pytest.mark.parametrize("op", [operator.add, operator.mul, operator.eq, operator.ne, operator.le, operator.lt,
+                                operator.ge, operator.gt])
+def test_interval_matches_range_value(op):
+    rng = random.Random(42)
+    for _ in range(500):
+        bounds = sorted([rng.uniform(0, 5), rng.uniform(0, 5)])
+        other_bounds = sorted([rng.uniform(0, 5), rng.uniform(0, 5)])
+        scalar = rng.choice([rng.uniform(0, 5), bounds[0], bounds[1]])
+        range_value = RangeValue(min=bounds[0], max=bounds[1])
+        for other in (RangeValue(min=other_bounds[0], max=other_bounds[1]), scalar):
+            for left, right in ((range_value, other), (other, range_value)):
+                expected = op(left, right)
+                result = op(as_interval(left), as_interval(right))
+                if isinstance(expected, RangeValue):
+                    assert (result.min, result.max) == (expected.min, expected.max)
+                else:
+                    assert result == expected
+
+
+def test_interval_truediv():
+    result = Interval(2, 4) / 2
+    assert (result.min, result.max) == (1, 2)
+
+
+def test_interval_conversions():
+    interval = to_interval(RangeValue(min=1, max=2.5))
+    assert isinstance(interval, Interval)
+    assert (interval.min, interval.max) == (1, 2.5)
+    assert to_range_value(interval) == RangeValue(min=1, max=2.5)
+    assert to_interval(3.0) == 3.0
+    assert to_range_value(3.0) == 3.0
+
+
+def test_interval_validated_at_output():
+    with pytest.raises(ValueError):
+        to_range_value(Interval(2, 1))
@@ -0,0 +1,152 @@
+import copy
+import pickle
+import threading
+from unittest.mock import patch
+
+import pytest
+from pydantic import BaseModel
+
+from ecologits import EcoLogits
+from ecologits.tracers import utils
+from ecologits.tracers.utils import ImpactsOutput, llm_impacts
+from ecologits.utils.background import BackgroundWorker
+from ecologits.utils.lazy import LazyFuture, LazyProxy
+
+
+class Response(BaseModel):
+    content: str
+    impacts: ImpactsOutput
+
+
+class Counter:
+    created = 0
+
+    def __init__(self) -> None:
+        Counter.created += 1
+        self.value = 42
+
+    def double(self) -> int:
+        return 2 * self.value
+
+
+def test_lazy_proxy_creates_on_first_access():
+    Counter.created = 0
+    proxy = LazyProxy(Counter)
+    assert not proxy.is_loaded
+    assert Counter.created == 0
+
+    assert proxy.double() == 84
+    assert proxy.value == 42
+    assert proxy.is_loaded
+    assert Counter.created == 1
+    assert proxy.get() is proxy.get()
+
+
+def test_repositories_are_lazy():
+    from ecologits.electricity_mix_repository import electricity_mixes
+    from ecologits.model_repository import models
+
+    assert models.find_model(provider="openai", model_name="gpt-4o-mini") is not None
+    assert electricity_mixes.find_electricity_mix(zone="FRA") is not None
+    assert models.is_loaded
+    assert electricity_mixes.is_loaded
+
+
+def test_lazy_future_runs_once_on_result():
+    calls = []
+
+    def task(value: int) -> int:
+        calls.append(value)
+        return 2 * value
+
+    future = LazyFuture(task, 21)
+    assert not future.done()
+    assert calls == []
+    assert future.result() == 42
+    assert future.result() == 42
+    assert calls == [21]
+
+
+def test_lazy_future_concurrent_waiters():
+    started, release = threading.Event(), threading.Event()
+
+    def task() -> int:
+        started.set()
+        release.wait()
+        return 42
+
+    future = LazyFuture(task)
+    thread = threading.Thread(target=future.run)
+    thread.start()
+    started.wait()
+    # The task is running in another thread, the result is waited for instead of computed again
+    timer = threading.Timer(0.05, release.set)
+    timer.start()
+    assert future.result() == 42
+    thread.join()
+
+
+def test_lazy_future_exception():
+    future = LazyFuture(int, "not a number")
+    assert isinstance(future.exception(), ValueError)
+    with pytest.raises(ValueError):
+        future.result()
+
+
+@pytest.fixture
+def lazy_impacts():
+    EcoLogits.config.lazy_impacts = True
+    yield
+    EcoLogits.config.lazy_impacts = False
+
+
+def test_llm_impacts_lazy(lazy_impacts):
+    kwargs = dict(provider="openai", model_name="gpt-4o-mini", output_token_count=100, request_latency=5)
+    with patch.object(utils, "_compute_llm_impacts", wraps=utils._compute_llm_impacts) as compute:
+        impacts = llm_impacts(**kwargs)
+        assert not impacts.is_resolved
+        assert compute.call_count == 0
+        assert impacts.gwp is not None
+        assert impacts.energy is not None
+        assert compute.call_count == 1
+    EcoLogits.config.lazy_impacts = False
+    assert impacts == llm_impacts(**kwargs)
+
+
+def test_llm_impacts_lazy_in_background(lazy_impacts):
+    EcoLogits.config.background_worker = BackgroundWorker()
+    try:
+        impacts = llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=100,
+                              request_latency=5, background=True)
+        EcoLogits.config.background_worker.join()
+        # Background impacts are computed right away, not on first access
+        assert not impacts.is_resolved
+        assert impacts._future.done()
+    finally:
+        EcoLogits.config.background_worker.shutdown()
+        EcoLogits.config.background_worker = None
+
+
+def test_llm_impacts_lazy_copy(lazy_impacts):
+    kwargs = dict(provider="openai", model_name="gpt-4o-mini", output_token_count=100, request_latency=5)
+    expected = llm_impacts(**kwargs)
+    assert dict(llm_impacts(**kwargs)) == dict(expected)
+    assert llm_impacts(**kwargs).model_fields_set == expected.model_fields_set
+    assert copy.copy(llm_impacts(**kwargs)) == expected
+    for copy_response in (
+        copy.deepcopy,
+        lambda response: pickle.loads(pickle.dumps(response)),
+        lambda response: response.model_copy(deep=True)
+    ):
+        response = Response(content="Hello", impacts=llm_impacts(**kwargs))
+        copied = copy_response(response)
+        assert copied.impacts.is_resolved
+        assert copied.impacts == expected
+        assert copied.impacts is not response.impacts
+
+
+def test_init_lazy_impacts():
+    EcoLogits.init(providers=[], lazy_impacts=True)
+    assert EcoLogits.config.lazy_impacts
+    EcoLogits.init(providers=[])
+    assert not EcoLogits.config.lazy_impacts
@@ -0,0 +1,170 @@
+import json
+import sqlite3
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from ecologits import EcoLogits
+from ecologits.impacts.modeling import GWP, PE, ADPe, Energy
+from ecologits.tracers.utils import ImpactsOutput, llm_impacts, record_request
+from ecologits.utils.lazy import LazyFuture
+from ecologits.utils.ledger import ImpactLedger
+from ecologits.utils.opentelemetry import OpenTelemetryLabels
+from ecologits.utils.range_value import RangeValue
+
+IMPACTS = ImpactsOutput(
+    energy=Energy(value=RangeValue(min=0.1, max=0.3)),
+    gwp=GWP(value=0.2),
+    adpe=ADPe(value=0.3),
+    pe=PE(value=0.4)
+)
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = ImpactLedger(str(tmp_path / "impacts.db"))
+    yield ledger
+    ledger.shutdown()
+
+
+def read_rows(ledger: ImpactLedger) -> list[sqlite3.Row]:
+    with sqlite3.connect(ledger.path) as connection:
+        connection.row_factory = sqlite3.Row
+        rows = connection.execute("SELECT * FROM requests ORDER BY id").fetchall()
+    connection.close()
+    return rows
+
+
+def record(ledger: ImpactLedger, impacts: ImpactsOutput = IMPACTS, **kwargs) -> None:
+    ledger.record_request(
+        input_tokens=kwargs.get("input_tokens", 10),
+        output_tokens=100,
+        request_latency=1.5,
+        impacts=impacts,
+        provider="openai",
+        model="gpt-4o-mini",
+        endpoint="/chat/completions",
+        electricity_mix_zone=kwargs.get("electricity_mix_zone")
+    )
+
+
+def test_ledger_record_request(ledger):
+    record(ledger)
+    record(ledger, electricity_mix_zone="FRA")
+    ledger.join()
+
+    rows = read_rows(ledger)
+    assert len(rows) == 2
+    row = rows[0]
+    assert row["provider"] == "openai"
+    assert row["model"] == "gpt-4o-mini"
+    assert row["endpoint"] == "/chat/completions"
+    assert row["input_tokens"] == 10
+    assert row["output_tokens"] == 100
+    assert row["request_latency"] == 1.5
+    assert row["timestamp"] > 0
+    assert (row["energy_min"], row["energy_max"]) == (0.1, 0.3)
+    assert (row["gwp_min"], row["gwp_max"]) == (0.2, 0.2)
+    assert (row["wcf_min"], row["wcf_max"]) == (None, None)
+    assert row["labels"] is None
+    # Zone of the provider by default
+    assert row["electricity_mix_zone"] == "USA"
+    assert rows[1]["electricity_mix_zone"] == "FRA"
+
+
+def test_ledger_labels(ledger):
+    with OpenTelemetryLabels(user_id="user123", task="summarization"):
+        record(ledger)
+    ledger.join()
+    assert json.loads(read_rows(ledger)[0]["labels"]) == {"user_id": "user123", "task": "summarization"}
+
+
+def test_ledger_deferred_impacts(ledger):
+    future = Future()
+    record(ledger, impacts=ImpactsOutput.deferred(future))
+    future.set_result(IMPACTS)
+    ledger.join()
+    assert read_rows(ledger)[0]["pe_max"] == 0.4
+
+
+def test_ledger_impacts_with_errors(ledger):
+    record(ledger, impacts=llm_impacts(provider="openai", model_name="unknown-model", output_token_count=100,
+                                       request_latency=1.5))
+    failed = Future()
+    failed.set_exception(RuntimeError("failed"))
+    record(ledger, impacts=ImpactsOutput.deferred(failed))
+    record(ledger, input_tokens=20)
+    ledger.join()
+
+    rows = read_rows(ledger)
+    # Requests without impacts are still accounted, requests whose impacts cannot be read are skipped
+    assert len(rows) == 2
+    assert rows[0]["energy_min"] is None
+    assert rows[1]["input_tokens"] == 20
+
+
+def test_ledger_batches(tmp_path):
+    ledger = ImpactLedger(str(tmp_path / "impacts.db"), batch_size=16)
+    for i in range(1000):
+        record(ledger, input_tokens=i)
+    ledger.shutdown()
+    assert [row["input_tokens"] for row in read_rows(ledger)] == list(range(1000))
+
+
+def test_ledger_back_pressure(tmp_path):
+    ledger = ImpactLedger(str(tmp_path / "impacts.db"), queue_size=1, batch_size=1)
+    writing = threading.Event()
+    release = threading.Event()
+
+    def compute_impacts() -> ImpactsOutput:
+        writing.set()
+        release.wait()
+        return IMPACTS
+
+    # The writer waits for the impacts of the first request, the second one fills the queue
+    record(ledger, impacts=ImpactsOutput.deferred(LazyFuture(compute_impacts)))
+    writing.wait()
+    record(ledger)
+
+    blocked = threading.Thread(target=record, args=(ledger,))
+    blocked.start()
+    blocked.join(timeout=0.1)
+    assert blocked.is_alive()
+
+    release.set()
+    blocked.join()
+    ledger.shutdown()
+    assert len(read_rows(ledger)) == 3
+
+
+def test_ledger_shutdown_writes_pending_requests(ledger):
+    for _ in range(10):
+        record(ledger)
+    ledger.shutdown()
+    assert len(read_rows(ledger)) == 10
+    # The writer thread is restarted on demand
+    record(ledger)
+    ledger.join()
+    assert len(read_rows(ledger)) == 11
+
+
+def test_init_ledger(tmp_path):
+    path = str(tmp_path / "impacts.db")
+    EcoLogits.init(providers=[], ledger_path=path)
+    assert isinstance(EcoLogits.config.ledger, ImpactLedger)
+    assert EcoLogits.config.records_requests
+
+    record_request(
+        input_tokens=10,
+        output_tokens=100,
+        request_latency=1.5,
+        impacts=IMPACTS,
+        provider="openai",
+        model="gpt-4o-mini",
+        endpoint="/chat/completions"
+    )
+    ledger = EcoLogits.config.ledger
+    EcoLogits.init(providers=[])
+    assert EcoLogits.config.ledger is None
+    assert len(read_rows(ledger)) == 1
@@ -1,7 +1,7 @@
 import litellm
 import pytest
 
-from ecologits.tracers.litellm_tracer import litellm_match_model
+from ecologits.tracers.litellm_tracer import _model_matcher, _ModelMatcher, litellm_match_model
 
 
 @pytest.mark.parametrize("model_name,expected_tuple", [
@@ -21,6 +21,30 @@ def test_litellm_match_model(model_name, expected_tuple):
     assert litellm_match_model(model_name) == expected_tuple
 
 
+def test_litellm_match_model_memoized():
+    matcher = _ModelMatcher(_model_matcher.choices)
+    assert matcher.match("openai/gpt-4o") == ("openai", "gpt-4o")
+    assert len(matcher.cache) == 0
+    assert matcher.match("claude-3-opus") == ("anthropic", "claude-3-opus-latest")
+    assert matcher.match("claude-3-opus") == ("anthropic", "claude-3-opus-latest")
+    assert matcher.cache.misses == 1
+    assert matcher.cache.hits == 1
+    assert matcher.match("zzzz") is None
+    assert matcher.match("zzzz") is None
+    assert matcher.cache.hits == 2
+
+
+def test_litellm_match_model_token_index():
+    choices = _model_matcher.choices
+    full_scan = _ModelMatcher(choices, token_index=False)
+    indexed = _ModelMatcher(choices, token_index=True)
+    names = [choice.split("/", 1)[1] for choice in choices]
+    queries = names + [f"{prefix}/{name}" for name in names for prefix in ("azure", "bedrock", "openrouter")] \
+        + [f"{name}-2024-08-06" for name in names] + [name.upper() for name in names]
+    for query in queries:
+        assert indexed.match(query) == full_scan.match(query), query
+
+
 @pytest.mark.vcr
 def test_litellm_chat(tracer_init):
     response = litellm.completion(
@@ -1,10 +1,16 @@
+import math
+import random
 from operator import ge, gt
 
 import numpy as np
 import pytest
 
-from ecologits.impacts.llm import compute_llm_impacts
+from ecologits.impacts.llm import compute_llm_impacts, compute_llm_impacts_coefficients, compute_llm_impacts_dag
 from ecologits.impacts.modeling import Impacts, Energy, GWP, ADPe, PE, WCF, Usage, Embodied
+from ecologits.electricity_mix_repository import electricity_mixes
+from ecologits.model_repository import ParametersMoE, models
+from ecologits.tracers.utils import PROVIDER_CONFIG_MAP, llm_impacts
+from ecologits.utils.range_value import RangeValue, ValueOrRange
 
 
 @pytest.mark.parametrize(
@@ -135,3 +141,160 @@ def test_compute_llm_impacts_monotonicity_on_parameters(if_electricity_mix_adpe:
             compare_impacts(impacts_moe, prev_impacts_moe, op=gt)
             compare_impacts(impacts, impacts_moe, op=ge)
             prev_impacts_moe = impacts_moe.model_copy(deep=True)
+
+
+@pytest.mark.parametrize('model_active_parameter_count', [7.3, RangeValue(min=3, max=8)])
+@pytest.mark.parametrize('model_total_parameter_count', [46.7, RangeValue(min=10, max=70)])
+@pytest.mark.parametrize('datacenter_pue', [1.2, RangeValue(min=1.09, max=1.14)])
+@pytest.mark.parametrize('datacenter_wue', [0.569, RangeValue(min=0.13, max=0.99)])
+def test_compute_llm_impacts_coefficients(model_active_parameter_count: ValueOrRange,
+                                          model_total_parameter_count: ValueOrRange,
+                                          datacenter_pue: ValueOrRange,
+                                          datacenter_wue: ValueOrRange):
+    electricity_mix = dict(
+        if_electricity_mix_adpe=0.0000000737708,
+        if_electricity_mix_pe=9.988,
+        if_electricity_mix_gwp=0.590478,
+        if_electricity_mix_wue=5.04,
+    )
+    coefficients = compute_llm_impacts_coefficients(
+        model_active_parameter_count=model_active_parameter_count,
+        model_total_parameter_count=model_total_parameter_count,
+        datacenter_pue=datacenter_pue,
+        datacenter_wue=datacenter_wue,
+        **electricity_mix
+    )
+    for output_token_count in [0, 1, 100, 2000]:
+        for request_latency in [None, 0.01, 1, 100]:
+            impacts = compute_llm_impacts(
+                model_active_parameter_count=model_active_parameter_count,
+                model_total_parameter_count=model_total_parameter_count,
+                output_token_count=output_token_count,
+                request_latency=request_latency,
+                datacenter_pue=datacenter_pue,
+                datacenter_wue=datacenter_wue,
+                **electricity_mix
+            )
+            assert coefficients.compute(output_token_count, request_latency).model_dump() == impacts.model_dump()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_llm_impacts_coefficients_table_matches_dag(seed: int):
+    rng = random.Random(seed)
+    model_list = models.list_models()
+    zones = [electricity_mix.zone for electricity_mix in electricity_mixes.list_electricity_mixes()]
+    for _ in range(200):
+        model = rng.choice(model_list)
+        provider = model.provider.value
+        zone = rng.choice(zones)
+        output_token_count = rng.randint(0, 5000)
+        request_latency = rng.choice([rng.uniform(0.001, 10), rng.uniform(10, 1000), math.inf])
+
+        if isinstance(model.architecture.parameters, ParametersMoE):
+            total_params = model.architecture.parameters.total
+            active_params = model.architecture.parameters.active
+        else:
+            total_params = active_params = model.architecture.parameters
+        electricity_mix = electricity_mixes.find_electricity_mix(zone=zone)
+        provider_config = PROVIDER_CONFIG_MAP[provider]
+        expected = compute_llm_impacts(
+            model_active_parameter_count=active_params,
+            model_total_parameter_count=total_params,
+            output_token_count=output_token_count,
+            request_latency=request_latency,
+            if_electricity_mix_adpe=electricity_mix.adpe,
+            if_electricity_mix_pe=electricity_mix.pe,
+            if_electricity_mix_gwp=electricity_mix.gwp,
+            if_electricity_mix_wue=electricity_mix.wue,
+            datacenter_pue=provider_config.datacenter_pue,
+            datacenter_wue=provider_config.datacenter_wue,
+        )
+
+        impacts = llm_impacts(
+            provider=provider,
+            model_name=model.name,
+            output_token_count=output_token_count,
+            request_latency=request_latency,
+            electricity_mix_zone=zone
+        )
+        assert impacts.model_dump(exclude={"warnings", "errors", "percentiles"}) == expected.model_dump()
+
+
+def compute_llm_impacts_per_bound(active_params: ValueOrRange, total_params: ValueOrRange, **kwargs) -> dict:
+    # Reference evaluation of the DAG once for each bound of the parameters
+    bounds = {}
+    for bound in ("min", "max"):
+        results = compute_llm_impacts_dag(
+            model_active_parameter_count=getattr(active_params, bound, active_params),
+            model_total_parameter_count=getattr(total_params, bound, total_params),
+            **kwargs
+        )
+        bounds[bound] = {name: getattr(value, bound, value) for name, value in results.items()}
+    return bounds
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_compute_llm_impacts_single_pass_matches_bounds(seed: int):
+    rng = random.Random(seed)
+    model_list = models.list_models()
+    for _ in range(200):
+        model = rng.choice(model_list)
+        if isinstance(model.architecture.parameters, ParametersMoE):
+            total_params = model.architecture.parameters.total
+            active_params = model.architecture.parameters.active
+        else:
+            total_params = active_params = model.architecture.parameters
+        provider_config = PROVIDER_CONFIG_MAP[model.provider.value]
+        kwargs = dict(
+            output_token_count=rng.randint(0, 5000),
+            request_latency=rng.choice([rng.uniform(0.001, 10), rng.uniform(10, 1000), math.inf]),
+            if_electricity_mix_adpe=0.0000000737708,
+            if_electricity_mix_pe=9.988,
+            if_electricity_mix_gwp=0.590478,
+            if_electricity_mix_wue=5.04,
+            datacenter_pue=provider_config.datacenter_pue,
+            datacenter_wue=provider_config.datacenter_wue,
+        )
+        impacts = compute_llm_impacts(
+            model_active_parameter_count=active_params,
+            model_total_parameter_count=total_params,
+            **kwargs
+        )
+        expected = compute_llm_impacts_per_bound(active_params, total_params, **kwargs)
+        values = {
+            "request_energy": impacts.energy.value,
+            "request_usage_gwp": impacts.usage.gwp.value,
+            "request_usage_adpe": impacts.usage.adpe.value,
+            "request_usage_pe": impacts.usage.pe.value,
+            "request_usage_wcf": impacts.usage.wcf.value,
+            "request_embodied_gwp": impacts.embodied.gwp.value,
+            "request_embodied_adpe": impacts.embodied.adpe.value,
+            "request_embodied_pe": impacts.embodied.pe.value,
+        }
+        for name, value in values.items():
+            assert getattr(value, "min", value) == expected["min"][name]
+            assert getattr(value, "max", value) == expected["max"][name]
+
+
+def test_compute_llm_impacts_single_pass_latency_within_range():
+    # The measured latency is between the estimated latencies of the smallest and the largest model
+    kwargs = dict(
+        output_token_count=500,
+        request_latency=30,
+        if_electricity_mix_adpe=0.0000000737708,
+        if_electricity_mix_pe=9.988,
+        if_electricity_mix_gwp=0.590478,
+        if_electricity_mix_wue=5.04,
+        datacenter_pue=1.2,
+        datacenter_wue=0.569,
+    )
+    active_params = RangeValue(min=10, max=100)
+    impacts = compute_llm_impacts(
+        model_active_parameter_count=active_params,
+        model_total_parameter_count=RangeValue(min=100, max=400),
+        **kwargs
+    )
+    expected = compute_llm_impacts_per_bound(active_params, RangeValue(min=100, max=400), **kwargs)
+    assert expected["min"]["generation_latency"] < 30 == expected["max"]["generation_latency"]
+    assert impacts.embodied.gwp.value.min == expected["min"]["request_embodied_gwp"]
+    assert impacts.embodied.gwp.value.max == expected["max"]["request_embodied_gwp"]
@@ -0,0 +1,90 @@
+import pytest
+
+from ecologits import EcoLogits
+from ecologits.exceptions import EcoLogitsError
+from ecologits.tracers.utils import LLMImpactsAccumulator, llm_impacts
+
+
+def test_accumulator_matches_llm_impacts():
+    accumulator = LLMImpactsAccumulator(provider="openai", model_name="gpt-4o-mini")
+    for output_token_count in range(0, 200, 7):
+        request_latency = 0.01 * output_token_count + 0.2
+        impacts = accumulator.update(output_token_count=output_token_count, request_latency=request_latency)
+        expected = llm_impacts(
+            provider="openai",
+            model_name="gpt-4o-mini",
+            output_token_count=output_token_count,
+            request_latency=request_latency
+        )
+        assert impacts == expected
+
+
+def test_accumulator_final_only():
+    accumulator = LLMImpactsAccumulator(provider="openai", model_name="gpt-4o-mini", stream_impacts="final_only")
+    for output_token_count in range(1, 10):
+        assert accumulator.update(output_token_count=output_token_count, request_latency=1) is None
+    final = accumulator.update(output_token_count=10, request_latency=1, final=True)
+    assert final == llm_impacts(
+        provider="openai",
+        model_name="gpt-4o-mini",
+        output_token_count=10,
+        request_latency=1
+    )
+
+
+def test_accumulator_every_n_chunks():
+    accumulator = LLMImpactsAccumulator(
+        provider="mistralai",
+        model_name="mistral-small-latest",
+        stream_impacts="every_n_chunks",
+        stream_impacts_interval=3
+    )
+    emitted = [
+        accumulator.update(output_token_count=i, request_latency=1) is not None
+        for i in range(1, 8)
+    ]
+    assert emitted == [True, False, False, True, False, False, True]
+    assert accumulator.update(output_token_count=8, request_latency=1, final=True) is not None
+
+
+def test_accumulator_every_n_ms():
+    accumulator = LLMImpactsAccumulator(
+        provider="openai",
+        model_name="gpt-4o-mini",
+        stream_impacts="every_n_ms",
+        stream_impacts_interval=60_000
+    )
+    assert accumulator.update(output_token_count=1, request_latency=1) is not None
+    assert accumulator.update(output_token_count=2, request_latency=1) is None
+    assert accumulator.update(output_token_count=3, request_latency=1, final=True) is not None
+
+
+def test_accumulator_with_electricity_mix_zone():
+    accumulator = LLMImpactsAccumulator(provider="openai", model_name="gpt-4o-mini", electricity_mix_zone="FRA")
+    impacts = accumulator.update(output_token_count=10, request_latency=1)
+    assert impacts == llm_impacts(
+        provider="openai",
+        model_name="gpt-4o-mini",
+        output_token_count=10,
+        request_latency=1,
+        electricity_mix_zone="FRA"
+    )
+
+
+def test_accumulator_unknown_model():
+    accumulator = LLMImpactsAccumulator(provider="openai", model_name="unknown-model")
+    impacts = accumulator.update(output_token_count=10, request_latency=1)
+    assert impacts.has_errors
+    assert impacts.energy is None
+
+
+def test_accumulator_unknown_zone():
+    accumulator = LLMImpactsAccumulator(provider="openai", model_name="gpt-4o-mini", electricity_mix_zone="AAA")
+    assert accumulator.update(output_token_count=10, request_latency=1).has_errors
+
+
+def test_init_unknown_stream_impacts_policy():
+    with pytest.raises(EcoLogitsError):
+        EcoLogits.init(providers=[], stream_impacts="sometimes")
+    with pytest.raises(EcoLogitsError):
+        EcoLogits.init(providers=[], stream_impacts="every_n_chunks", stream_impacts_interval=0)
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from ecologits.impacts.batch import IMPACT_COLUMNS, compute_llm_impacts_batch
+from ecologits.impacts.llm import compute_llm_impacts
+from ecologits.utils.range_value import RangeValue
+
+
+def impacts_to_columns(impacts) -> dict[str, float]:
+    values = {
+        "energy": impacts.energy.value,
+        "gwp": impacts.gwp.value,
+        "adpe": impacts.adpe.value,
+        "pe": impacts.pe.value,
+        "wcf": impacts.wcf.value,
+        "usage_gwp": impacts.usage.gwp.value,
+        "usage_adpe": impacts.usage.adpe.value,
+        "usage_pe": impacts.usage.pe.value,
+        "embodied_gwp": impacts.embodied.gwp.value,
+        "embodied_adpe": impacts.embodied.adpe.value,
+        "embodied_pe": impacts.embodied.pe.value,
+    }
+    columns = {}
+    for name, value in values.items():
+        columns[f"{name}_min"] = value.min if isinstance(value, RangeValue) else value
+        columns[f"{name}_max"] = value.max if isinstance(value, RangeValue) else value
+    return columns
+
+
+ROWS = [
+    # active params, total params, output tokens, latency, pue, wue
+    (7.3, 7.3, 200, 5, 1.26, 0.37),
+    (12.9, 46.7, 200, 10, RangeValue(min=1.09, max=1.14), RangeValue(min=0.13, max=0.999)),
+    (RangeValue(min=60, max=120), RangeValue(min=300, max=600), 1000, 0.5, 1.2, 0.569),
+    (RangeValue(min=3, max=8), 8, 1, 100, 1.16, 0.09),
+]
+MIX = dict(
+    if_electricity_mix_adpe=0.0000000737708,
+    if_electricity_mix_pe=9.988,
+    if_electricity_mix_gwp=0.590478,
+    if_electricity_mix_wue=5.04,
+)
+
+
+@pytest.mark.parametrize(
+    ["active_params", "total_params", "output_token_count", "request_latency", "datacenter_pue", "datacenter_wue"],
+    ROWS
+)
+def test_compute_llm_impacts_batch_matches_scalar(active_params, total_params, output_token_count,
+                                                  request_latency, datacenter_pue, datacenter_wue):
+    expected = impacts_to_columns(compute_llm_impacts(
+        model_active_parameter_count=active_params,
+        model_total_parameter_count=total_params,
+        output_token_count=output_token_count,
+        request_latency=request_latency,
+        datacenter_pue=datacenter_pue,
+        datacenter_wue=datacenter_wue,
+        **MIX
+    ))
+    results = compute_llm_impacts_batch(
+        model_active_parameter_count=active_params,
+        model_total_parameter_count=total_params,
+        output_token_count=[output_token_count],
+        request_latency=[request_latency],
+        datacenter_pue=datacenter_pue,
+        datacenter_wue=datacenter_wue,
+        **MIX
+    )
+    assert set(results.keys()) == set(expected.keys())
+    for column, value in expected.items():
+        assert results[column].shape == (1,)
+        assert results[column][0] == pytest.approx(value, rel=1e-12)
+
+
+def test_compute_llm_impacts_batch_columns():
+    n = 1000
+    rng = np.random.default_rng(0)
+    active_min = rng.uniform(1, 100, size=n)
+    results = compute_llm_impacts_batch(
+        model_active_parameter_count=(active_min, active_min * 2),
+        model_total_parameter_count=(active_min * 4, active_min * 8),
+        output_token_count=rng.integers(1, 2000, size=n),
+        request_latency=rng.uniform(0.1, 30, size=n),
+        datacenter_pue=RangeValue(min=1.09, max=1.14),
+        datacenter_wue=0.5,
+        **MIX
+    )
+    assert len(results) == 2 * len(IMPACT_COLUMNS)
+    for column in IMPACT_COLUMNS:
+        assert results[f"{column}_min"].shape == (n,)
+        assert np.all(results[f"{column}_min"] <= results[f"{column}_max"])
+
+
+def test_compute_llm_impacts_batch_without_latency():
+    results = compute_llm_impacts_batch(
+        model_active_parameter_count=[7.3, 70],
+        model_total_parameter_count=[7.3, 70],
+        output_token_count=100,
+        datacenter_pue=1.2,
+        datacenter_wue=0.5,
+        **MIX
+    )
+    expected = compute_llm_impacts(
+        model_active_parameter_count=70,
+        model_total_parameter_count=70,
+        output_token_count=100,
+        datacenter_pue=1.2,
+        datacenter_wue=0.5,
+        **MIX
+    )
+    assert results["energy_max"].shape == (2,)
+    assert results["energy_max"][1] == pytest.approx(expected.energy.value, rel=1e-12)
@@ -0,0 +1,39 @@
+import pytest
+
+from ecologits.utils.lru_cache import LRUCache
+
+
+def test_lru_cache_hits_and_misses():
+    cache = LRUCache(maxsize=2)
+    assert cache.get("a") is None
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert cache.hit_rate == 0.5
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert len(cache) == 2
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_lru_cache_clear():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hits == 0
+
+
+def test_lru_cache_invalid_size():
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
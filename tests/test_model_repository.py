@@ -1,4 +1,14 @@
-from ecologits.model_repository import ModelRepository
+import hashlib
+import json
+import shutil
+
+from ecologits.model_repository import (
+    DEFAULT_MODELS_JSON_PATH,
+    DEFAULT_MODELS_SNAPSHOT_PATH,
+    ModelRepository,
+    _SnapshotReader,
+    build_snapshot,
+)
 
 
 def test_create_empty_repository():
@@ -43,3 +53,49 @@ def test_add_custom_model():
     }
     models.add_model(custom_model_data)
     assert models.find_model("openai", "gpt-4.1-2025-04-14") is not None
+
+
+def test_snapshot_matches_json(tmp_path):
+    snapshot_path = str(tmp_path / "models.snapshot")
+    models = ModelRepository.from_json()
+    models.to_snapshot(snapshot_path, DEFAULT_MODELS_JSON_PATH)
+
+    snapshot_models = ModelRepository.from_snapshot(snapshot_path)
+    assert snapshot_models.find_model(provider="openai", model_name="gpt-4o-mini") == \
+        models.find_model(provider="openai", model_name="gpt-4o-mini")
+    assert snapshot_models.find_model(provider="openai", model_name="unknown-model") is None
+    assert snapshot_models.list_models() == models.list_models()
+
+
+def test_default_snapshot_is_up_to_date():
+    with open(DEFAULT_MODELS_SNAPSHOT_PATH, "rb") as fd:
+        reader = _SnapshotReader(fd.read())
+    with open(DEFAULT_MODELS_JSON_PATH, "rb") as fd:
+        json_digest = hashlib.sha256(fd.read()).digest()
+    # Run `make models-snapshot` after editing models.json
+    assert len(reader.read_index(json_digest)) == len(ModelRepository.from_json().list_models())
+
+
+def test_stale_snapshot_falls_back_to_json(tmp_path):
+    json_path = tmp_path / "models.json"
+    snapshot_path = str(tmp_path / "models.snapshot")
+    shutil.copy(DEFAULT_MODELS_JSON_PATH, json_path)
+    build_snapshot(str(json_path), snapshot_path)
+
+    data = json.loads(json_path.read_text())
+    data["models"] = [m for m in data["models"] if m["name"] != "gpt-4o-mini"]
+    data["aliases"] = [a for a in data["aliases"] if a["alias"] != "gpt-4o-mini"]
+    json_path.write_text(json.dumps(data))
+
+    models = ModelRepository.from_snapshot(snapshot_path, str(json_path))
+    assert models.find_model(provider="openai", model_name="gpt-4o-mini") is None
+    assert models.find_model(provider="openai", model_name="gpt-4o") is not None
+
+
+def test_invalid_snapshot_falls_back_to_json(tmp_path):
+    snapshot_path = tmp_path / "models.snapshot"
+    snapshot_path.write_bytes(b"not a snapshot")
+    models = ModelRepository.from_snapshot(str(snapshot_path))
+    assert models.find_model(provider="openai", model_name="gpt-4o-mini") is not None
+    assert ModelRepository.from_snapshot(str(tmp_path / "missing.snapshot")).list_models() == \
+        ModelRepository.from_json().list_models()
@@ -1,3 +1,5 @@
+from concurrent.futures import Future
+from threading import Timer
 from unittest.mock import patch
 
 import pytest
@@ -6,8 +8,13 @@ from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.metrics.export import InMemoryMetricReader
 
 from ecologits.impacts.modeling import GWP, PE, ADPe, Energy
-from ecologits.tracers.utils import ImpactsOutput
-from ecologits.utils.opentelemetry import OpenTelemetry, OpenTelemetryLabels, get_current_labels
+from ecologits.tracers.utils import ImpactsOutput, StreamTimings
+from ecologits.utils.opentelemetry import (
+    RECORD_BUFFER_SIZE,
+    OpenTelemetry,
+    OpenTelemetryLabels,
+    get_current_labels,
+)
 from ecologits.utils.range_value import RangeValue
 
 
@@ -37,9 +44,8 @@ def in_memory_telemetry():
         yield telemetry, reader
 
 
-def get_metric_data(reader, metric_name):
-    """Helper to extract metric data from the in-memory reader."""
-    metrics_data = reader.get_metrics_data()
+def get_metric_data(metrics_data, metric_name):
+    """Helper to extract metric data from the metrics collected by the in-memory reader."""
     if not metrics_data:
         return None
 
@@ -110,41 +116,41 @@ def test_record_request_with_valid_data(in_memory_telemetry):
     )
 
     # Force collection of metrics
-    reader.collect()
+    metrics_data = reader.get_metrics_data()
 
     # Verify counters were updated with correct values
     expected_labels = {"endpoint": endpoint, "model": model, "provider": provider}
 
     # Check that metrics were created with correct values
-    request_metric = get_metric_data(reader, "ecologits_requests")
+    request_metric = get_metric_data(metrics_data, "ecologits_requests")
     assert request_metric is not None
     assert get_metric_value_with_attributes(request_metric, expected_labels) == 1
 
-    # input_tokens_metric = get_metric_data(reader, "ecologits_input_tokens")
+    # input_tokens_metric = get_metric_data(metrics_data, "ecologits_input_tokens")
     # assert input_tokens_metric is not None
     # assert get_metric_value_with_attributes(input_tokens_metric, expected_labels) == input_tokens
     #
-    # output_tokens_metric = get_metric_data(reader, "ecologits_output_tokens")
+    # output_tokens_metric = get_metric_data(metrics_data, "ecologits_output_tokens")
     # assert output_tokens_metric is not None
     # assert get_metric_value_with_attributes(output_tokens_metric, expected_labels) == output_tokens
     #
-    # request_latency_metric = get_metric_data(reader, "ecologits_request_latency")
+    # request_latency_metric = get_metric_data(metrics_data, "ecologits_request_latency")
     # assert request_latency_metric is not None
     # assert get_metric_value_with_attributes(request_latency_metric, expected_labels) == request_latency
     #
-    # energy_metric = get_metric_data(reader, "ecologits_energy")
+    # energy_metric = get_metric_data(metrics_data, "ecologits_energy")
     # assert energy_metric is not None
     # assert get_metric_value_with_attributes(energy_metric, expected_labels) == 0.1 * 3_600_000
     #
-    # gwp_metric = get_metric_data(reader, "ecologits_gwp")
+    # gwp_metric = get_metric_data(metrics_data, "ecologits_gwp")
     # assert gwp_metric is not None
     # assert get_metric_value_with_attributes(gwp_metric, expected_labels) == 0.2 * 1000
     #
-    # adpe_metric = get_metric_data(reader, "ecologits_adpe")
+    # adpe_metric = get_metric_data(metrics_data, "ecologits_adpe")
     # assert adpe_metric is not None
     # assert get_metric_value_with_attributes(adpe_metric, expected_labels) == 0.3 * 1000
     #
-    # pe_metric = get_metric_data(reader, "ecologits_pe")
+    # pe_metric = get_metric_data(metrics_data, "ecologits_pe")
     # assert pe_metric is not None
     # assert get_metric_value_with_attributes(pe_metric, expected_labels) == 0.4 * 1_000_000
 
@@ -169,21 +175,21 @@ def test_record_request_with_range_values(in_memory_telemetry):
     )
 
     # Force collection
-    reader.collect()
+    metrics_data = reader.get_metrics_data()
 
     # Verify mean values were used
     expected_labels = {"provider": "openai", "model": "gpt-4o-mini", "endpoint": "/chat/completions"}
 
-    energy_metric = get_metric_data(reader, "ecologits_energy")
+    energy_metric = get_metric_data(metrics_data, "ecologits_energy")
     assert get_metric_value_with_attributes(energy_metric, expected_labels) == pytest.approx(0.1 * 3_600_000)
 
-    gwp_metric = get_metric_data(reader, "ecologits_gwp")
+    gwp_metric = get_metric_data(metrics_data, "ecologits_gwp")
     assert get_metric_value_with_attributes(gwp_metric, expected_labels) == pytest.approx(0.2 * 1000)
 
-    adpe_metric = get_metric_data(reader, "ecologits_adpe")
+    adpe_metric = get_metric_data(metrics_data, "ecologits_adpe")
     assert get_metric_value_with_attributes(adpe_metric, expected_labels) == pytest.approx(0.3 * 1000)
 
-    pe_metric = get_metric_data(reader, "ecologits_pe")
+    pe_metric = get_metric_data(metrics_data, "ecologits_pe")
     assert get_metric_value_with_attributes(pe_metric, expected_labels) == pytest.approx(0.4 * 1_000_000)
 
 
@@ -206,10 +212,10 @@ def test_record_request_with_missing_data(in_memory_telemetry):
         endpoint="/chat/completions"
     )
 
-    reader.collect()
+    metrics_data = reader.get_metrics_data()
 
     # Verify no counters were updated
-    request_metric = get_metric_data(reader, "ecologits_requests")
+    request_metric = get_metric_data(metrics_data, "ecologits_requests")
     assert request_metric is None or len(request_metric.data.data_points) == 0
 
     # Test with another None value
@@ -228,10 +234,10 @@ def test_record_request_with_missing_data(in_memory_telemetry):
         endpoint="/chat/completions"
     )
 
-    reader.collect()
+    metrics_data = reader.get_metrics_data()
 
     # Verify still no counters were updated
-    request_metric = get_metric_data(reader, "ecologits_requests")
+    request_metric = get_metric_data(metrics_data, "ecologits_requests")
     assert request_metric is None or len(request_metric.data.data_points) == 0
 
 
@@ -300,7 +306,7 @@ def test_record_request_with_user_labels(in_memory_telemetry):
         )
 
     # Force collection
-    reader.collect()
+    metrics_data = reader.get_metrics_data()
 
     # Check that metrics include both system and user labels
     expected_attributes = {
@@ -311,15 +317,174 @@ def test_record_request_with_user_labels(in_memory_telemetry):
         "experiment": "test_run"
     }
 
-    request_metric = get_metric_data(reader, "ecologits_requests")
+    request_metric = get_metric_data(metrics_data, "ecologits_requests")
     assert request_metric is not None
     assert get_metric_value_with_attributes(request_metric, expected_attributes) == 1
 
-    # energy_metric = get_metric_data(reader, "ecologits_energy")
+    # energy_metric = get_metric_data(metrics_data, "ecologits_energy")
     # assert energy_metric is not None
     # assert get_metric_value_with_attributes(energy_metric, expected_attributes) == 0.2 * 3_600_000
 
 
+def test_record_request_with_deferred_impacts(in_memory_telemetry):
+    """Test that deferred impacts are read at collection with the labels of the request context."""
+    telemetry, reader = in_memory_telemetry
+
+    future = Future()
+    with OpenTelemetryLabels(user_id="user123"):
+        telemetry.record_request(
+            input_tokens=200,
+            output_tokens=100,
+            request_latency=2.0,
+            impacts=ImpactsOutput.deferred(future),
+            provider="openai",
+            model="gpt-4",
+            endpoint="/chat/completions"
+        )
+    future.set_result(ImpactsOutput(
+        energy=Energy(value=0.2),
+        gwp=GWP(value=0.4),
+        adpe=ADPe(value=0.6),
+        pe=PE(value=0.8)
+    ))
+
+    metrics_data = reader.get_metrics_data()
+
+    expected_attributes = {
+        "provider": "openai",
+        "model": "gpt-4",
+        "endpoint": "/chat/completions",
+        "user_id": "user123"
+    }
+    request_metric = get_metric_data(metrics_data, "ecologits_requests")
+    assert request_metric is not None
+    assert get_metric_value_with_attributes(request_metric, expected_attributes) == 1
+
+
+def test_record_request_with_stream_timings(in_memory_telemetry):
+    """Test that the timings of streamed responses are recorded, and only for streamed responses."""
+    telemetry, reader = in_memory_telemetry
+
+    impacts = ImpactsOutput(energy=Energy(value=0.2), gwp=GWP(value=0.4), adpe=ADPe(value=0.6), pe=PE(value=0.8))
+    telemetry.record_request(
+        input_tokens=200,
+        output_tokens=100,
+        request_latency=2.0,
+        impacts=impacts,
+        provider="openai",
+        model="gpt-4o-mini",
+        endpoint="/chat/completions",
+        timings=StreamTimings(time_to_first_token=0.5, inter_token_latency=0.015, total_time=2.0, chunk_count=101)
+    )
+    telemetry.record_request(
+        input_tokens=200,
+        output_tokens=100,
+        request_latency=2.0,
+        impacts=impacts,
+        provider="openai",
+        model="gpt-4o",
+        endpoint="/chat/completions"
+    )
+
+    metrics_data = reader.get_metrics_data()
+
+    stream_labels = {"provider": "openai", "model": "gpt-4o-mini", "endpoint": "/chat/completions"}
+    time_to_first_token_metric = get_metric_data(metrics_data, "ecologits_time_to_first_token")
+    assert len(time_to_first_token_metric.data.data_points) == 1
+    assert get_metric_value_with_attributes(time_to_first_token_metric, stream_labels) == 0.5
+    inter_token_latency_metric = get_metric_data(metrics_data, "ecologits_inter_token_latency")
+    assert get_metric_value_with_attributes(inter_token_latency_metric, stream_labels) == 0.015
+    assert len(get_metric_data(metrics_data, "ecologits_requests").data.data_points) == 2
+
+
+def test_record_requests_aggregated_per_label_set(in_memory_telemetry):
+    """Test that requests are counted per label set and gauges hold the values of the last request."""
+    telemetry, reader = in_memory_telemetry
+
+    for i in range(1, 11):
+        with OpenTelemetryLabels(a="1", b="2") if i % 2 else OpenTelemetryLabels(b="2", a="1"):
+            telemetry.record_request(
+                input_tokens=i,
+                output_tokens=2 * i,
+                request_latency=0.1 * i,
+                impacts=ImpactsOutput(
+                    energy=Energy(value=RangeValue(min=0.1, max=0.3)),
+                    gwp=GWP(value=0.2 * i),
+                    adpe=ADPe(value=0.3),
+                    pe=PE(value=0.4)
+                ),
+                provider="openai",
+                model="gpt-4o-mini",
+                endpoint="/chat/completions"
+            )
+
+    metrics_data = reader.get_metrics_data()
+
+    expected_labels = {"provider": "openai", "model": "gpt-4o-mini", "endpoint": "/chat/completions", "a": "1",
+                       "b": "2"}
+    request_metric = get_metric_data(metrics_data, "ecologits_requests")
+    assert len(request_metric.data.data_points) == 1
+    assert get_metric_value_with_attributes(request_metric, expected_labels) == 10
+    assert get_metric_value_with_attributes(get_metric_data(metrics_data, "ecologits_input_tokens"), expected_labels) \
+        == 10
+    assert get_metric_value_with_attributes(get_metric_data(metrics_data, "ecologits_energy"), expected_labels) \
+        == pytest.approx(0.2 * 3_600_000)
+    assert get_metric_value_with_attributes(get_metric_data(metrics_data, "ecologits_gwp"), expected_labels) \
+        == pytest.approx(2 * 1000)
+
+    # Counters are cumulative and gauges only report the label sets updated since the last collection
+    metrics_data = reader.get_metrics_data()
+    assert get_metric_value_with_attributes(get_metric_data(metrics_data, "ecologits_requests"), expected_labels) == 10
+    assert get_metric_data(metrics_data, "ecologits_input_tokens") is None
+    telemetry.record_request(
+        input_tokens=1,
+        output_tokens=1,
+        request_latency=1,
+        impacts=ImpactsOutput(energy=Energy(value=0.1), gwp=GWP(value=0.1), adpe=ADPe(value=0.1), pe=PE(value=0.1)),
+        provider="openai",
+        model="gpt-4o-mini",
+        endpoint="/chat/completions"
+    )
+    metrics_data = reader.get_metrics_data()
+    request_metric = get_metric_data(metrics_data, "ecologits_requests")
+    assert get_metric_value_with_attributes(request_metric, expected_labels) == 10
+    assert len(request_metric.data.data_points) == 2
+    input_tokens_metric = get_metric_data(metrics_data, "ecologits_input_tokens")
+    assert len(input_tokens_metric.data.data_points) == 1
+    assert get_metric_value_with_attributes(input_tokens_metric, expected_labels) is None
+
+
+def test_record_request_buffer_full(in_memory_telemetry):
+    """Test that buffered requests are aggregated in the background when the buffer is full."""
+    telemetry, reader = in_memory_telemetry
+    future = Future()
+    impacts = ImpactsOutput.deferred(future)
+    result = ImpactsOutput(energy=Energy(value=0.1), gwp=GWP(value=0.1), adpe=ADPe(value=0.1), pe=PE(value=0.1))
+    # Only computed late, the caller would wait for it if the full buffer was aggregated on its thread
+    resolver = Timer(10, future.set_result, args=(result,))
+    resolver.start()
+
+    for _ in range(RECORD_BUFFER_SIZE + 1):
+        telemetry.record_request(
+            input_tokens=1,
+            output_tokens=1,
+            request_latency=1,
+            impacts=impacts,
+            provider="openai",
+            model="gpt-4o-mini",
+            endpoint="/chat/completions"
+        )
+    assert not impacts.is_resolved
+    resolver.cancel()
+    future.set_result(result)
+
+    metrics_data = reader.get_metrics_data()
+    request_metric = get_metric_data(metrics_data, "ecologits_requests")
+    expected_labels = {"provider": "openai", "model": "gpt-4o-mini", "endpoint": "/chat/completions"}
+    assert get_metric_value_with_attributes(request_metric, expected_labels) == RECORD_BUFFER_SIZE + 1
+    assert impacts.is_resolved
+
+
 def test_multiple_requests_with_different_labels(in_memory_telemetry):
     """Test multiple requests with different label combinations."""
     telemetry, reader = in_memory_telemetry
@@ -375,10 +540,10 @@ def test_multiple_requests_with_different_labels(in_memory_telemetry):
     )
 
     # Force collection
-    reader.collect()
+    metrics_data = reader.get_metrics_data()
 
     # Check that we have three separate metric series
-    request_metric = get_metric_data(reader, "ecologits_requests")
+    request_metric = get_metric_data(metrics_data, "ecologits_requests")
     assert request_metric is not None
     assert len(request_metric.data.data_points) == 3
 
@@ -394,7 +559,7 @@ def test_multiple_requests_with_different_labels(in_memory_telemetry):
     assert get_metric_value_with_attributes(request_metric, attrs3) == 1
 
     # Check input tokens for each series
-    # input_tokens_metric = get_metric_data(reader, "ecologits_input_tokens")
+    # input_tokens_metric = get_metric_data(metrics_data, "ecologits_input_tokens")
     # assert get_metric_value_with_attributes(input_tokens_metric, attrs1) == 100
     # assert get_metric_value_with_attributes(input_tokens_metric, attrs2) == 150
     # assert get_metric_value_with_attributes(input_tokens_metric, attrs3) == 200
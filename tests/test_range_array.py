@@ -0,0 +1,110 @@
+import operator
+
+import numpy as np
+import pytest
+
+from ecologits.impacts.llm import compute_llm_impacts_dag
+from ecologits.utils.range_array import RangeArray
+from ecologits.utils.range_value import RangeValue
+
+RANGES = [RangeValue(min=1, max=2), RangeValue(min=2, max=5), RangeValue(min=0.5, max=0.5)]
+OTHERS = [1.5, RangeValue(min=1, max=3), RangeValue(min=2.5, max=4)]
+
+
+def test_range_array_validation():
+    with pytest.raises(ValueError):
+        RangeArray(min=[1, 3], max=[2, 2])
+
+
+def test_range_array_conversions():
+    range_array = RangeArray.from_range_values([*RANGES, 4])
+    assert range_array.shape == (4,)
+    assert len(range_array) == 4
+    assert range_array[1] == RangeValue(min=2, max=5)
+    assert isinstance(range_array[1:], RangeArray)
+    assert range_array.to_range_values() == [*RANGES, RangeValue(min=4, max=4)]
+    assert np.array_equal(range_array.mean, [1.5, 3.5, 0.5, 4])
+
+
+@pytest.mark.parametrize("op", [operator.add, operator.mul])
+@pytest.mark.parametrize("other", OTHERS)
+def test_range_array_transformation(op, other):
+    range_array = RangeArray.from_range_values(RANGES)
+    for result in (op(range_array, other), op(other, range_array)):
+        assert isinstance(result, RangeArray)
+        assert result.to_range_values() == [op(value, other) for value in RANGES]
+
+
+def test_range_array_division():
+    range_array = RangeArray.from_range_values(RANGES)
+    assert (range_array / 2).to_range_values() == [value / 2 for value in RANGES]
+
+
+@pytest.mark.parametrize("op", [operator.eq, operator.ne, operator.le, operator.lt, operator.ge, operator.gt])
+@pytest.mark.parametrize("other", OTHERS)
+def test_range_array_compare(op, other):
+    range_array = RangeArray.from_range_values(RANGES)
+    assert op(range_array, other).tolist() == [op(value, other) for value in RANGES]
+    assert op(other, range_array).tolist() == [op(other, value) for value in RANGES]
+
+
+def test_range_array_broadcast_with_arrays():
+    range_array = RangeArray.from_range_values(RANGES)
+    array = np.array([1.0, 2.0, 3.0])
+    for result in (range_array * array, array * range_array):
+        assert isinstance(result, RangeArray)
+        assert result.to_range_values() == [value * a for value, a in zip(RANGES, array.tolist())]
+    assert (RangeArray(min=[1, 2], max=3) + np.ones((2, 1))).shape == (2, 2)
+    assert np.minimum(array, range_array).to_range_values() == [
+        RangeValue(min=1, max=1), RangeValue(min=2, max=2), RangeValue(min=0.5, max=0.5)
+    ]
+    assert np.ceil(range_array).to_range_values() == [
+        RangeValue(min=1, max=2), RangeValue(min=2, max=5), RangeValue(min=1, max=1)
+    ]
+
+
+def test_range_array_llm_impacts_dag():
+    rows = [
+        # active params, total params, output tokens, latency
+        (RangeValue(min=3, max=8), RangeValue(min=10, max=20), 100, 5),
+        (RangeValue(min=60, max=120), RangeValue(min=300, max=600), 1000, 0.5),
+        (RangeValue(min=7.3, max=7.3), RangeValue(min=7.3, max=7.3), 1, 100),
+    ]
+    kwargs = dict(
+        if_electricity_mix_adpe=0.0000000737708,
+        if_electricity_mix_pe=9.988,
+        if_electricity_mix_gwp=0.590478,
+        if_electricity_mix_wue=5.04,
+        datacenter_pue=RangeValue(min=1.09, max=1.14),
+        datacenter_wue=0.569
+    )
+    results = compute_llm_impacts_dag(
+        model_active_parameter_count=RangeArray.from_range_values([row[0] for row in rows]),
+        model_total_parameter_count=RangeArray.from_range_values([row[1] for row in rows]),
+        output_token_count=np.array([row[2] for row in rows]),
+        request_latency=np.array([row[3] for row in rows]),
+        **kwargs
+    )
+    for i, (active_params, total_params, output_token_count, request_latency) in enumerate(rows):
+        expected = {
+            "min": compute_llm_impacts_dag(
+                model_active_parameter_count=active_params.min,
+                model_total_parameter_count=total_params.min,
+                output_token_count=output_token_count,
+                request_latency=request_latency,
+                **kwargs
+            ),
+            "max": compute_llm_impacts_dag(
+                model_active_parameter_count=active_params.max,
+                model_total_parameter_count=total_params.max,
+                output_token_count=output_token_count,
+                request_latency=request_latency,
+                **kwargs
+            ),
+        }
+        for name in ("request_energy", "request_usage_gwp", "request_usage_wcf", "request_embodied_gwp"):
+            expected_min, expected_max = expected["min"][name], expected["max"][name]
+            if isinstance(expected_min, RangeValue):
+                expected_min, expected_max = expected_min.min, expected_max.max
+            assert results[name].min[i] == pytest.approx(expected_min, rel=1e-12)
+            assert results[name].max[i] == pytest.approx(expected_max, rel=1e-12)
@@ -0,0 +1,142 @@
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from ecologits import EcoLogits
+from ecologits.exceptions import EcoLogitsError
+from ecologits.tracers.utils import ImpactsOutput, StreamTimer, has_output_tokens, llm_impacts
+
+
+class Clock:
+    """Fake `time.perf_counter` that is moved forward by the tests."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, "perf_counter", clock)
+    return clock
+
+
+@pytest.fixture
+def decode_latency_mode():
+    EcoLogits.config.latency_mode = "decode"
+    yield
+    EcoLogits.config.latency_mode = "total"
+
+
+def receive(timer: StreamTimer, clock: Clock, *chunk_times: float) -> None:
+    for chunk_time in chunk_times:
+        clock.now = chunk_time
+        timer.tick()
+
+
+def test_stream_timings(clock):
+    timer = StreamTimer()
+    receive(timer, clock, 2.0, 2.1, 2.4, 2.5)
+    timings = timer.timings()
+    assert timings.time_to_first_token == 2.0
+    assert timings.inter_token_latency == pytest.approx(0.5 / 3)
+    assert timings.min_inter_token_latency == pytest.approx(0.1)
+    assert timings.max_inter_token_latency == pytest.approx(0.3)
+    assert timings.decode_time == pytest.approx(0.5 + 0.5 / 3)
+    assert timings.total_time == 2.5
+    assert timings.chunk_count == 4
+    # Total time by default
+    assert timer.impacts_latency == 2.5
+
+
+def test_stream_timings_single_chunk(clock):
+    timer = StreamTimer()
+    receive(timer, clock, 1.0)
+    timings = timer.timings()
+    assert timings.time_to_first_token == 1.0
+    assert timings.inter_token_latency is None
+    assert timings.max_inter_token_latency is None
+    assert timings.decode_time is None
+    assert timings.total_time == 1.0
+
+
+def test_stream_timings_without_chunks(clock):
+    timer = StreamTimer()
+    clock.now = 1.0
+    timer.stop()
+    timings = timer.timings()
+    assert timings.time_to_first_token is None
+    assert timings.total_time == 1.0
+    assert timings.chunk_count == 0
+
+
+def test_stream_timer_stop(clock):
+    timer = StreamTimer()
+    receive(timer, clock, 1.0, 1.5)
+    clock.now = 3.0
+    timer.stop()
+    assert timer.total_time == 3.0
+    assert timer.decode_time == pytest.approx(1.0)
+
+
+def test_has_output_tokens():
+    class Delta:
+        def __init__(self, content=None, tool_calls=None, role=None):
+            self.content = content
+            self.tool_calls = tool_calls
+            self.role = role
+
+    assert has_output_tokens(Delta(content="Hello"))
+    assert has_output_tokens(Delta(tool_calls=[{"index": 0}]))
+    assert not has_output_tokens(Delta(role="assistant"))
+    assert not has_output_tokens(Delta(content=""))
+    assert not has_output_tokens(None)
+
+
+def test_stream_timer_decode_latency_mode(clock, decode_latency_mode):
+    timer = StreamTimer()
+    receive(timer, clock, 5.0)
+    # The decode time is unknown until the second chunk
+    assert timer.impacts_latency == 5.0
+    receive(timer, clock, 5.2, 5.4)
+    assert timer.impacts_latency == pytest.approx(0.6)
+
+
+def test_decode_latency_mode_impacts(clock, decode_latency_mode):
+    # Slow first token (e.g. queueing), the total time would not cap the generation latency
+    timer = StreamTimer()
+    receive(timer, clock, *(10 + 0.001 * i for i in range(100)))
+    assert timer.impacts_latency == pytest.approx(0.1)
+    kwargs = dict(provider="openai", model_name="gpt-4o-mini", output_token_count=100)
+    impacts = llm_impacts(**kwargs, request_latency=timer.impacts_latency)
+    assert impacts.energy.value.max < llm_impacts(**kwargs, request_latency=timer.total_time).energy.value.max
+
+
+def test_impacts_timings(clock):
+    timer = StreamTimer()
+    receive(timer, clock, 1.0, 2.0)
+    impacts = llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=2, request_latency=2)
+    assert impacts.timings is None
+    impacts.timings = timer.timings()
+    assert impacts.timings.total_time == 2.0
+    # Timings are not part of the serialized impacts
+    assert "timings" not in impacts.model_dump()
+
+
+def test_deferred_impacts_timings():
+    expected = llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=100, request_latency=5)
+    future = Future()
+    impacts = ImpactsOutput.deferred(future)
+    impacts.timings = StreamTimer().timings()
+    future.set_result(expected)
+    assert impacts.energy == expected.energy
+    assert impacts.timings is not None
+
+
+def test_init_unknown_latency_mode():
+    with pytest.raises(EcoLogitsError):
+        EcoLogits.init(providers=[], latency_mode="prefill")
@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from ecologits.utils import tokenizer
+from ecologits.utils.lru_cache import LRUCache
+from ecologits.utils.tokenizer import (
+    MIN_CACHED_TEXT_LENGTH,
+    count_text_tokens,
+    count_tokens,
+    count_tokens_in_background,
+    get_encoding_name,
+    message_texts,
+)
+
+
+class WhitespaceEncoder:
+    """Encoder with one token per word, the encodings of tiktoken are downloaded on first use."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def encode_ordinary(self, text: str) -> list[str]:
+        self.calls += 1
+        return text.split()
+
+
+@pytest.fixture
+def encoder(monkeypatch):
+    encoder = WhitespaceEncoder()
+    monkeypatch.setattr(tokenizer, "_load_encoder", lambda encoding_name: encoder)
+    monkeypatch.setattr(tokenizer, "_is_tiktoken_installed", True)
+    tokenizer.token_count_cache.clear()
+    yield encoder
+    tokenizer.token_count_cache.clear()
+
+
+MESSAGES = [
+    {"role": "system", "content": "You are a helpful assistant."},
+    {"role": "user", "content": [
+        {"type": "text", "text": "What is in this image?"},
+        {"type": "image_url", "image_url": {"url": "https://example.com/image.png"}},
+    ]},
+    {"role": "assistant", "content": None, "tool_calls": []},
+]
+
+
+def test_message_texts():
+    assert list(message_texts(MESSAGES)) == ["You are a helpful assistant.", "What is in this image?"]
+
+
+def test_message_texts_objects():
+    class Message:
+        def __init__(self, content):
+            self.content = content
+
+    assert list(message_texts([Message("Hello"), Message(["World", {"text": "!"}])])) == ["Hello", "World", "!"]
+
+
+def test_count_tokens_exact(encoder):
+    assert count_tokens(MESSAGES, model_name="gpt-4o") == 10
+    assert encoder.calls == 2
+
+
+def test_count_tokens_approximate(encoder):
+    assert count_text_tokens("a" * 40, mode="approximate") == 10
+    assert count_text_tokens("a" * 41, mode="approximate") == 11
+    # Non-ASCII text is estimated from its UTF-8 bytes
+    assert count_text_tokens("é" * 3, mode="approximate") == 2
+    assert count_tokens(MESSAGES, mode="approximate") == 7 + 6
+    assert encoder.calls == 0
+
+
+def test_count_tokens_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(tokenizer, "_is_tiktoken_installed", False)
+    assert count_tokens(MESSAGES) == count_tokens(MESSAGES, mode="approximate")
+
+
+def test_count_tokens_in_background(encoder):
+    future = count_tokens_in_background(MESSAGES, model_name="gpt-4o")
+    assert future.result() == 10
+
+    async def count() -> int:
+        return await asyncio.wrap_future(count_tokens_in_background(MESSAGES, model_name="gpt-4o"))
+
+    assert asyncio.run(count()) == 10
+
+
+def test_count_tokens_cache(encoder):
+    system_prompt = {"role": "system", "content": "You are a helpful assistant. " * 100}
+    conversation = [system_prompt]
+    for turn in range(5):
+        conversation.append({"role": "user", "content": f"Question {turn} " * 100})
+        assert count_tokens(conversation, model_name="gpt-4o") == 500 + 200 * (turn + 1)
+    # Only the new message of each turn is encoded
+    assert encoder.calls == 6
+    assert tokenizer.token_count_cache.hits == 14
+    assert tokenizer.token_count_cache.hit_rate == pytest.approx(14 / 20)
+
+
+def test_count_tokens_cache_skips_short_texts(encoder):
+    short_text = "a " * ((MIN_CACHED_TEXT_LENGTH - 1) // 2)
+    count_text_tokens(short_text)
+    count_text_tokens(short_text)
+    assert encoder.calls == 2
+    assert len(tokenizer.token_count_cache) == 0
+
+
+def test_count_tokens_cache_per_encoding(encoder):
+    text = "word " * MIN_CACHED_TEXT_LENGTH
+    count_text_tokens(text, model_name="gpt-4")
+    count_text_tokens(text, model_name="gpt-4o")
+    count_text_tokens(text, model_name="gpt-4o-mini")
+    assert encoder.calls == 2
+    assert len(tokenizer.token_count_cache) == 2
+
+
+def test_count_tokens_cache_is_bounded(encoder, monkeypatch):
+    monkeypatch.setattr(tokenizer, "token_count_cache", LRUCache(maxsize=2))
+    for i in range(4):
+        count_text_tokens(f"{i} " * MIN_CACHED_TEXT_LENGTH)
+    assert len(tokenizer.token_count_cache) == 2
+
+
+def test_get_encoding_name():
+    pytest.importorskip("tiktoken")
+    assert get_encoding_name(None) == "cl100k_base"
+    assert get_encoding_name("gpt-4") == "cl100k_base"
+    assert get_encoding_name("gpt-4o-mini") == "o200k_base"
+    assert get_encoding_name("meta-llama/Llama-3.1-8B-Instruct") == "cl100k_base"
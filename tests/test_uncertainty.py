@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from ecologits._ecologits import EcoLogits
+from ecologits.exceptions import EcoLogitsError, ModelingError
+from ecologits.impacts.llm import compute_llm_impacts
+from ecologits.impacts.uncertainty import (
+    DEFAULT_SAMPLES,
+    beta,
+    compute_llm_impacts_percentiles,
+    sample_llm_impacts,
+    triangular,
+)
+from ecologits.tracers.utils import LLMImpactsAccumulator, llm_impacts
+from ecologits.utils.range_value import RangeValue
+
+REQUEST = dict(
+    model_active_parameter_count=RangeValue(min=3, max=8),
+    model_total_parameter_count=RangeValue(min=10, max=20),
+    output_token_count=100,
+    request_latency=5,
+    if_electricity_mix_adpe=0.0000000737708,
+    if_electricity_mix_pe=9.988,
+    if_electricity_mix_gwp=0.590478,
+    if_electricity_mix_wue=5.04,
+    datacenter_pue=RangeValue(min=1.09, max=1.14),
+    datacenter_wue=RangeValue(min=0.13, max=0.999)
+)
+
+
+@pytest.fixture
+def uncertainty_mode():
+    EcoLogits.config.uncertainty_samples = 1000
+    yield
+    EcoLogits.config.uncertainty_samples = None
+
+
+def test_percentiles_within_range():
+    impacts = compute_llm_impacts(**REQUEST)
+    percentiles = compute_llm_impacts_percentiles(rng=np.random.default_rng(0), **REQUEST)
+    assert percentiles.samples == DEFAULT_SAMPLES
+    for name in ("energy", "gwp", "adpe", "pe", "wcf"):
+        value = getattr(impacts, name).value
+        p = getattr(percentiles, name)
+        assert value.min * (1 - 1e-6) <= p.p5 <= p.p50 <= p.p95 <= value.max * (1 + 1e-6)
+
+
+def test_percentiles_match_numpy():
+    samples = sample_llm_impacts(rng=np.random.default_rng(0), **REQUEST)
+    percentiles = compute_llm_impacts_percentiles(rng=np.random.default_rng(0), **REQUEST)
+    expected = np.percentile(samples["gwp"], [5, 50, 95])
+    assert [percentiles.gwp.p5, percentiles.gwp.p50, percentiles.gwp.p95] == pytest.approx(expected, rel=1e-6)
+
+
+def test_percentiles_without_ranges():
+    request = {
+        **REQUEST,
+        "model_active_parameter_count": 7.3,
+        "model_total_parameter_count": 7.3,
+        "datacenter_pue": 1.2,
+        "datacenter_wue": 0.5
+    }
+    impacts = compute_llm_impacts(**request)
+    percentiles = compute_llm_impacts_percentiles(samples=100, **request)
+    assert percentiles.energy.p5 == percentiles.energy.p95 == pytest.approx(impacts.energy.value, rel=1e-12)
+
+
+def test_percentiles_distributions():
+    uniform_percentiles = compute_llm_impacts_percentiles(rng=np.random.default_rng(0), **REQUEST)
+    percentiles = compute_llm_impacts_percentiles(
+        rng=np.random.default_rng(0),
+        distributions={"model_parameter_count": triangular(mode=0.1), "datacenter_pue": beta(2, 5)},
+        **REQUEST
+    )
+    assert percentiles.energy.p50 < uniform_percentiles.energy.p50
+    with pytest.raises(ModelingError):
+        compute_llm_impacts_percentiles(distributions={"datacenter_location": triangular()}, **REQUEST)
+
+
+def test_llm_impacts_percentiles(uncertainty_mode):
+    impacts = llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=100, request_latency=5)
+    assert impacts.percentiles is not None
+    assert impacts.percentiles.samples == 1000
+    assert impacts.energy.value.min * (1 - 1e-6) <= impacts.percentiles.energy.p50 <= \
+        impacts.energy.value.max * (1 + 1e-6)
+
+
+def test_llm_impacts_accumulator_percentiles(uncertainty_mode):
+    accumulator = LLMImpactsAccumulator(provider="openai", model_name="gpt-4o-mini")
+    assert accumulator.update(output_token_count=1, request_latency=0.1).percentiles is None
+    assert accumulator.update(output_token_count=2, request_latency=0.2, final=True).percentiles is not None
+
+
+def test_llm_impacts_without_percentiles():
+    impacts = llm_impacts(provider="openai", model_name="gpt-4o-mini", output_token_count=100, request_latency=5)
+    assert impacts.percentiles is None
+
+
+def test_init_uncertainty_samples():
+    with pytest.raises(EcoLogitsError):
+        EcoLogits.init(providers=[], uncertainty_samples=0)
+    EcoLogits.init(providers=[], uncertainty_samples=500)
+    assert EcoLogits.config.uncertainty_samples == 500
+    EcoLogits.init(providers=[])
+    assert EcoLogits.config.uncertainty_samples is None
+
+
+@pytest.mark.parametrize("distributions", [
+    {"datacenter_location": triangular()},
+    {"datacenter_pue": beta(-1, 5)},
+    {"datacenter_pue": lambda rng, size: rng.normal(size=size)},
+    {"datacenter_pue": lambda rng, size: rng.random(size + 1)},
+    {"datacenter_pue": 0.5},
+])
+def test_init_invalid_uncertainty_distributions(distributions):
+    with pytest.raises(EcoLogitsError):
+        EcoLogits.init(providers=[], uncertainty_samples=500, uncertainty_distributions=distributions)
+    EcoLogits.init(providers=[], uncertainty_samples=500, uncertainty_distributions={"datacenter_pue": beta(2, 5)})
+    assert "datacenter_pue" in EcoLogits.config.uncertainty_distributions
+    EcoLogits.init(providers=[])